@@ -43,6 +43,18 @@ LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 # Default volume (25, 50, 75, or 100)
 DEFAULT_VOLUME = int(os.getenv('DEFAULT_VOLUME', '75'))
 
+# Gapless playback: prefetch the next queue item into mpv's playlist
+GAPLESS_PLAYBACK = os.getenv('GAPLESS_PLAYBACK', 'true').lower() == 'true'
+
+# Crossfade between queue items in seconds (0 = off, max 10)
+CROSSFADE_SECONDS = float(os.getenv('CROSSFADE_SECONDS', '0'))
+
+# Seconds the seek buttons jump
+SEEK_STEP = int(os.getenv('SEEK_STEP', '10'))
+
+# System mixer used when mpv is not running (auto, alsa, amixer)
+MIXER_BACKEND = os.getenv('MIXER_BACKEND', 'auto').lower()
+
 # MPV player options
 MPV_OPTIONS = {
     'no_video': True,
@@ -50,12 +62,52 @@ MPV_OPTIONS = {
     'quiet': True,
     'demuxer_max_bytes': '50M',  # Limit buffer to save RAM
     'demuxer_max_back_bytes': '25M',
+    'prefetch_playlist': GAPLESS_PLAYBACK,  # Open next track before current ends
+    'gapless_audio': 'weak',
+    'cache': True,  # Keep reading the stream while paused
+    'demuxer_readahead_secs': 300,  # Bounded by demuxer_max_bytes
+    'stream_reconnect': True,  # Reopen the connection if it drops on a long pause
 }
 
 # ============================================================================
 # YOUTUBE-DL OPTIONS
 # ============================================================================
 
+# Worker threads for yt-dlp extraction (runs off the event loop)
+EXTRACTION_WORKERS = int(os.getenv('EXTRACTION_WORKERS', '2'))
+
+# Seconds a playlist/video extraction may take before it is abandoned
+EXTRACTION_TIMEOUT = float(os.getenv('EXTRACTION_TIMEOUT', '120'))
+
+# Idle yt-dlp instances kept warm per option profile
+YTDL_POOL_SIZE = int(os.getenv('YTDL_POOL_SIZE', str(EXTRACTION_WORKERS)))
+
+# Songs added to the queue per step while a playlist streams in
+PLAYLIST_CHUNK_SIZE = int(os.getenv('PLAYLIST_CHUNK_SIZE', '50'))
+
+# Queued songs resolved in parallel when a playlist left out durations (0 = off)
+ENRICH_CONCURRENCY = int(os.getenv('ENRICH_CONCURRENCY', '2'))
+
+# Upcoming songs (from the current one on) the background resolution looks at
+ENRICH_WINDOW = int(os.getenv('ENRICH_WINDOW', '50'))
+
+# Persistent metadata cache for resolved videos and playlists
+METADATA_CACHE_ENABLED = os.getenv('METADATA_CACHE', 'true').lower() == 'true'
+METADATA_CACHE_PATH = os.getenv(
+    'METADATA_CACHE_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'metadata.db')
+)
+METADATA_CACHE_SIZE = int(os.getenv('METADATA_CACHE_SIZE', '20000'))  # Max cached videos
+METADATA_TTL_HOURS = float(os.getenv('METADATA_TTL_HOURS', '168'))  # 7 days
+CHANNEL_REFRESH_MINUTES = float(os.getenv('CHANNEL_REFRESH_MINUTES', '60'))  # Recheck channel uploads
+
+# Local recommender learned from the songs the bot played
+RECOMMENDER_ENABLED = os.getenv('RECOMMENDER', 'true').lower() == 'true'
+RECOMMENDER_PATH = os.getenv(
+    'RECOMMENDER_PATH',
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'cache', 'history.db')
+)
+
 YTDL_OPTIONS = {
     'format': 'bestaudio/best',
     'noplaylist': False,  # Allow playlists
@@ -129,6 +181,18 @@ def validate_config():
     if DEFAULT_VOLUME not in [25, 50, 75, 100]:
         errors.append(f"DEFAULT_VOLUME must be 25, 50, 75, or 100 (got {DEFAULT_VOLUME})")
     
+    # Check crossfade
+    if not 0 <= CROSSFADE_SECONDS <= 10:
+        errors.append(f"CROSSFADE_SECONDS must be between 0 and 10 (got {CROSSFADE_SECONDS:g})")
+    
+    # Check extraction pool
+    if EXTRACTION_WORKERS < 1:
+        errors.append(f"EXTRACTION_WORKERS must be at least 1 (got {EXTRACTION_WORKERS})")
+    
+    # Check mixer backend
+    if MIXER_BACKEND not in ['auto', 'alsa', 'amixer']:
+        errors.append(f"MIXER_BACKEND must be auto, alsa or amixer (got {MIXER_BACKEND})")
+    
     # Report errors
     if errors:
         error_msg = "Configuration errors:\n" + "\n".join(f"  - {e}" for e in errors)
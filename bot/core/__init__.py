@@ -4,15 +4,54 @@ Contains all core functionality for the bot
 """
 
 from .player_state import PlayerState, Song, player
+from .song_queue import SongQueue
+from .shuffle import ShuffleOrder, SmartShuffleOrder, shuffle_order, smart_shuffle_order
+from .mpv_ipc import MPVIPCClient, MPVIPCError, mpv_ipc
 from .mpv_player import MPVPlayer
+from .metadata_cache import MetadataCache, metadata_cache
+from .recommender import Recommender, recommender
+from .failures import FailureCache
+from .ytdl_pool import YtdlPool
 from .youtube import YouTubeExtractor
+from .extraction import ExtractionService, ExtractionError, ExtractionTimeout, ExtractionCancelled
+from .enrichment import MetadataEnricher
+from .mixer import MixerBackend, get_mixer
+from .volume import VolumeController
+from .suggestions import SuggestionService
+from .crossfade import CrossfadeManager
 from .playback import PlaybackManager
+from .controller import PlaybackController
 
 __all__ = [
     'PlayerState',
     'Song',
     'player',
+    'SongQueue',
+    'ShuffleOrder',
+    'shuffle_order',
+    'SmartShuffleOrder',
+    'smart_shuffle_order',
+    'MPVIPCClient',
+    'MPVIPCError',
+    'mpv_ipc',
     'MPVPlayer',
+    'MetadataCache',
+    'metadata_cache',
+    'Recommender',
+    'recommender',
+    'FailureCache',
+    'YtdlPool',
     'YouTubeExtractor',
+    'ExtractionService',
+    'ExtractionError',
+    'ExtractionTimeout',
+    'ExtractionCancelled',
+    'MetadataEnricher',
+    'MixerBackend',
+    'get_mixer',
+    'VolumeController',
+    'SuggestionService',
+    'CrossfadeManager',
     'PlaybackManager',
+    'PlaybackController',
 ]
@@ -0,0 +1,252 @@
+"""
+Playback Controller Module
+Single task that applies transport commands one decision at a time
+"""
+
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from .player_state import player
+from .playback import PlaybackManager
+from .suggestions import SuggestionService
+
+logger = logging.getLogger(__name__)
+
+# Seconds without a new command before a started song counts as final
+SETTLE_WINDOW = 0.4
+
+
+@dataclass
+class Command:
+    """A transport request waiting for the controller"""
+    kind: str  # 'play', 'jump', 'stop', 'pause', 'finished', 'advanced', 'refresh'
+    index: Optional[int] = None  # 'play': queue index, None for the current one
+    steps: int = 0  # 'jump' (and a 'play' a jump was merged into)
+    explicit: bool = False  # 'play': picked by the user, played even if marked as failing
+    future: Optional[asyncio.Future] = None
+
+
+class PlaybackController:
+    """
+    Single writer of the transport state
+    
+    Handlers, countdown tasks and mpv events do not start playback
+    themselves; they put a Command on a queue. One controller task takes
+    whatever has queued up while it was busy and collapses it into one
+    decision: a later play, jump or stop supersedes earlier ones, jumps
+    add up (five Next taps during a load become one jump of +5) and
+    pause toggles only count after the last of them. The decision is
+    then applied with at most one mpv start and one loadfile.
+    
+    Every decision loads its target at once, so the final song of a burst
+    of skips starts as soon as the previous loadfile returned; a
+    replacing loadfile aborts the stream open of a song that was still
+    loading. Only the follow-up work of a song (prefetch, suggestions,
+    Now Playing) is debounced: it runs once the song settled, i.e.
+    SETTLE_WINDOW seconds passed without a new command, so songs skipped
+    over cause none of it.
+    
+    The controller never waits for the user. Countdown dialogs run as
+    their own tasks and send a command when they are done.
+    """
+    
+    _queue: Optional[asyncio.Queue] = None
+    _task: Optional[asyncio.Task] = None
+    
+    @staticmethod
+    def _submit(command: Command):
+        """Queue a command, starting the controller task on first use"""
+        if PlaybackController._queue is None:
+            PlaybackController._queue = asyncio.Queue()
+        task = PlaybackController._task
+        if task is None or task.done():
+            PlaybackController._task = asyncio.create_task(PlaybackController._run())
+        PlaybackController._queue.put_nowait(command)
+    
+    @staticmethod
+    async def _submit_and_wait(command: Command):
+        """Queue a command and wait until its batch was applied"""
+        command.future = asyncio.get_running_loop().create_future()
+        PlaybackController._submit(command)
+        return await command.future
+    
+    @staticmethod
+    def play(index: Optional[int] = None, explicit: bool = False):
+        """
+        Play a queue entry from the start
+        
+        Args:
+            index: Queue index, None for the current song
+            explicit: The user picked this song, try it even if it is
+                marked as failing (automatic starts skip marked songs)
+        """
+        PlaybackController._submit(Command('play', index=index, explicit=explicit))
+    
+    @staticmethod
+    def jump(steps: int):
+        """
+        Move through the queue and play (Next/Previous)
+        
+        Args:
+            steps: Songs to move, negative to go back
+        """
+        PlaybackController._submit(Command('jump', steps=steps))
+    
+    @staticmethod
+    def next():
+        """Play the next song"""
+        PlaybackController.jump(1)
+    
+    @staticmethod
+    def previous():
+        """Play the previous song"""
+        PlaybackController.jump(-1)
+    
+    @staticmethod
+    async def stop():
+        """Stop playback, returns once it is stopped"""
+        await PlaybackController._submit_and_wait(Command('stop'))
+    
+    @staticmethod
+    async def toggle_pause() -> bool:
+        """
+        Toggle pause/resume
+        
+        Returns:
+            True if paused afterwards, False if playing
+        """
+        return await PlaybackController._submit_and_wait(Command('pause'))
+    
+    @staticmethod
+    def song_finished():
+        """The current song played to its end (or failed), continue the queue"""
+        PlaybackController._submit(Command('finished'))
+    
+    @staticmethod
+    def gapless_advanced():
+        """mpv moved on to the prefetched song by itself"""
+        PlaybackController._submit(Command('advanced'))
+    
+    @staticmethod
+    def refresh():
+        """Queue or modes changed, update the prefetched next song"""
+        PlaybackController._submit(Command('refresh'))
+    
+    @staticmethod
+    def _collapse(batch: List[Command]) -> Tuple[Optional[Command], int]:
+        """
+        Reduce queued commands to one decision
+        
+        Args:
+            batch: Commands in arrival order
+        
+        Returns:
+            (transport command to apply or None, pause toggles after it)
+        """
+        transport = None
+        toggles = 0
+        for command in batch:
+            kind = command.kind
+            if kind == 'pause':
+                toggles += 1
+            elif kind == 'refresh':
+                # Anything else prefetches on its own
+                if transport is None:
+                    transport = command
+            elif kind in ('finished', 'advanced'):
+                # A user command decides over a song that ended meanwhile
+                if transport is None or transport.kind in ('refresh', 'finished', 'advanced'):
+                    transport = command
+            elif kind == 'jump' and transport is not None and transport.kind in ('play', 'jump'):
+                transport = Command(transport.kind, index=transport.index, steps=transport.steps + command.steps)
+                toggles = 0
+            else:
+                # play, jump, stop: a new track (or none) starts unpaused
+                transport = command
+                toggles = 0
+        return transport, toggles
+    
+    @staticmethod
+    async def _apply(transport: Optional[Command], toggles: int) -> bool:
+        """
+        Carry out one decision
+        
+        Returns:
+            True if a song was started that still has to settle
+        """
+        application = PlaybackManager._application
+        started = False
+        
+        if transport is not None:
+            kind = transport.kind
+            if kind in ('play', 'jump'):
+                if not player.playlist:
+                    logger.warning("⚠️ No songs in playlist")
+                else:
+                    # Suggestions for the song being left are not needed
+                    SuggestionService.cancel()
+                    PlaybackManager.track_skipped()
+                    if transport.index is not None:
+                        player.current_index = transport.index
+                    if transport.steps:
+                        player.current_index = PlaybackManager.step_index(transport.steps)
+                    started = await PlaybackManager.play_current_song(
+                        application, announce=False, explicit=transport.explicit and not transport.steps
+                    )
+            elif kind == 'stop':
+                await PlaybackManager.stop()
+            elif kind == 'finished':
+                await PlaybackManager.handle_song_finished(application)
+            elif kind == 'advanced':
+                await PlaybackManager._on_gapless_advance(application)
+            elif kind == 'refresh':
+                await PlaybackManager.prefetch_next()
+        
+        if toggles % 2 and player.is_playing:
+            await PlaybackManager.toggle_pause()
+        return started
+    
+    @staticmethod
+    async def _run():
+        """Controller task: take everything queued, decide once, apply"""
+        queue = PlaybackController._queue
+        settling = False
+        while True:
+            if settling:
+                try:
+                    batch = [await asyncio.wait_for(queue.get(), SETTLE_WINDOW)]
+                except asyncio.TimeoutError:
+                    # No skip followed, the started song stays
+                    settling = False
+                    try:
+                        await PlaybackManager.track_settled(PlaybackManager._application)
+                    except Exception as e:
+                        logger.error(f"❌ Error finishing track start: {e}")
+                    continue
+            else:
+                batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            transport, toggles = PlaybackController._collapse(batch)
+            if len(batch) > 1:
+                logger.debug(f"Collapsed {len(batch)} playback commands into "
+                             f"{transport.kind if transport else 'pause'} ({toggles} toggles)")
+            
+            try:
+                started = await PlaybackController._apply(transport, toggles)
+            except Exception as e:
+                logger.error(f"❌ Error applying playback command: {e}")
+                started = False
+            
+            if started:
+                settling = True
+            elif transport is not None and transport.kind != 'refresh':
+                # Stopped, or the queue moved on by itself
+                settling = False
+            
+            for command in batch:
+                if command.future is not None and not command.future.done():
+                    command.future.set_result(player.is_paused if command.kind == 'pause' else None)
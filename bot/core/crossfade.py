@@ -0,0 +1,276 @@
+"""
+Crossfade Module
+Overlaps consecutive queue items using a second, short-lived mpv deck
+"""
+
+import os
+import subprocess
+import logging
+from typing import Optional
+
+from .player_state import player
+from .mpv_ipc import MPVIPCClient, MPVIPCError, mpv_ipc
+from .mpv_player import MPVPlayer, IPC_SOCKET, SOCKET_WAIT_TIMEOUT
+from ..config import CROSSFADE_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Socket of the secondary deck
+CROSSFADE_SOCKET = f"{IPC_SOCKET}_xfade"
+
+# Seconds before the fade starts at which the next track is opened
+PRELOAD_SECONDS = 5.0
+
+
+class CrossfadeManager:
+    """
+    Crossfade between the current track and the prefetched next one
+    
+    The primary mpv keeps playing the queue as usual. PRELOAD_SECONDS
+    before the fade window, a secondary idle mpv (the deck) opens the next
+    track paused, and the primary's prefetched entry is re-appended with
+    start=CROSSFADE_SECONDS. When the window opens the deck starts the
+    next track with a fade-in while the primary fades out. When the
+    primary reaches the end it continues gaplessly at the point the deck
+    has reached, and the deck is stopped again.
+    
+    Only the overlap window decodes two streams, outside of it the deck
+    sits idle.
+    """
+    
+    _process: Optional[subprocess.Popen] = None
+    _ipc = MPVIPCClient()
+    
+    # Queue handle of the song the deck has loaded, None when not armed
+    _armed = None
+    _shifted: bool = False  # the primary's copy was re-appended with start=
+    _fading: bool = False
+    
+    # Bumped by every arm, handoff and cancel; an _arm() that finds it
+    # changed after an await was overtaken and gives up
+    _generation: int = 0
+    
+    # The time-remaining handler is registered only once
+    _attached: bool = False
+    
+    @staticmethod
+    def enabled() -> bool:
+        """Check if crossfade is configured"""
+        return CROSSFADE_SECONDS > 0
+    
+    @staticmethod
+    async def attach():
+        """Start watching the primary's remaining time"""
+        if not CrossfadeManager.enabled() or CrossfadeManager._attached:
+            return
+        CrossfadeManager._attached = True
+        mpv_ipc.on_property('time-remaining', CrossfadeManager._on_time_remaining)
+        await mpv_ipc.observe_property('time-remaining')
+        logger.info(f"✓ Crossfade enabled ({CROSSFADE_SECONDS:g}s)")
+    
+    @staticmethod
+    def _on_time_remaining(remaining: Optional[float]):
+        """Arm the deck and open the fade window as the track nears its end"""
+        if remaining is None or not player.is_playing or player.is_paused:
+            return None
+        if player.prefetched_index is None:
+            return None
+        
+        if CrossfadeManager._armed is None:
+            if CROSSFADE_SECONDS < remaining <= CROSSFADE_SECONDS + PRELOAD_SECONDS:
+                CrossfadeManager._generation += 1
+                CrossfadeManager._armed = player.playlist.handle(player.prefetched_index)
+                return CrossfadeManager._arm(CrossfadeManager._armed, CrossfadeManager._generation)
+        elif CrossfadeManager._shifted and not CrossfadeManager._fading and remaining <= CROSSFADE_SECONDS:
+            CrossfadeManager._fading = True
+            return CrossfadeManager._start_fade()
+        
+        return None
+    
+    @staticmethod
+    async def _ensure_deck() -> bool:
+        """Spawn the secondary deck once and connect to it"""
+        if CrossfadeManager._process and CrossfadeManager._process.poll() is None:
+            if not CrossfadeManager._ipc.connected:
+                await CrossfadeManager._ipc.connect(CROSSFADE_SOCKET)
+            return True
+        
+        if os.path.exists(CROSSFADE_SOCKET):
+            try:
+                os.remove(CROSSFADE_SOCKET)
+            except Exception as e:
+                logger.warning(f"Error removing crossfade socket: {e}")
+        
+        cmd = MPVPlayer._build_command(player.volume, CROSSFADE_SOCKET)
+        CrossfadeManager._process = subprocess.Popen(
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL
+        )
+        logger.info(f"Started crossfade deck with PID: {CrossfadeManager._process.pid}")
+        
+        await CrossfadeManager._ipc.connect(CROSSFADE_SOCKET, timeout=SOCKET_WAIT_TIMEOUT)
+        return True
+    
+    @staticmethod
+    def _still_armed(handle, generation: int) -> bool:
+        """Check that an arm was not overtaken and its song is still the prefetched one"""
+        if CrossfadeManager._generation != generation or CrossfadeManager._armed is not handle:
+            return False
+        index = player.playlist.locate(handle)
+        return index is not None and index == player.prefetched_index
+    
+    @staticmethod
+    async def _abort(generation: int):
+        """Give up an overtaken arm without touching the primary's playlist"""
+        if CrossfadeManager._generation == generation:
+            CrossfadeManager._generation += 1
+            CrossfadeManager._armed = None
+            CrossfadeManager._shifted = False
+            CrossfadeManager._fading = False
+        if CrossfadeManager._armed is None:
+            await CrossfadeManager._stop_deck()
+        logger.debug("Crossfade arm overtaken by a track change")
+    
+    @staticmethod
+    async def _arm(handle, generation: int):
+        """
+        Open the next track paused on the deck and offset the primary's copy
+        
+        Runs as a task next to the playback controller, so a skip or a
+        queue change can land during any await. The state is checked
+        again after each one and the primary's playlist is only touched
+        while the armed song is still the prefetched one.
+        
+        Args:
+            handle: Queue handle of the prefetched song
+            generation: _generation when it was armed
+        """
+        song = handle.song
+        try:
+            await CrossfadeManager._ensure_deck()
+            if not CrossfadeManager._still_armed(handle, generation):
+                return await CrossfadeManager._abort(generation)
+            await CrossfadeManager._ipc.command({
+                "name": "loadfile",
+                "url": song.url,
+                "flags": "replace",
+                "options": {
+                    "pause": "yes",
+                    "volume": str(player.volume),
+                    "af": f"afade=t=in:d={CROSSFADE_SECONDS:g}",
+                },
+            })
+            
+            if not CrossfadeManager._still_armed(handle, generation):
+                return await CrossfadeManager._abort(generation)
+            
+            # The primary picks the track up where the deck will be
+            # when the current one ends
+            await mpv_ipc.command_batch([
+                ["playlist-remove", 1],
+                {
+                    "name": "loadfile",
+                    "url": song.url,
+                    "flags": "append",
+                    "options": {"start": f"{CROSSFADE_SECONDS:g}"},
+                },
+            ])
+            CrossfadeManager._shifted = True
+            logger.debug(f"Crossfade armed for '{song.title}'")
+        except (MPVIPCError, OSError) as e:
+            logger.warning(f"⚠️ Crossfade unavailable, falling back to gapless: {e}")
+            await CrossfadeManager._abort(generation)
+    
+    @staticmethod
+    async def _start_fade():
+        """Fade the primary out and the deck in"""
+        generation = CrossfadeManager._generation
+        try:
+            position = player.position.time_pos
+            await mpv_ipc.set_property(
+                "file-local-options/af",
+                f"afade=t=out:st={position:.3f}:d={CROSSFADE_SECONDS:g}"
+            )
+            if CrossfadeManager._generation != generation:
+                return  # Cancelled meanwhile, cancel() restored the primary
+            await CrossfadeManager._ipc.set_property("pause", False)
+            logger.info("🎚️ Crossfading into next track")
+        except (MPVIPCError, TypeError) as e:
+            logger.warning(f"⚠️ Crossfade failed: {e}")
+            await CrossfadeManager.cancel()
+    
+    @staticmethod
+    async def handoff():
+        """The primary advanced to the next track, release the deck"""
+        if CrossfadeManager._armed is None:
+            return
+        CrossfadeManager._generation += 1
+        CrossfadeManager._armed = None
+        CrossfadeManager._shifted = False
+        CrossfadeManager._fading = False
+        await CrossfadeManager._stop_deck()
+    
+    @staticmethod
+    async def cancel():
+        """
+        Abort a pending or running crossfade
+        
+        Called when the track is changed or stopped manually. The primary's
+        prefetched entry is restored to start from the beginning.
+        """
+        if CrossfadeManager._armed is None:
+            return
+        
+        handle = CrossfadeManager._armed
+        shifted = CrossfadeManager._shifted
+        fading = CrossfadeManager._fading
+        CrossfadeManager._generation += 1
+        CrossfadeManager._armed = None
+        CrossfadeManager._shifted = False
+        CrossfadeManager._fading = False
+        await CrossfadeManager._stop_deck()
+        
+        index = player.playlist.locate(handle)
+        if not shifted or not mpv_ipc.connected or index is None or player.prefetched_index != index:
+            return
+        commands = [
+            ["playlist-remove", 1],
+            ["loadfile", player.playlist[index].url, "append"],
+        ]
+        if fading:
+            commands.insert(0, ["set_property", "file-local-options/af", ""])
+        await mpv_ipc.command_batch(commands)
+    
+    @staticmethod
+    async def pause_deck(paused: bool):
+        """Pause or resume the deck together with the primary"""
+        if CrossfadeManager._fading and CrossfadeManager._ipc.connected:
+            try:
+                await CrossfadeManager._ipc.set_property("pause", paused)
+            except MPVIPCError as e:
+                logger.debug(f"Could not pause crossfade deck: {e}")
+    
+    @staticmethod
+    async def _stop_deck():
+        """Stop whatever the deck is playing, the process stays idle"""
+        if CrossfadeManager._ipc.connected:
+            try:
+                await CrossfadeManager._ipc.command("stop")
+            except MPVIPCError as e:
+                logger.debug(f"Could not stop crossfade deck: {e}")
+    
+    @staticmethod
+    def shutdown():
+        """Terminate the deck process (called on bot exit)"""
+        if CrossfadeManager._process:
+            try:
+                CrossfadeManager._process.terminate()
+                CrossfadeManager._process.wait(timeout=3)
+            except subprocess.TimeoutExpired:
+                CrossfadeManager._process.kill()
+            except Exception as e:
+                logger.error(f"Error stopping crossfade deck: {e}")
+            finally:
+                CrossfadeManager._process = None
@@ -0,0 +1,138 @@
+"""
+Metadata Enrichment Module
+Resolves missing durations of queued songs in the background
+"""
+
+import time
+import asyncio
+import logging
+from typing import Dict, List, Optional, Set
+
+from .player_state import player, Song
+from .youtube import YouTubeExtractor
+from .extraction import ExtractionService, ExtractionCancelled
+from .failures import FailureCache
+from ..config import ENRICH_CONCURRENCY, ENRICH_WINDOW
+
+logger = logging.getLogger(__name__)
+
+# ExtractionService job group of the enrichment requests
+ENRICH_KEY = 'enrichment'
+
+# Seconds before a song that could not be resolved is tried again
+ENRICH_RETRY_SECONDS = 600
+
+
+class MetadataEnricher:
+    """
+    Fills in the durations flat playlist extraction left out
+    
+    Runs as one background task while upcoming songs lack a duration.
+    Only the ENRICH_WINDOW songs from current_index on (wrapping around)
+    are looked at, not the whole queue, so a large playlist does not turn
+    into thousands of requests. Each round picks the ENRICH_CONCURRENCY
+    songs that will play soonest, resolves them on the background
+    extraction pool and writes the results into the queue; the extractor
+    stores them in the metadata cache on the way. Rounds re-read
+    current_index, and every new song schedules the task again, so the
+    window moves along with playback.
+    """
+    
+    _task: Optional[asyncio.Task] = None
+    
+    # Video IDs being resolved, and ones that could not be resolved
+    # (with the time they may be tried again)
+    _in_flight: Set[str] = set()
+    _failed: Dict[str, float] = {}
+    
+    @staticmethod
+    def schedule():
+        """Start the background task if it is not running (call after queue changes)"""
+        if ENRICH_CONCURRENCY <= 0:
+            return
+        task = MetadataEnricher._task
+        if task is None or task.done():
+            MetadataEnricher._task = asyncio.create_task(MetadataEnricher._run())
+    
+    @staticmethod
+    def _needs_duration(song: Song) -> bool:
+        """Check if a song still has to be resolved"""
+        if song.duration_seconds is not None:
+            return False
+        video_id = song.video_id
+        if video_id is None or video_id in MetadataEnricher._in_flight:
+            return False
+        retry_at = MetadataEnricher._failed.get(video_id)
+        if retry_at is not None:
+            if retry_at > time.monotonic():
+                return False
+            del MetadataEnricher._failed[video_id]
+        return True
+    
+    @staticmethod
+    def _next_batch(limit: int) -> List[Song]:
+        """Get up to `limit` songs without duration in the window, nearest first"""
+        playlist = player.playlist
+        total = len(playlist)
+        start = player.current_index
+        batch = []
+        seen = set()
+        for offset in range(min(total, ENRICH_WINDOW)):
+            song = playlist[(start + offset) % total]
+            if MetadataEnricher._needs_duration(song) and song.video_id not in seen:
+                seen.add(song.video_id)
+                batch.append(song)
+                if len(batch) >= limit:
+                    break
+        return batch
+    
+    @staticmethod
+    async def _run():
+        """Resolve songs round by round until none is missing a duration"""
+        resolved = 0
+        while True:
+            batch = MetadataEnricher._next_batch(ENRICH_CONCURRENCY)
+            if not batch:
+                break
+            results = await asyncio.gather(*(MetadataEnricher._resolve(song) for song in batch))
+            resolved += sum(results)
+        if resolved:
+            logger.info(f"⏱️ Resolved {resolved} missing duration{'s' if resolved != 1 else ''}")
+    
+    @staticmethod
+    async def _resolve(song: Song) -> bool:
+        """Resolve one song and update every queued copy of it"""
+        video_id = song.video_id
+        MetadataEnricher._in_flight.add(video_id)
+        try:
+            info = await ExtractionService.run(YouTubeExtractor.get_video_info, song.url,
+                                               key=ENRICH_KEY, background=True)
+        except ExtractionCancelled:
+            return False
+        except Exception as e:
+            logger.debug(f"Could not resolve duration of '{song.title}': {e}")
+            info = None
+            # Private or removed songs are skipped when their turn comes;
+            # other errors may be transient and are left to mpv
+            reason = FailureCache.classify(str(e))
+            if reason != 'error':
+                FailureCache.mark(song, reason)
+        finally:
+            MetadataEnricher._in_flight.discard(video_id)
+        
+        if info is None or info.duration_seconds is None:
+            MetadataEnricher._failed[video_id] = time.monotonic() + ENRICH_RETRY_SECONDS
+            return False
+        
+        for queued in player.playlist.songs_with_id(video_id):
+            if queued.duration_seconds is None:
+                queued.duration = info.duration
+        song.duration = info.duration
+        return True
+    
+    @staticmethod
+    def cancel():
+        """Stop enriching (queue cleared or bot exiting)"""
+        if MetadataEnricher._task and not MetadataEnricher._task.done():
+            MetadataEnricher._task.cancel()
+        ExtractionService.cancel(ENRICH_KEY)
@@ -0,0 +1,227 @@
+"""
+Extraction Service Module
+Runs yt-dlp extraction on a bounded worker pool, off the event loop
+"""
+
+import asyncio
+import threading
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, List, Optional, Set, Tuple
+
+from .player_state import Song
+from .youtube import YouTubeExtractor
+from ..config import EXTRACTION_WORKERS, EXTRACTION_TIMEOUT, PLAYLIST_CHUNK_SIZE, ENRICH_CONCURRENCY
+
+logger = logging.getLogger(__name__)
+
+# Queue markers of stream_playlist()
+_STREAM_DONE = object()
+_STREAM_CANCELLED = object()
+
+
+class ExtractionError(Exception):
+    """Extraction did not produce a result"""
+
+
+class ExtractionTimeout(ExtractionError):
+    """Extraction took longer than allowed"""
+
+
+class ExtractionCancelled(ExtractionError):
+    """Extraction was cancelled by the user"""
+
+
+class ExtractionService:
+    """
+    Async front-end for YouTubeExtractor
+    
+    yt-dlp is blocking, so every call runs on a pool of EXTRACTION_WORKERS
+    threads and the handlers await the result. The event loop stays free
+    for other updates (Stop, Pause, volume) while a large playlist loads.
+    
+    Jobs are grouped by a key (the requesting user) so they can be
+    cancelled together. A job that has not started yet is dropped from
+    the pool; a running yt-dlp call cannot be interrupted, its thread
+    finishes in the background and the result is discarded.
+    
+    Background work (duration enrichment) runs on its own pool of
+    ENRICH_CONCURRENCY threads, so it never holds a worker that a user
+    request is waiting for.
+    """
+    
+    _executor = ThreadPoolExecutor(max_workers=EXTRACTION_WORKERS, thread_name_prefix="extract")
+    _background_executor = ThreadPoolExecutor(max_workers=max(1, ENRICH_CONCURRENCY), thread_name_prefix="extract-bg")
+    
+    # Futures still running per key, and the ones cancel() was called for
+    _jobs: Dict[Hashable, Set[asyncio.Future]] = {}
+    _cancelled: Set[asyncio.Future] = set()
+    
+    # (stop event, chunk queue) of running playlist streams per key
+    _streams: Dict[Hashable, Set[Tuple[threading.Event, asyncio.Queue]]] = {}
+    
+    @staticmethod
+    async def run(func: Callable, *args, key: Optional[Hashable] = None,
+                  timeout: float = EXTRACTION_TIMEOUT, background: bool = False) -> Any:
+        """
+        Run a blocking extraction function on the worker pool
+        
+        Args:
+            func: Blocking function to call
+            *args: Arguments for func
+            key: Job group for cancel(), e.g. the user ID
+            timeout: Seconds to wait for the result
+            background: Run on the background pool instead of the user one
+        
+        Returns:
+            Whatever func returns
+        
+        Raises:
+            ExtractionTimeout if the timeout expired
+            ExtractionCancelled if cancel() was called for the key
+            Any exception raised by func
+        """
+        loop = asyncio.get_running_loop()
+        executor = ExtractionService._background_executor if background else ExtractionService._executor
+        future = loop.run_in_executor(executor, func, *args)
+        ExtractionService._jobs.setdefault(key, set()).add(future)
+        
+        try:
+            return await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ Extraction timed out after {timeout:g}s")
+            raise ExtractionTimeout(f"Timed out after {timeout:g}s")
+        except asyncio.CancelledError:
+            if future in ExtractionService._cancelled:
+                raise ExtractionCancelled("Cancelled")
+            raise
+        finally:
+            ExtractionService._cancelled.discard(future)
+            jobs = ExtractionService._jobs.get(key)
+            if jobs is not None:
+                jobs.discard(future)
+                if not jobs:
+                    del ExtractionService._jobs[key]
+    
+    @staticmethod
+    def cancel(key: Hashable) -> int:
+        """
+        Cancel all pending extractions of a key
+        
+        Args:
+            key: Job group passed to run()
+        
+        Returns:
+            Number of jobs cancelled
+        """
+        count = 0
+        for future in list(ExtractionService._jobs.get(key, ())):
+            if not future.done():
+                ExtractionService._cancelled.add(future)
+                future.cancel()
+                count += 1
+        for stop, queue in ExtractionService._streams.get(key, ()):
+            if not stop.is_set():
+                stop.set()
+                queue.put_nowait(_STREAM_CANCELLED)
+                count += 1
+        if count:
+            logger.info(f"🛑 Cancelled {count} extraction job{'s' if count != 1 else ''}")
+        return count
+    
+    @staticmethod
+    async def stream_playlist(url: str, key: Optional[Hashable] = None,
+                              chunk_size: int = PLAYLIST_CHUNK_SIZE) -> AsyncIterator[List[Song]]:
+        """
+        Extract a playlist incrementally
+        
+        A worker thread walks YouTubeExtractor.iter_playlist and hands the
+        songs over in chunks. The first song comes alone so playback can
+        start right away, then chunk_size songs at a time. The timeout
+        applies to the wait for each chunk, not to the whole playlist.
+        
+        Args:
+            url: YouTube playlist or video URL
+            key: Job group for cancel(), e.g. the user ID
+            chunk_size: Songs per chunk after the first one
+        
+        Yields:
+            Lists of Song objects in playlist order
+        
+        Raises:
+            ExtractionTimeout if no chunk arrived within EXTRACTION_TIMEOUT
+            ExtractionCancelled if cancel() was called for the key
+            Any exception raised by the extractor
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        stop = threading.Event()
+        stream = (stop, queue)
+        
+        def put(item):
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                # Event loop already closed (bot shutting down)
+                stop.set()
+        
+        def produce():
+            chunk = []
+            limit = 1
+            try:
+                for song in YouTubeExtractor.iter_playlist(url):
+                    if stop.is_set():
+                        return
+                    chunk.append(song)
+                    if len(chunk) >= limit:
+                        put(chunk)
+                        chunk = []
+                        limit = chunk_size
+                if chunk:
+                    put(chunk)
+                put(_STREAM_DONE)
+            except Exception as e:
+                put(e)
+        
+        ExtractionService._streams.setdefault(key, set()).add(stream)
+        ExtractionService._executor.submit(produce)
+        
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), EXTRACTION_TIMEOUT)
+                except asyncio.TimeoutError:
+                    logger.warning(f"⏱️ No playlist entries for {EXTRACTION_TIMEOUT:g}s")
+                    raise ExtractionTimeout(f"Timed out after {EXTRACTION_TIMEOUT:g}s")
+                
+                if item is _STREAM_DONE:
+                    return
+                if item is _STREAM_CANCELLED:
+                    raise ExtractionCancelled("Cancelled")
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            # Also stops the producer when the consumer gives up early
+            stop.set()
+            streams = ExtractionService._streams.get(key)
+            if streams is not None:
+                streams.discard(stream)
+                if not streams:
+                    del ExtractionService._streams[key]
+    
+    @staticmethod
+    async def get_video_info(url: str, key: Optional[Hashable] = None) -> Song:
+        """Async YouTubeExtractor.get_video_info"""
+        return await ExtractionService.run(YouTubeExtractor.get_video_info, url, key=key)
+    
+    @staticmethod
+    async def get_related_videos(url: str, count: int = 5, key: Optional[Hashable] = None) -> List[Song]:
+        """Async YouTubeExtractor.get_related_videos"""
+        return await ExtractionService.run(YouTubeExtractor.get_related_videos, url, count, key=key)
+    
+    @staticmethod
+    def shutdown():
+        """Drop queued jobs and release both pools (called on bot exit)"""
+        ExtractionService._executor.shutdown(wait=False, cancel_futures=True)
+        ExtractionService._background_executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,123 @@
+"""
+Failure Cache Module
+Remembers videos that could not be played so the queue skips them
+"""
+
+import time
+import logging
+from typing import Dict, Optional, Tuple
+
+from .player_state import Song
+from .metadata_cache import metadata_cache
+
+logger = logging.getLogger(__name__)
+
+# How long a failure is remembered, by reason. Private, removed and
+# blocked videos rarely come back; other errors may be transient.
+FAILURE_TTL = {
+    'private': 7 * 24 * 3600,
+    'unavailable': 7 * 24 * 3600,
+    'region-blocked': 7 * 24 * 3600,
+    'age-restricted': 7 * 24 * 3600,
+    'error': 3600,
+}
+
+# Error message fragments (lowercase) mapped to a reason
+FAILURE_PATTERNS = (
+    ('private video', 'private'),
+    ('not available in your country', 'region-blocked'),
+    ('blocked it in your country', 'region-blocked'),
+    ('confirm your age', 'age-restricted'),
+    ('video unavailable', 'unavailable'),
+    ('has been removed', 'unavailable'),
+    ('account associated with this video has been terminated', 'unavailable'),
+)
+
+# Titles of flat playlist entries that cannot be played
+UNAVAILABLE_TITLES = {
+    '[Private video]': 'private',
+    '[Deleted video]': 'unavailable',
+}
+
+
+class FailureCache:
+    """
+    Video IDs that failed to play, with the reason and an expiry
+    
+    Checked before a queued song is handed to mpv or prefetched, so known
+    bad songs cost neither a process nor a network request. Kept in memory
+    for the per-song checks and mirrored to the metadata cache so the
+    knowledge survives restarts.
+    """
+    
+    _entries: Dict[str, Tuple[str, float]] = {}
+    _loaded = False
+    
+    @staticmethod
+    def _load():
+        """Read the stored failures on first use"""
+        if not FailureCache._loaded:
+            FailureCache._loaded = True
+            FailureCache._entries.update(metadata_cache.get_failures())
+    
+    @staticmethod
+    def classify(message: str) -> str:
+        """
+        Map an error message to a failure reason
+        
+        Args:
+            message: Error text from yt-dlp or mpv
+        
+        Returns:
+            Key of FAILURE_TTL
+        """
+        lowered = (message or '').lower()
+        for fragment, reason in FAILURE_PATTERNS:
+            if fragment in lowered:
+                return reason
+        return 'error'
+    
+    @staticmethod
+    def mark(song: Song, reason: str):
+        """
+        Remember that a song cannot be played
+        
+        Args:
+            song: Song that failed
+            reason: Key of FAILURE_TTL
+        """
+        video_id = song.video_id
+        if not video_id:
+            return
+        FailureCache._load()
+        expires_at = time.time() + FAILURE_TTL.get(reason, FAILURE_TTL['error'])
+        FailureCache._entries[video_id] = (reason, expires_at)
+        metadata_cache.put_failure(video_id, reason, expires_at)
+        logger.info(f"🚫 Marked as failing ({reason}): {song.title}")
+    
+    @staticmethod
+    def get(song: Song) -> Optional[str]:
+        """
+        Get why a song is known to fail
+        
+        Args:
+            song: Song to check
+        
+        Returns:
+            Failure reason, or None if the song is not known to fail
+        """
+        FailureCache._load()
+        entry = FailureCache._entries.get(song.video_id)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            del FailureCache._entries[song.video_id]
+            return None
+        return entry[0]
+    
+    @staticmethod
+    def clear(song: Song):
+        """Forget the failure of a song, e.g. when it played fine after all"""
+        FailureCache._load()
+        if FailureCache._entries.pop(song.video_id, None) is not None:
+            metadata_cache.delete_failure(song.video_id)
@@ -0,0 +1,404 @@
+"""
+Metadata Cache Module
+Persistent SQLite cache of resolved video and playlist metadata
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import logging
+from typing import Dict, List, Optional, Tuple
+
+from .player_state import Song
+from ..config import (
+    METADATA_CACHE_ENABLED,
+    METADATA_CACHE_PATH,
+    METADATA_CACHE_SIZE,
+    METADATA_TTL_HOURS,
+)
+
+logger = logging.getLogger(__name__)
+
+# Related videos and playlist contents change faster than titles
+RELATED_TTL = 24 * 3600
+PLAYLIST_TTL = 6 * 3600
+
+# Writes between two LRU eviction passes
+EVICT_EVERY = 100
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    duration TEXT NOT NULL,
+    channel_id TEXT,
+    channel TEXT,
+    fetched_at REAL NOT NULL,
+    related TEXT,
+    related_at REAL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS videos_accessed ON videos (accessed_at);
+CREATE TABLE IF NOT EXISTS playlists (
+    playlist_id TEXT PRIMARY KEY,
+    video_ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS failures (
+    video_id TEXT PRIMARY KEY,
+    reason TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS channels (
+    channel_id TEXT PRIMARY KEY,
+    video_ids TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class MetadataCache:
+    """
+    Video metadata keyed by video ID, stored in SQLite
+    
+    Holds title, duration, channel and the related video IDs of every
+    video the bot resolved, plus the video IDs of loaded playlists and
+    the newest uploads of channels used for suggestions and the videos
+    that failed to play.
+    Entries expire after their TTL; when the cache grows beyond
+    METADATA_CACHE_SIZE videos the least recently used ones are evicted.
+    
+    The extractor calls it from the worker pool, so one connection is
+    shared behind a lock. Read timestamps are buffered in memory and
+    written together with the next write, a hit never touches the disk.
+    """
+    
+    def __init__(self, path: str, max_entries: int, ttl: float):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._touched: Dict[str, float] = {}
+        self._writes = 0
+        self._db: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use"""
+        if self._db is None:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.executescript(SCHEMA)
+                self._db = db
+                logger.info(f"💾 Metadata cache: {self.path}")
+            except sqlite3.Error as e:
+                logger.error(f"❌ Could not open metadata cache: {e}")
+        return self._db
+    
+    def get(self, video_id: Optional[str]) -> Optional[Song]:
+        """
+        Look up a video
+        
+        Args:
+            video_id: YouTube video ID
+        
+        Returns:
+            Song or None if not cached or expired
+        """
+        if not video_id:
+            return None
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT title, duration FROM videos WHERE video_id = ? AND fetched_at > ?",
+                (video_id, time.time() - self.ttl)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touched[video_id] = time.time()
+        return Song(url=f"https://www.youtube.com/watch?v={video_id}", title=row[0], duration=row[1])
+    
+    def get_many(self, video_ids: List[str]) -> Optional[List[Song]]:
+        """
+        Look up several videos at once
+        
+        Args:
+            video_ids: YouTube video IDs
+        
+        Returns:
+            Songs in the given order, or None if any of them is missing
+        """
+        songs = []
+        for video_id in video_ids:
+            song = self.get(video_id)
+            if song is None:
+                return None
+            songs.append(song)
+        return songs
+    
+    def put(self, video_id: Optional[str], title: str, duration: str,
+            channel_id: Optional[str] = None, channel: Optional[str] = None):
+        """
+        Store or refresh a video
+        
+        Args:
+            video_id: YouTube video ID
+            title: Video title
+            duration: Duration as stored in Song.duration
+            channel_id: Uploader channel ID if known
+            channel: Uploader name if known
+        """
+        if video_id:
+            self.put_many([(video_id, title, duration, channel_id, channel)])
+    
+    def put_many(self, rows: List[tuple]):
+        """
+        Store or refresh several videos in one transaction
+        
+        Args:
+            rows: (video_id, title, duration, channel_id, channel) tuples
+        """
+        if not rows:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            # A known duration, channel fields and related IDs survive a
+            # refresh from a flat playlist entry that does not carry them
+            db.executemany(
+                "INSERT INTO videos (video_id, title, duration, channel_id, channel, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title, "
+                "duration = CASE WHEN excluded.duration IN ('None', 'Unknown', '') "
+                "THEN duration ELSE excluded.duration END, "
+                "channel_id = COALESCE(excluded.channel_id, channel_id), "
+                "channel = COALESCE(excluded.channel, channel), "
+                "fetched_at = excluded.fetched_at, accessed_at = excluded.accessed_at",
+                [(v, t, d, ci, c, now, now) for v, t, d, ci, c in rows]
+            )
+            self._after_write(db, len(rows))
+    
+    def get_related(self, video_id: Optional[str]) -> Optional[List[str]]:
+        """Get the cached related video IDs of a video, None if stale"""
+        if not video_id:
+            return None
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT related FROM videos WHERE video_id = ? AND related_at > ?",
+                (video_id, time.time() - RELATED_TTL)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+    
+    def put_related(self, video_id: Optional[str], related_ids: List[str]):
+        """Store the related video IDs of a cached video"""
+        if not video_id:
+            return
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "UPDATE videos SET related = ?, related_at = ? WHERE video_id = ?",
+                (json.dumps(related_ids), time.time(), video_id)
+            )
+            self._after_write(db, 1)
+    
+    def get_playlist(self, playlist_id: Optional[str]) -> Optional[List[Song]]:
+        """
+        Look up a playlist
+        
+        Args:
+            playlist_id: YouTube playlist ID
+        
+        Returns:
+            Songs of the playlist or None if not cached, expired or incomplete
+        """
+        if not playlist_id:
+            return None
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT video_ids FROM playlists WHERE playlist_id = ? AND fetched_at > ?",
+                (playlist_id, time.time() - PLAYLIST_TTL)
+            ).fetchone()
+        if row is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        return self.get_many(json.loads(row[0]))
+    
+    def put_playlist(self, playlist_id: Optional[str], video_ids: List[str]):
+        """Store the video IDs of a playlist (videos are stored with put_many)"""
+        if not playlist_id:
+            return
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO playlists (playlist_id, video_ids, fetched_at) VALUES (?, ?, ?)",
+                (playlist_id, json.dumps(video_ids), time.time())
+            )
+            self._after_write(db, 1)
+    
+    def get_channel(self, channel_id: Optional[str]) -> Optional[Tuple[List[str], float]]:
+        """
+        Look up the newest uploads of a channel
+        
+        Args:
+            channel_id: YouTube channel ID
+        
+        Returns:
+            (video IDs newest first, time of the last check) or None
+        """
+        if not channel_id:
+            return None
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return None
+            row = db.execute(
+                "SELECT video_ids, fetched_at FROM channels WHERE channel_id = ? AND fetched_at > ?",
+                (channel_id, time.time() - self.ttl)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+    
+    def put_channel(self, channel_id: Optional[str], video_ids: List[str]):
+        """Store the newest uploads of a channel (videos are stored with put_many)"""
+        if not channel_id:
+            return
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO channels (channel_id, video_ids, fetched_at) VALUES (?, ?, ?)",
+                (channel_id, json.dumps(video_ids), time.time())
+            )
+            self._after_write(db, 1)
+    
+    def get_failures(self) -> Dict[str, Tuple[str, float]]:
+        """Get all unexpired failures as {video_id: (reason, expires_at)}"""
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return {}
+            rows = db.execute(
+                "SELECT video_id, reason, expires_at FROM failures WHERE expires_at > ?",
+                (time.time(),)
+            ).fetchall()
+        return {video_id: (reason, expires_at) for video_id, reason, expires_at in rows}
+    
+    def put_failure(self, video_id: Optional[str], reason: str, expires_at: float):
+        """Store why a video could not be played and until when to skip it"""
+        if not video_id:
+            return
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute(
+                "INSERT OR REPLACE INTO failures (video_id, reason, expires_at) VALUES (?, ?, ?)",
+                (video_id, reason, expires_at)
+            )
+            self._after_write(db, 1)
+    
+    def delete_failure(self, video_id: Optional[str]):
+        """Forget a recorded failure"""
+        if not video_id:
+            return
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            db.execute("DELETE FROM failures WHERE video_id = ?", (video_id,))
+            self._after_write(db, 1)
+    
+    def _after_write(self, db: sqlite3.Connection, count: int):
+        """Flush read timestamps, evict the LRU tail now and then, commit"""
+        if self._touched:
+            db.executemany(
+                "UPDATE videos SET accessed_at = ? WHERE video_id = ?",
+                [(t, v) for v, t in self._touched.items()]
+            )
+            self._touched.clear()
+        
+        self._writes += count
+        if self._writes >= EVICT_EVERY:
+            self._writes = 0
+            self._evict(db)
+        db.commit()
+    
+    def _evict(self, db: sqlite3.Connection):
+        """Drop expired entries and the least recently used beyond the limit"""
+        now = time.time()
+        db.execute("DELETE FROM videos WHERE fetched_at <= ?", (now - self.ttl,))
+        db.execute("DELETE FROM playlists WHERE fetched_at <= ?", (now - PLAYLIST_TTL,))
+        db.execute("DELETE FROM channels WHERE fetched_at <= ?", (now - self.ttl,))
+        db.execute("DELETE FROM failures WHERE expires_at <= ?", (now,))
+        excess = db.execute("SELECT COUNT(*) FROM videos").fetchone()[0] - self.max_entries
+        if excess > 0:
+            db.execute(
+                "DELETE FROM videos WHERE video_id IN "
+                "(SELECT video_id FROM videos ORDER BY accessed_at LIMIT ?)",
+                (excess,)
+            )
+            logger.debug(f"Evicted {excess} cached videos")
+    
+    def stats(self) -> dict:
+        """Get entry count and hit/miss counters"""
+        with self._lock:
+            db = self._connect()
+            entries = db.execute("SELECT COUNT(*) FROM videos").fetchone()[0] if db else 0
+        lookups = self.hits + self.misses
+        return {
+            'entries': entries,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+        }
+    
+    def close(self):
+        """Flush pending read timestamps and close the database"""
+        with self._lock:
+            if self._db is None:
+                return
+            self._after_write(self._db, 0)
+            self._db.close()
+            self._db = None
+
+
+class _DisabledCache(MetadataCache):
+    """Stand-in when METADATA_CACHE is off, every lookup misses"""
+    
+    def _connect(self):
+        return None
+
+
+# Global metadata cache instance
+metadata_cache = (MetadataCache if METADATA_CACHE_ENABLED else _DisabledCache)(
+    METADATA_CACHE_PATH, METADATA_CACHE_SIZE, METADATA_TTL_HOURS * 3600
+)
@@ -0,0 +1,298 @@
+"""
+System Mixer Module
+Pluggable backends for the system volume fallback
+"""
+
+import re
+import ctypes
+import ctypes.util
+import shutil
+import subprocess
+import logging
+from typing import Optional, Tuple
+
+from ..config import MIXER_BACKEND
+
+logger = logging.getLogger(__name__)
+
+# Mixer control driven by every backend
+MIXER_CONTROL = 'Master'
+
+
+class MixerBackend:
+    """
+    Base class for system mixer backends
+    
+    set() and get() work on percentages (0-100) and a mute flag.
+    Backends with blocking = True must be called from an executor.
+    """
+    
+    name = 'none'
+    blocking = False
+    
+    def set(self, volume: Optional[int] = None, muted: Optional[bool] = None) -> bool:
+        """
+        Apply volume and/or mute
+        
+        Args:
+            volume: Volume level (0-100), None to keep
+            muted: Mute state, None to keep
+        
+        Returns:
+            True if successful
+        """
+        return False
+    
+    def get(self) -> Optional[Tuple[int, bool]]:
+        """Get (volume, muted) or None if unknown"""
+        return None
+    
+    def close(self):
+        """Release backend resources"""
+
+
+class AlsaMixerBackend(MixerBackend):
+    """
+    In-process ALSA simple mixer through libasound via ctypes
+    
+    Opens the mixer once and keeps the handle, so every operation is a
+    couple of library calls instead of a process spawn. Attaching to the
+    'pulse' device drives PulseAudio/PipeWire through the ALSA plugin,
+    the same control 'amixer -D pulse' uses.
+    """
+    
+    name = 'alsa'
+    
+    def __init__(self, device: str):
+        self.device = device
+        self._lib = None
+        self._handle = ctypes.c_void_p()
+        self._elem = None
+        self._min = 0
+        self._max = 0
+        
+        path = ctypes.util.find_library('asound')
+        if not path:
+            raise OSError("libasound not found")
+        lib = ctypes.CDLL(path)
+        
+        lib.snd_mixer_find_selem.restype = ctypes.c_void_p
+        lib.snd_mixer_find_selem.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+        for fn in ('snd_mixer_attach', 'snd_mixer_load', 'snd_mixer_close',
+                   'snd_mixer_handle_events', 'snd_mixer_selem_register'):
+            getattr(lib, fn).restype = ctypes.c_int
+        lib.snd_mixer_attach.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.snd_mixer_selem_register.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p]
+        lib.snd_mixer_load.argtypes = [ctypes.c_void_p]
+        lib.snd_mixer_close.argtypes = [ctypes.c_void_p]
+        lib.snd_mixer_handle_events.argtypes = [ctypes.c_void_p]
+        lib.snd_mixer_selem_id_set_name.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+        lib.snd_mixer_selem_id_set_index.argtypes = [ctypes.c_void_p, ctypes.c_uint]
+        lib.snd_mixer_selem_id_free.argtypes = [ctypes.c_void_p]
+        lib.snd_mixer_selem_get_playback_volume_range.argtypes = [
+            ctypes.c_void_p, ctypes.POINTER(ctypes.c_long), ctypes.POINTER(ctypes.c_long)
+        ]
+        lib.snd_mixer_selem_set_playback_volume_all.argtypes = [ctypes.c_void_p, ctypes.c_long]
+        lib.snd_mixer_selem_get_playback_volume.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_long)
+        ]
+        lib.snd_mixer_selem_has_playback_switch.argtypes = [ctypes.c_void_p]
+        lib.snd_mixer_selem_set_playback_switch_all.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        lib.snd_mixer_selem_get_playback_switch.argtypes = [
+            ctypes.c_void_p, ctypes.c_int, ctypes.POINTER(ctypes.c_int)
+        ]
+        self._lib = lib
+        
+        if lib.snd_mixer_open(ctypes.byref(self._handle), 0) < 0:
+            raise OSError("snd_mixer_open failed")
+        try:
+            if lib.snd_mixer_attach(self._handle, device.encode()) < 0:
+                raise OSError(f"snd_mixer_attach({device}) failed")
+            if lib.snd_mixer_selem_register(self._handle, None, None) < 0:
+                raise OSError("snd_mixer_selem_register failed")
+            if lib.snd_mixer_load(self._handle) < 0:
+                raise OSError("snd_mixer_load failed")
+            
+            sid = ctypes.c_void_p()
+            lib.snd_mixer_selem_id_malloc(ctypes.byref(sid))
+            lib.snd_mixer_selem_id_set_index(sid, 0)
+            lib.snd_mixer_selem_id_set_name(sid, MIXER_CONTROL.encode())
+            self._elem = lib.snd_mixer_find_selem(self._handle, sid)
+            lib.snd_mixer_selem_id_free(sid)
+            if not self._elem:
+                raise OSError(f"No '{MIXER_CONTROL}' control on {device}")
+            
+            low, high = ctypes.c_long(), ctypes.c_long()
+            lib.snd_mixer_selem_get_playback_volume_range(self._elem, ctypes.byref(low), ctypes.byref(high))
+            self._min, self._max = low.value, high.value
+            if self._max <= self._min:
+                raise OSError(f"'{MIXER_CONTROL}' on {device} has no volume range")
+        except OSError:
+            self.close()
+            raise
+    
+    def set(self, volume: Optional[int] = None, muted: Optional[bool] = None) -> bool:
+        lib = self._lib
+        # Pick up changes other programs made since the last call
+        lib.snd_mixer_handle_events(self._handle)
+        if volume is not None:
+            # Linear raw mapping, as 'amixer sset Master N%'
+            raw = self._min + round((self._max - self._min) * volume / 100)
+            if lib.snd_mixer_selem_set_playback_volume_all(self._elem, raw) < 0:
+                return False
+        if muted is not None and lib.snd_mixer_selem_has_playback_switch(self._elem):
+            if lib.snd_mixer_selem_set_playback_switch_all(self._elem, 0 if muted else 1) < 0:
+                return False
+        return True
+    
+    def get(self) -> Optional[Tuple[int, bool]]:
+        lib = self._lib
+        lib.snd_mixer_handle_events(self._handle)
+        raw = ctypes.c_long()
+        if lib.snd_mixer_selem_get_playback_volume(self._elem, 0, ctypes.byref(raw)) < 0:
+            return None
+        volume = round((raw.value - self._min) * 100 / (self._max - self._min))
+        muted = False
+        if lib.snd_mixer_selem_has_playback_switch(self._elem):
+            switch = ctypes.c_int()
+            lib.snd_mixer_selem_get_playback_switch(self._elem, 0, ctypes.byref(switch))
+            muted = switch.value == 0
+        return volume, muted
+    
+    def close(self):
+        if self._lib and self._handle:
+            self._lib.snd_mixer_close(self._handle)
+            self._handle = ctypes.c_void_p()
+
+
+class SubprocessMixerBackend(MixerBackend):
+    """
+    amixer/pactl fallback
+    
+    The working command is probed once, every operation is then a single
+    process spawn.
+    """
+    
+    name = 'amixer'
+    blocking = True
+    
+    def __init__(self):
+        self._amixer = None
+        for prefix in (['amixer', '-D', 'pulse'], ['amixer']):
+            if not shutil.which('amixer'):
+                break
+            result = subprocess.run(
+                prefix + ['sget', MIXER_CONTROL], capture_output=True, text=True, timeout=2
+            )
+            if result.returncode == 0:
+                self._amixer = prefix
+                break
+        
+        if self._amixer:
+            self.name = ' '.join(self._amixer)
+        elif shutil.which('pactl'):
+            self.name = 'pactl'
+        else:
+            raise OSError("Neither amixer nor pactl is available")
+    
+    def set(self, volume: Optional[int] = None, muted: Optional[bool] = None) -> bool:
+        try:
+            if self._amixer:
+                values = []
+                if volume is not None:
+                    values.append(f'{volume}%')
+                if muted is not None:
+                    values.append('mute' if muted else 'unmute')
+                result = subprocess.run(
+                    self._amixer + ['sset', MIXER_CONTROL] + values,
+                    capture_output=True, text=True, timeout=2
+                )
+                if result.returncode != 0:
+                    logger.warning(f"amixer failed: {result.stderr.strip()}")
+                return result.returncode == 0
+            
+            ok = True
+            if volume is not None:
+                result = subprocess.run(
+                    ['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{volume}%'],
+                    capture_output=True, text=True, timeout=2
+                )
+                ok = ok and result.returncode == 0
+            if muted is not None:
+                result = subprocess.run(
+                    ['pactl', 'set-sink-mute', '@DEFAULT_SINK@', '1' if muted else '0'],
+                    capture_output=True, text=True, timeout=2
+                )
+                ok = ok and result.returncode == 0
+            return ok
+        except Exception as e:
+            logger.error(f"❌ Error running {self.name}: {e}")
+            return False
+    
+    def get(self) -> Optional[Tuple[int, bool]]:
+        try:
+            if self._amixer:
+                result = subprocess.run(
+                    self._amixer + ['sget', MIXER_CONTROL], capture_output=True, text=True, timeout=2
+                )
+                if result.returncode != 0:
+                    return None
+                # "Front Left: Playback 42000 [64%] [on]"
+                volume = re.search(r'\[(\d+)%\]', result.stdout)
+                if not volume:
+                    return None
+                return int(volume.group(1)), '[off]' in result.stdout
+            
+            volume = subprocess.run(
+                ['pactl', 'get-sink-volume', '@DEFAULT_SINK@'], capture_output=True, text=True, timeout=2
+            )
+            mute = subprocess.run(
+                ['pactl', 'get-sink-mute', '@DEFAULT_SINK@'], capture_output=True, text=True, timeout=2
+            )
+            # "Volume: front-left: 42000 /  64% / ..." and "Mute: no"
+            match = re.search(r'(\d+)%', volume.stdout)
+            if volume.returncode != 0 or not match:
+                return None
+            return int(match.group(1)), 'yes' in mute.stdout
+        except Exception as e:
+            logger.error(f"❌ Error running {self.name}: {e}")
+            return None
+
+
+def detect_mixer() -> MixerBackend:
+    """
+    Pick the system mixer backend
+    
+    MIXER_BACKEND selects 'alsa', 'amixer' or 'auto' (in-process ALSA on
+    the pulse device, then the default device, then amixer/pactl).
+    
+    Returns:
+        The first backend that initialises, or a no-op MixerBackend
+    """
+    candidates = []
+    if MIXER_BACKEND in ('auto', 'alsa'):
+        candidates += [lambda: AlsaMixerBackend('pulse'), lambda: AlsaMixerBackend('default')]
+    if MIXER_BACKEND in ('auto', 'amixer'):
+        candidates.append(SubprocessMixerBackend)
+    
+    for create in candidates:
+        try:
+            backend = create()
+            logger.info(f"🔊 System mixer backend: {backend.name}")
+            return backend
+        except Exception as e:
+            logger.debug(f"Mixer backend unavailable: {e}")
+    
+    logger.warning("⚠️ No system mixer available, volume works only while mpv is running")
+    return MixerBackend()
+
+
+_mixer: Optional[MixerBackend] = None
+
+
+def get_mixer() -> MixerBackend:
+    """Get the system mixer backend, detected on first use"""
+    global _mixer
+    if _mixer is None:
+        _mixer = detect_mixer()
+    return _mixer
@@ -0,0 +1,308 @@
+"""
+MPV IPC Client Module
+Asyncio client for mpv's JSON IPC protocol over a persistent connection
+"""
+
+import asyncio
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Default seconds to wait for a command reply
+COMMAND_TIMEOUT = 5.0
+
+
+class MPVIPCError(Exception):
+    """Raised when an mpv command fails or the connection is unavailable"""
+
+
+def _command_name(command) -> str:
+    """Get the command name of a positional or named-argument command"""
+    if isinstance(command, dict):
+        return command.get('name', '')
+    return command[0] if command else ''
+
+
+class MPVIPCClient:
+    """
+    Persistent asyncio connection to mpv's --input-ipc-server socket
+    
+    Every command is tagged with a request_id and answered through its own
+    future, so callers get the real reply without blocking the event loop.
+    Asynchronous mpv events are dispatched to handlers registered with
+    on_event(), property-change events to handlers registered with
+    on_property().
+    """
+    
+    def __init__(self):
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._read_task: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_request_id = 1
+        self._event_handlers: Dict[str, List[Callable]] = {}
+        self._property_handlers: Dict[str, List[Callable]] = {}
+        self._observed: Dict[str, int] = {}
+        self._property_waiters: Dict[str, List[asyncio.Future]] = {}
+        self._write_lock = asyncio.Lock()
+        self._shutdown_seen = False
+    
+    @property
+    def connected(self) -> bool:
+        """Check if the IPC connection is open"""
+        return self._writer is not None and not self._writer.is_closing()
+    
+    async def connect(self, path: str, timeout: float = 5.0):
+        """
+        Connect to the mpv IPC socket, retrying until it accepts
+        
+        Properties registered with observe_property() on a previous
+        connection are observed again on the new one.
+        
+        Args:
+            path: Path of the mpv IPC socket
+            timeout: Seconds to keep retrying before giving up
+        
+        Raises:
+            MPVIPCError if the socket could not be connected
+        """
+        await self.close()
+        
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            try:
+                self._reader, self._writer = await asyncio.open_unix_connection(path)
+                break
+            except (FileNotFoundError, ConnectionRefusedError) as e:
+                if loop.time() > deadline:
+                    raise MPVIPCError(f"Could not connect to mpv IPC socket: {e}")
+                await asyncio.sleep(0.05)
+        
+        self._shutdown_seen = False
+        self._read_task = asyncio.create_task(self._read_loop())
+        logger.debug(f"Connected to MPV IPC socket: {path}")
+        
+        # Restore property observers
+        for name, observer_id in self._observed.items():
+            await self.command("observe_property", observer_id, name)
+    
+    async def close(self):
+        """Close the connection and fail all pending commands"""
+        if self._read_task:
+            self._read_task.cancel()
+            self._read_task = None
+        if self._writer:
+            try:
+                self._writer.close()
+            except Exception:
+                pass
+        self._reader = None
+        self._writer = None
+        self._fail_pending(MPVIPCError("MPV IPC connection closed"))
+    
+    def on_event(self, event: str, handler: Callable):
+        """
+        Register a handler for an mpv event (e.g. 'end-file', 'idle')
+        
+        Handlers receive the event dict. Coroutine handlers are scheduled
+        as tasks so they never block the reader. A 'shutdown' event is
+        also dispatched when the connection drops without one.
+        """
+        self._event_handlers.setdefault(event, []).append(handler)
+    
+    def on_property(self, name: str, handler: Callable):
+        """Register a handler called with the new value of an observed property"""
+        self._property_handlers.setdefault(name, []).append(handler)
+    
+    def expect_property(self, name: str) -> asyncio.Future:
+        """
+        Get a future resolved with the next change of an observed property
+        
+        Create it before sending the command that changes the property so
+        the confirming property-change event cannot be missed.
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._property_waiters.setdefault(name, []).append(future)
+        return future
+    
+    async def command(self, *args, timeout: float = COMMAND_TIMEOUT) -> Any:
+        """
+        Send a command and wait for its reply
+        
+        Args:
+            *args: Command name followed by its arguments, or a single
+                dict with named arguments ({"name": "loadfile", ...})
+            timeout: Seconds to wait for the reply
+        
+        Returns:
+            The 'data' field of the reply (None for commands without data)
+        
+        Raises:
+            MPVIPCError if mpv reports an error or does not answer
+        """
+        command = args[0] if len(args) == 1 and isinstance(args[0], dict) else list(args)
+        futures = await self._send(command)
+        return await self._wait_reply(futures[0], _command_name(command), timeout)
+    
+    async def command_batch(self, commands: List[list], timeout: float = COMMAND_TIMEOUT) -> List[Any]:
+        """
+        Pipeline a burst of commands in one write and collect all replies
+        
+        Args:
+            commands: List of commands, each a list of name and arguments
+                or a dict with named arguments
+            timeout: Seconds to wait for all replies
+        
+        Returns:
+            List with the reply data, or the MPVIPCError, for each command
+        """
+        futures = await self._send(*commands)
+        
+        async def collect(future, command):
+            try:
+                return await self._wait_reply(future, _command_name(command), timeout)
+            except MPVIPCError as e:
+                return e
+        
+        return await asyncio.gather(*(
+            collect(future, command) for future, command in zip(futures, commands)
+        ))
+    
+    async def get_property(self, name: str) -> Any:
+        """Read a property value"""
+        return await self.command("get_property", name)
+    
+    async def set_property(self, name: str, value: Any):
+        """Set a property value"""
+        await self.command("set_property", name, value)
+    
+    async def observe_property(self, name: str):
+        """
+        Start observing a property
+        
+        Changes are delivered to handlers registered with on_property().
+        """
+        if name in self._observed:
+            return
+        observer_id = len(self._observed) + 1
+        self._observed[name] = observer_id
+        if self.connected:
+            await self.command("observe_property", observer_id, name)
+    
+    async def _send(self, *commands: list):
+        """Write one or more commands and return their reply futures"""
+        if not self.connected:
+            raise MPVIPCError("MPV IPC not connected")
+        
+        loop = asyncio.get_running_loop()
+        futures = []
+        payload = b''
+        for command in commands:
+            request_id = self._next_request_id
+            self._next_request_id += 1
+            future = loop.create_future()
+            self._pending[request_id] = future
+            futures.append(future)
+            message = {"command": command, "request_id": request_id}
+            payload += json.dumps(message).encode('utf-8') + b'\n'
+        
+        async with self._write_lock:
+            try:
+                self._writer.write(payload)
+                await self._writer.drain()
+            except Exception as e:
+                for future in futures:
+                    future.cancel()
+                raise MPVIPCError(f"Error writing to MPV IPC: {e}")
+        
+        return futures
+    
+    async def _wait_reply(self, future: asyncio.Future, name: str, timeout: float) -> Any:
+        """Wait for a reply future and unwrap it"""
+        try:
+            reply = await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self._pending = {k: f for k, f in self._pending.items() if not f.done()}
+            raise MPVIPCError(f"MPV did not answer '{name}' in {timeout}s")
+        except asyncio.CancelledError:
+            if future.cancelled():
+                raise MPVIPCError("MPV IPC connection closed")
+            raise
+        
+        if reply.get('error') != 'success':
+            raise MPVIPCError(f"MPV command '{name}' failed: {reply.get('error')}")
+        return reply.get('data')
+    
+    async def _read_loop(self):
+        """Read replies and events until the connection drops"""
+        try:
+            while True:
+                line = await self._reader.readline()
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    logger.debug(f"Ignoring malformed MPV message: {line!r}")
+                    continue
+                self._dispatch(message)
+        except asyncio.CancelledError:
+            return
+        except Exception as e:
+            logger.error(f"Error reading from MPV IPC: {e}")
+        
+        logger.info("MPV IPC connection lost")
+        self._writer = None
+        self._read_task = None
+        self._fail_pending(MPVIPCError("MPV IPC connection lost"))
+        
+        # mpv crashed or was killed without saying goodbye
+        if not self._shutdown_seen:
+            self._dispatch({"event": "shutdown"})
+    
+    def _dispatch(self, message: dict):
+        """Route a decoded message to its future or event handlers"""
+        if 'request_id' in message and 'event' not in message:
+            future = self._pending.pop(message['request_id'], None)
+            if future and not future.done():
+                future.set_result(message)
+            return
+        
+        event = message.get('event')
+        if not event:
+            return
+        if event == 'shutdown':
+            self._shutdown_seen = True
+        
+        if event == 'property-change':
+            name = message.get('name')
+            for future in self._property_waiters.pop(name, []):
+                if not future.done():
+                    future.set_result(message.get('data'))
+            handlers = self._property_handlers.get(name, [])
+            args = (message.get('data'),)
+        else:
+            handlers = self._event_handlers.get(event, [])
+            args = (message,)
+        
+        for handler in handlers:
+            try:
+                result = handler(*args)
+                if asyncio.iscoroutine(result):
+                    asyncio.create_task(result)
+            except Exception as e:
+                logger.error(f"Error in MPV '{event}' handler: {e}")
+    
+    def _fail_pending(self, error: Exception):
+        """Fail every command still waiting for a reply"""
+        pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+# Global IPC client instance
+mpv_ipc = MPVIPCClient()
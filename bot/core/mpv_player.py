@@ -4,15 +4,13 @@ Handles all MPV process management
 """
 
 import os
-import signal
+import asyncio
 import subprocess
 import logging
-import json
-import socket
-from typing import Optional
-from pathlib import Path
+from typing import Any, Optional
 
 from .player_state import player
+from .mpv_ipc import mpv_ipc, MPVIPCError
 from ..config import MPV_OPTIONS
 
 logger = logging.getLogger(__name__)
@@ -21,22 +19,93 @@ logger = logging.getLogger(__name__)
 import getpass
 IPC_SOCKET = f"/tmp/mpvsocket_{getpass.getuser()}_{os.getpid()}"
 
+# Seconds to wait for the IPC socket after spawning mpv
+SOCKET_WAIT_TIMEOUT = 5.0
+
+# Seconds to wait for mpv to confirm a property change
+PROPERTY_CONFIRM_TIMEOUT = 1.0
+
+# PlayerState attributes the observers keep in sync with mpv properties
+CACHED_PROPERTIES = {'pause': 'is_paused', 'mute': 'is_muted', 'volume': 'volume'}
+
+# Modes accepted by MPVPlayer.seek()
+SEEK_MODES = ('relative', 'absolute', 'absolute-percent')
+
 
 class MPVPlayer:
     """MPV player controller"""
     
     @staticmethod
-    def start(url: str, volume: int = 50) -> Optional[subprocess.Popen]:
+    def _build_command(volume: int, socket_path: str = IPC_SOCKET) -> list:
         """
-        Start mpv process for streaming
+        Build the mpv command line for a persistent idle instance
         
         Args:
-            url: YouTube video URL
-            volume: Volume level (0-100)
+            volume: Initial volume level (0-100)
+            socket_path: IPC socket the instance listens on
+        
+        Returns:
+            List of command line arguments
+        """
+        cmd = ['mpv']
+        
+        # Stay alive between tracks, songs are switched with loadfile
+        cmd.append('--idle=yes')
+        cmd.append('--keep-open=no')
+        
+        # Add IPC socket for control
+        cmd.append(f'--input-ipc-server={socket_path}')
+        
+        # Add boolean flags
+        if MPV_OPTIONS.get('no_video', True):
+            cmd.append('--no-video')
+        if MPV_OPTIONS.get('no_terminal', True):
+            cmd.append('--no-terminal')
+        if MPV_OPTIONS.get('quiet', True):
+            cmd.append('--quiet')
+        
+        # Add volume
+        cmd.append(f'--volume={volume}')
+        
+        # Add optional parameters
+        if MPV_OPTIONS.get('demuxer_max_bytes'):
+            cmd.append(f'--demuxer-max-bytes={MPV_OPTIONS["demuxer_max_bytes"]}')
+        if MPV_OPTIONS.get('demuxer_max_back_bytes'):
+            cmd.append(f'--demuxer-max-back-bytes={MPV_OPTIONS["demuxer_max_back_bytes"]}')
+        if MPV_OPTIONS.get('prefetch_playlist'):
+            cmd.append('--prefetch-playlist=yes')
+        if MPV_OPTIONS.get('gapless_audio'):
+            cmd.append(f'--gapless-audio={MPV_OPTIONS["gapless_audio"]}')
+        if MPV_OPTIONS.get('cache'):
+            cmd.append('--cache=yes')
+        if MPV_OPTIONS.get('demuxer_readahead_secs'):
+            cmd.append(f'--demuxer-readahead-secs={MPV_OPTIONS["demuxer_readahead_secs"]}')
+        if MPV_OPTIONS.get('stream_reconnect'):
+            cmd.append('--stream-lavf-o=reconnect=1,reconnect_streamed=1,reconnect_delay_max=5')
+        
+        return cmd
+    
+    @staticmethod
+    async def start(volume: int = 50) -> Optional[subprocess.Popen]:
+        """
+        Start the persistent idle mpv process and connect the IPC client
+        
+        The process is spawned once and kept alive for the whole bot
+        session. Tracks are switched over the IPC socket with load().
+        Calling this while mpv is already running returns the running
+        process.
+        
+        Args:
+            volume: Initial volume level (0-100)
         
         Returns:
             subprocess.Popen object or None if failed
         """
+        if MPVPlayer.is_running():
+            if not mpv_ipc.connected:
+                await mpv_ipc.connect(IPC_SOCKET)
+            return player.mpv_process
+        
         try:
             # Remove old socket if exists
             if os.path.exists(IPC_SOCKET):
@@ -48,32 +117,7 @@ class MPVPlayer:
                 except Exception as e:
                     logger.warning(f"Error removing socket: {e}")
             
-            # Build command
-            cmd = ['mpv']
-            
-            # Add IPC socket for control
-            cmd.append(f'--input-ipc-server={IPC_SOCKET}')
-            
-            # Add boolean flags
-            if MPV_OPTIONS.get('no_video', True):
-                cmd.append('--no-video')
-            if MPV_OPTIONS.get('no_terminal', True):
-                cmd.append('--no-terminal')
-            if MPV_OPTIONS.get('quiet', True):
-                cmd.append('--quiet')
-            
-            # Add volume
-            cmd.append(f'--volume={volume}')
-            
-            # Add optional parameters
-            if MPV_OPTIONS.get('demuxer_max_bytes'):
-                cmd.append(f'--demuxer-max-bytes={MPV_OPTIONS["demuxer_max_bytes"]}')
-            if MPV_OPTIONS.get('demuxer_max_back_bytes'):
-                cmd.append(f'--demuxer-max-back-bytes={MPV_OPTIONS["demuxer_max_back_bytes"]}')
-            
-            # Add URL (must be last)
-            cmd.append(url)
-            
+            cmd = MPVPlayer._build_command(volume)
             logger.debug(f"MPV command: {' '.join(cmd)}")
             
             # Start process
@@ -83,8 +127,17 @@ class MPVPlayer:
                 stderr=subprocess.DEVNULL,
                 stdin=subprocess.DEVNULL
             )
+            player.mpv_process = process
+            logger.info(f"Started idle mpv process with PID: {process.pid}")
+            
+            # Connect once the IPC socket is up
+            try:
+                await mpv_ipc.connect(IPC_SOCKET, timeout=SOCKET_WAIT_TIMEOUT)
+            except MPVIPCError as e:
+                logger.error(f"Error connecting to mpv: {e}")
+                MPVPlayer.shutdown()
+                return None
             
-            logger.info(f"Started mpv process with PID: {process.pid}")
             return process
             
         except FileNotFoundError:
@@ -95,8 +148,31 @@ class MPVPlayer:
             raise
     
     @staticmethod
-    def stop():
-        """Stop the current mpv process"""
+    async def load(url: str, mode: str = 'replace') -> bool:
+        """
+        Load a track into the running mpv instance
+        
+        Args:
+            url: YouTube video URL
+            mode: loadfile flag, 'replace' to play now or 'append' to queue
+        
+        Returns:
+            True if the command was accepted
+        """
+        return await MPVPlayer.send_command("loadfile", url, mode)
+    
+    @staticmethod
+    async def stop():
+        """Stop the current track, the idle mpv process keeps running"""
+        if MPVPlayer.is_running():
+            # pause survives stop in idle mode, the next track must not start paused
+            await MPVPlayer.resume()
+            if await MPVPlayer.send_command("stop"):
+                logger.info("MPV playback stopped")
+    
+    @staticmethod
+    def shutdown():
+        """Terminate the mpv process (called on bot exit)"""
         if player.mpv_process:
             try:
                 player.mpv_process.terminate()
@@ -119,31 +195,37 @@ class MPVPlayer:
                         logger.debug(f"Could not remove socket: {e}")
     
     @staticmethod
-    def pause():
-        """Pause the mpv process using SIGSTOP"""
-        if player.mpv_process and player.is_playing and not player.is_paused:
-            try:
-                os.kill(player.mpv_process.pid, signal.SIGSTOP)
-                player.is_paused = True
-                logger.info("MPV paused")
-                return True
-            except Exception as e:
-                logger.error(f"Error pausing mpv: {e}")
-                return False
+    async def pause() -> bool:
+        """
+        Pause playback via the mpv pause property
+        
+        The process keeps running, so the demuxer cache goes on filling and
+        the stream connection stays alive. player.is_paused follows mpv's
+        pause observer.
+        
+        Returns:
+            True if mpv accepted the change
+        """
+        if not mpv_ipc.connected or not player.is_playing or player.is_paused:
+            return False
+        if await MPVPlayer.set_property_confirmed("pause", True):
+            logger.info("MPV paused")
+            return True
         return False
     
     @staticmethod
-    def resume():
-        """Resume the mpv process using SIGCONT"""
-        if player.mpv_process and player.is_paused:
-            try:
-                os.kill(player.mpv_process.pid, signal.SIGCONT)
-                player.is_paused = False
-                logger.info("MPV resumed")
-                return True
-            except Exception as e:
-                logger.error(f"Error resuming mpv: {e}")
-                return False
+    async def resume() -> bool:
+        """
+        Resume playback via the mpv pause property
+        
+        Returns:
+            True if mpv accepted the change
+        """
+        if not mpv_ipc.connected or not player.is_paused:
+            return False
+        if await MPVPlayer.set_property_confirmed("pause", False):
+            logger.info("MPV resumed")
+            return True
         return False
     
     @staticmethod
@@ -154,105 +236,136 @@ class MPVPlayer:
         return False
     
     @staticmethod
-    def send_command(command: dict) -> bool:
+    async def send_command(*args) -> bool:
         """
-        Send command to MPV via IPC socket
+        Send command to MPV over the persistent IPC connection
         
         Args:
-            command: Dictionary with MPV command
+            *args: Command name followed by its arguments
             
         Returns:
             True if successful, False otherwise
         """
         try:
-            if not os.path.exists(IPC_SOCKET):
-                logger.warning("MPV IPC socket not found")
-                return False
-            
-            # Connect to socket
-            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-            sock.connect(IPC_SOCKET)
-            
-            # Send command
-            command_str = json.dumps(command) + '\n'
-            sock.send(command_str.encode('utf-8'))
-            
-            # Get response
-            response = sock.recv(4096).decode('utf-8')
-            sock.close()
-            
-            logger.debug(f"MPV response: {response}")
+            await mpv_ipc.command(*args)
             return True
-            
-        except Exception as e:
+        except MPVIPCError as e:
             logger.error(f"Error sending command to MPV: {e}")
             return False
     
     @staticmethod
-    def set_volume(volume: int) -> bool:
+    async def get_property(name: str) -> Optional[Any]:
         """
-        Set volume via IPC or system amixer
+        Read a property from MPV
         
         Args:
-            volume: Volume level (0-100)
-            
+            name: Property name
+        
         Returns:
-            True if successful
+            Property value or None if unavailable
         """
         try:
-            # Try IPC first (if MPV supports it)
-            if os.path.exists(IPC_SOCKET):
-                command = {
-                    "command": ["set_property", "volume", volume]
-                }
-                success = MPVPlayer.send_command(command)
-                if success:
-                    logger.info(f"Set volume to {volume}% via IPC")
-                    return True
-            
-            # Fallback to system volume control using amixer
-            try:
-                # Set volume using amixer
-                cmd = ['amixer', '-D', 'pulse', 'sset', 'Master', f'{volume}%']
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-                
-                if result.returncode == 0:
-                    logger.info(f"Set system volume to {volume}% via amixer")
-                    return True
-                else:
-                    logger.warning(f"amixer failed: {result.stderr}")
-            except FileNotFoundError:
-                logger.warning("amixer not found, trying pactl...")
-                # Alternative: use pactl
-                cmd = ['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{volume}%']
-                result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-                
-                if result.returncode == 0:
-                    logger.info(f"Set system volume to {volume}% via pactl")
-                    return True
-            
+            return await mpv_ipc.get_property(name)
+        except MPVIPCError as e:
+            logger.debug(f"Could not read MPV property '{name}': {e}")
+            return None
+    
+    @staticmethod
+    async def set_property_confirmed(name: str, value: Any) -> bool:
+        """
+        Set an observed property and wait for mpv's property-change event
+        
+        The cached state is updated by the property observers, so once this
+        returns the value in PlayerState is the one mpv reports. Setting a
+        property to its current value produces no event, so when the cached
+        value already matches (CACHED_PROPERTIES) the command is sent
+        without waiting. Otherwise the wait ends after
+        PROPERTY_CONFIRM_TIMEOUT at the latest.
+        
+        Args:
+            name: Property name
+            value: New value
+        
+        Returns:
+            True if mpv accepted the change
+        """
+        attr = CACHED_PROPERTIES.get(name)
+        if attr is not None and getattr(player, attr) == value:
+            # Unchanged: mpv sends no property-change event to wait for
+            return await MPVPlayer.send_command("set_property", name, value)
+        
+        confirmed = mpv_ipc.expect_property(name)
+        if not await MPVPlayer.send_command("set_property", name, value):
+            confirmed.cancel()
             return False
+        try:
+            await asyncio.wait_for(confirmed, PROPERTY_CONFIRM_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        return True
+    
+    @staticmethod
+    async def seek(value: float, mode: str = 'relative') -> bool:
+        """
+        Seek within the current track
+        
+        Waits for the time-pos update that follows the seek, so the
+        position snapshot is current when this returns.
+        
+        Args:
+            value: Seconds (relative/absolute) or percent (absolute-percent)
+            mode: One of SEEK_MODES
+        
+        Returns:
+            True if mpv accepted the seek
+        """
+        if mode not in SEEK_MODES:
+            raise ValueError(f"Invalid seek mode: {mode}")
+        if not mpv_ipc.connected:
+            return False
+        
+        moved = mpv_ipc.expect_property("time-pos")
+        if not await MPVPlayer.send_command("seek", value, mode):
+            moved.cancel()
+            return False
+        try:
+            await asyncio.wait_for(moved, PROPERTY_CONFIRM_TIMEOUT)
+        except asyncio.TimeoutError:
+            pass
+        return True
+    
+    @staticmethod
+    async def set_volume(volume: int) -> bool:
+        """
+        Set volume live via the mpv volume property
+        
+        Args:
+            volume: Volume level (0-100)
             
-        except Exception as e:
-            logger.error(f"Error setting volume: {e}")
+        Returns:
+            True if mpv accepted it, False if the IPC is not available
+        """
+        if not mpv_ipc.connected:
             return False
+        if await MPVPlayer.set_property_confirmed("volume", volume):
+            logger.info(f"Set volume to {player.volume}% via IPC")
+            return True
+        return False
     
     @staticmethod
-    def get_volume() -> Optional[int]:
-        """Get current volume from MPV"""
-        try:
-            command = {"command": ["get_property", "volume"]}
-            # This needs more complex implementation to get return value
-            # For now, return stored volume from player state
+    async def get_volume() -> Optional[int]:
+        """Get current volume from MPV (stored volume if mpv is not up)"""
+        if not mpv_ipc.connected:
             return player.volume
-        except Exception as e:
-            logger.error(f"Error getting volume: {e}")
-            return None
+        volume = await MPVPlayer.get_property("volume")
+        if volume is None:
+            return player.volume
+        return int(round(volume))
     
     @staticmethod
-    def volume_up(step: int = 5) -> bool:
+    async def volume_up(step: int = 5) -> bool:
         """
-        Increase system volume
+        Increase volume (coalesced with other presses)
         
         Args:
             step: Percentage to increase (default 5%)
@@ -260,35 +373,13 @@ class MPVPlayer:
         Returns:
             True if successful
         """
-        try:
-            # Try with PulseAudio first
-            cmd = ['amixer', '-D', 'pulse', 'sset', 'Master', f'{step}%+']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-            
-            if result.returncode == 0:
-                logger.info(f"✅ Increased volume by {step}% (PulseAudio)")
-                return True
-            
-            # Fallback to direct ALSA if PulseAudio fails
-            logger.warning(f"PulseAudio failed, trying ALSA directly. Error: {result.stderr}")
-            cmd = ['amixer', 'sset', 'Master', f'{step}%+']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-            
-            if result.returncode == 0:
-                logger.info(f"✅ Increased volume by {step}% (ALSA)")
-                return True
-            
-            logger.error(f"❌ Both methods failed. ALSA error: {result.stderr}")
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Exception increasing volume: {e}")
-            return False
+        from .volume import VolumeController
+        return await VolumeController.change(step)
     
     @staticmethod
-    def volume_down(step: int = 5) -> bool:
+    async def volume_down(step: int = 5) -> bool:
         """
-        Decrease system volume
+        Decrease volume (coalesced with other presses)
         
         Args:
             step: Percentage to decrease (default 5%)
@@ -296,63 +387,19 @@ class MPVPlayer:
         Returns:
             True if successful
         """
-        try:
-            # Try with PulseAudio first
-            cmd = ['amixer', '-D', 'pulse', 'sset', 'Master', f'{step}%-']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-            
-            if result.returncode == 0:
-                logger.info(f"✅ Decreased volume by {step}% (PulseAudio)")
-                return True
-            
-            # Fallback to direct ALSA if PulseAudio fails
-            logger.warning(f"PulseAudio failed, trying ALSA directly. Error: {result.stderr}")
-            cmd = ['amixer', 'sset', 'Master', f'{step}%-']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-            
-            if result.returncode == 0:
-                logger.info(f"✅ Decreased volume by {step}% (ALSA)")
-                return True
-            
-            logger.error(f"❌ Both methods failed. ALSA error: {result.stderr}")
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Exception decreasing volume: {e}")
-            return False
+        from .volume import VolumeController
+        return await VolumeController.change(-step)
     
     @staticmethod
-    def toggle_mute() -> bool:
+    async def toggle_mute() -> bool:
         """
-        Toggle mute on/off
+        Toggle mute on/off (coalesced with other presses)
         
         Returns:
             True if successful
         """
-        try:
-            # Try with PulseAudio first
-            cmd = ['amixer', '-D', 'pulse', 'sset', 'Master', 'toggle']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-            
-            if result.returncode == 0:
-                logger.info("✅ Toggled mute (PulseAudio)")
-                return True
-            
-            # Fallback to direct ALSA if PulseAudio fails
-            logger.warning(f"PulseAudio failed, trying ALSA directly. Error: {result.stderr}")
-            cmd = ['amixer', 'sset', 'Master', 'toggle']
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
-            
-            if result.returncode == 0:
-                logger.info("✅ Toggled mute (ALSA)")
-                return True
-            
-            logger.error(f"❌ Both methods failed. ALSA error: {result.stderr}")
-            return False
-            
-        except Exception as e:
-            logger.error(f"❌ Exception toggling mute: {e}")
-            return False
+        from .volume import VolumeController
+        return await VolumeController.toggle_mute()
     
     @staticmethod
     def get_status() -> str:
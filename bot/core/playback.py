@@ -4,29 +4,365 @@ Handles all playback logic (play, next, previous, auto-next)
 """
 
 import asyncio
-import random
 import logging
 from typing import Optional
 
 from telegram.ext import Application
 
-from .player_state import player
+from .player_state import player, PlaybackPosition, Song
 from .mpv_player import MPVPlayer
-from ..config import EMOJI
+from .mpv_ipc import mpv_ipc
+from .crossfade import CrossfadeManager
+from .volume import VolumeController
+from .suggestions import SuggestionService, SUGGESTION_TIMEOUT
+from .recommender import recommender
+from .failures import FailureCache
+from .enrichment import MetadataEnricher
+from .shuffle import ShuffleOrder, shuffle_order, smart_shuffle_order
+from ..config import EMOJI, RECOMMENDER_ENABLED
 
 logger = logging.getLogger(__name__)
 
+# A song left after this much of it was played counts as completed, not skipped
+LISTEN_COMPLETE_PERCENT = 90
+
 
 class PlaybackManager:
     """Manages music playback operations"""
     
+    # Telegram application used by the mpv event handlers
+    _application: Optional[Application] = None
+    
+    # Every loadfile bumps the load generation, start-file catches the
+    # started generation up. While they differ, end-file events belong
+    # to a track that is being replaced and are ignored.
+    _load_generation: int = 0
+    _started_generation: int = 0
+    
+    # Handlers are registered once; post_init runs again after a polling restart
+    _attached: bool = False
+    
+    @staticmethod
+    async def attach(application: Application):
+        """
+        Wire mpv IPC events into the playback state machine
+        Called from Application.post_init, again after every polling
+        restart; the handlers are only registered the first time
+        
+        Args:
+            application: Telegram application instance
+        """
+        PlaybackManager._application = application
+        if PlaybackManager._attached:
+            return
+        PlaybackManager._attached = True
+        
+        mpv_ipc.on_event('start-file', PlaybackManager._on_start_file)
+        mpv_ipc.on_event('file-loaded', PlaybackManager._on_file_loaded)
+        mpv_ipc.on_event('end-file', PlaybackManager._on_end_file)
+        mpv_ipc.on_event('shutdown', PlaybackManager._on_shutdown)
+        mpv_ipc.on_property('idle-active', PlaybackManager._on_idle_active)
+        mpv_ipc.on_property('playlist-pos', PlaybackManager._on_playlist_pos)
+        mpv_ipc.on_property('volume', PlaybackManager._on_volume)
+        mpv_ipc.on_property('mute', PlaybackManager._on_mute)
+        mpv_ipc.on_property('pause', PlaybackManager._on_pause)
+        mpv_ipc.on_property('time-pos', PlaybackManager._on_time_pos)
+        mpv_ipc.on_property('duration', PlaybackManager._on_duration)
+        mpv_ipc.on_property('demuxer-cache-duration', PlaybackManager._on_cache_duration)
+        await mpv_ipc.observe_property('idle-active')
+        await mpv_ipc.observe_property('playlist-pos')
+        await mpv_ipc.observe_property('volume')
+        await mpv_ipc.observe_property('mute')
+        await mpv_ipc.observe_property('pause')
+        await mpv_ipc.observe_property('time-pos')
+        await mpv_ipc.observe_property('duration')
+        await mpv_ipc.observe_property('demuxer-cache-duration')
+        await CrossfadeManager.attach()
+        
+        logger.info("✓ Playback attached to mpv events")
+    
+    @staticmethod
+    def _on_start_file(event: dict):
+        """mpv started opening a track"""
+        PlaybackManager._started_generation = PlaybackManager._load_generation
+        player.mpv_state = 'loading'
+        player.position = PlaybackPosition()
+    
+    @staticmethod
+    def _on_file_loaded(event: dict):
+        """mpv opened the track and is playing it"""
+        player.mpv_state = 'playing'
+        song = player.current_song
+        if song and PlaybackManager._started_generation == PlaybackManager._load_generation:
+            # A failure marked for a transient error is over
+            FailureCache.clear(song)
+    
+    @staticmethod
+    def _on_end_file(event: dict):
+        """
+        mpv finished a track
+        
+        reason 'eof' means the track played to the end, 'error' that it
+        could not be played. 'stop' and 'redirect' come from our own
+        stop/loadfile commands and need no action.
+        """
+        if PlaybackManager._started_generation != PlaybackManager._load_generation:
+            logger.debug("Ignoring end-file of a replaced track")
+            return None
+        
+        reason = event.get('reason', 'eof')
+        
+        if reason == 'eof':
+            player.mpv_state = 'ended'
+            song = player.current_song
+            if song and player.is_playing:
+                PlaybackManager.record_listen(song, completed=True)
+            if player.prefetched_index is not None:
+                # mpv moves on to the prefetched entry by itself,
+                # _on_playlist_pos picks up the new position
+                return None
+            if player.is_playing:
+                from .controller import PlaybackController
+                logger.info(f"✅ Song finished: '{song.title if song else 'Unknown'}'")
+                PlaybackController.song_finished()
+        elif reason == 'error':
+            player.mpv_state = 'error'
+            error = event.get('file_error', 'unknown error')
+            logger.warning(f"⚠️ MPV could not play track: {error}")
+            song = player.current_song
+            if song and player.is_playing and PlaybackManager._application:
+                return PlaybackManager._on_track_failed(
+                    PlaybackManager._application, song, FailureCache.classify(error)
+                )
+        
+        return None
+    
+    @staticmethod
+    async def _on_track_failed(application: Application, song, reason: str):
+        """Remember a track mpv could not play and move on to the next one"""
+        FailureCache.mark(song, reason)
+        
+        if player.owner_id:
+            try:
+                await application.bot.send_message(
+                    chat_id=player.owner_id,
+                    text=f"⚠️ Skipped <b>{song.title}</b> ({reason})",
+                    parse_mode="HTML"
+                )
+            except Exception as e:
+                logger.error(f"❌ Error sending notification: {e}")
+        
+        if player.prefetched_index is not None:
+            # mpv skips to the prefetched entry by itself
+            return
+        # Move on instead of halting the whole queue
+        from .controller import PlaybackController
+        PlaybackController.song_finished()
+    
+    @staticmethod
+    def _on_playlist_pos(pos: Optional[int]):
+        """
+        mpv moved within its internal playlist
+        
+        The mpv playlist holds the current track at position 0 and at most
+        one prefetched track after it. Position 1 means mpv advanced
+        gaplessly to the prefetched track.
+        """
+        if pos != 1 or player.prefetched_index is None:
+            return None
+        
+        from .controller import PlaybackController
+        player.current_index = player.prefetched_index
+        player.prefetched_index = None
+        # Dropping the old entry and prefetching must not interleave with a load
+        PlaybackController.gapless_advanced()
+        return None
+    
+    @staticmethod
+    async def _on_gapless_advance(application: Application):
+        """Bookkeeping after mpv switched to the prefetched track"""
+        current_song = player.current_song
+        if not current_song:
+            return
+        
+        logger.info(f"🎵 Now playing (gapless): '{current_song.title}' [{player.current_index + 1}/{len(player.playlist)}]")
+        
+        await CrossfadeManager.handoff()
+        
+        # Drop the finished entry so the new track is back at position 0
+        await MPVPlayer.send_command("playlist-remove", 0)
+        await PlaybackManager.prefetch_next()
+        SuggestionService.on_track_started(PlaybackManager.peek_next_index() is None)
+        MetadataEnricher.schedule()
+        await PlaybackManager._notify_now_playing(application, current_song)
+    
+    @staticmethod
+    def next_playable_index(start: int) -> Optional[int]:
+        """
+        Find the first queue index from start on that is not known to fail
+        
+        Args:
+            start: Queue index to start at
+        
+        Returns:
+            Queue index, or None if every remaining song is known to fail
+        """
+        for index in range(start, len(player.playlist)):
+            if PlaybackManager.is_playable(player.playlist[index]):
+                return index
+        return None
+    
+    @staticmethod
+    def record_listen(song: Song, completed: bool):
+        """
+        Count how a song was left and reweight it for smart shuffle
+        
+        Args:
+            song: Song that stopped playing
+            completed: True if it played (nearly) to the end
+        """
+        recommender.record_listen(song, completed)
+        # Other modes read fresh stats when smart shuffle is switched on
+        if player.shuffle_enabled and player.smart_shuffle:
+            smart_shuffle_order.update(song)
+    
+    @staticmethod
+    def track_skipped():
+        """The user moved on from the current song, count it unless it never started"""
+        song = player.current_song
+        if (not song or not player.is_playing or player.mpv_state != 'playing'
+                or PlaybackManager._started_generation != PlaybackManager._load_generation):
+            return
+        percent = player.position.percent
+        if percent is None:
+            return
+        PlaybackManager.record_listen(song, completed=percent >= LISTEN_COMPLETE_PERCENT)
+    
+    @staticmethod
+    def shuffle() -> ShuffleOrder:
+        """Get the shuffle order of the current mode"""
+        return smart_shuffle_order if player.smart_shuffle else shuffle_order
+    
+    @staticmethod
+    def is_playable(song: Song) -> bool:
+        """Check that a song is not known to fail"""
+        return FailureCache.get(song) is None
+    
+    @staticmethod
+    def peek_next_index() -> Optional[int]:
+        """
+        Get the queue index that will play after the current song
+        
+        Returns:
+            Queue index, or None if the queue ends after this song
+        """
+        if not player.playlist:
+            return None
+        if player.loop_enabled:
+            return player.current_index
+        if player.shuffle_enabled:
+            # The order lines the song up, repeated peeks don't reshuffle
+            return player.playlist.locate(PlaybackManager.shuffle().peek(PlaybackManager.is_playable))
+        return PlaybackManager.next_playable_index(player.current_index + 1)
+    
+    @staticmethod
+    async def prefetch_next():
+        """
+        Append the next queue item to mpv's playlist ahead of time
+        
+        With --prefetch-playlist mpv opens and buffers it while the current
+        track is still playing, so the transition has no gap. Safe to call
+        again after queue or mode changes, it only touches mpv when the
+        next track differs from the one already prefetched.
+        """
+        from ..config import GAPLESS_PLAYBACK
+        
+        if not GAPLESS_PLAYBACK or not player.is_playing or not mpv_ipc.connected:
+            return
+        
+        next_index = PlaybackManager.peek_next_index()
+        if next_index == player.prefetched_index:
+            return
+        
+        # A crossfade prepared for the old next track is no longer valid
+        await CrossfadeManager.cancel()
+        
+        commands = []
+        if player.prefetched_index is not None:
+            commands.append(["playlist-remove", 1])
+        if next_index is not None:
+            commands.append(["loadfile", player.playlist[next_index].url, "append"])
+        
+        player.prefetched_index = next_index
+        results = await mpv_ipc.command_batch(commands)
+        
+        if any(isinstance(result, Exception) for result in results):
+            logger.warning(f"⚠️ Could not prefetch next track: {results}")
+            player.prefetched_index = None
+        elif next_index is not None:
+            logger.debug(f"Prefetched next track: '{player.playlist[next_index].title}'")
+    
+    @staticmethod
+    def _on_idle_active(idle: Optional[bool]):
+        """mpv has no track loaded"""
+        if idle:
+            player.mpv_state = 'idle'
+    
+    @staticmethod
+    def _on_volume(volume: Optional[float]):
+        """mpv reports its volume"""
+        if volume is not None:
+            player.volume = int(round(volume))
+    
+    @staticmethod
+    def _on_mute(muted: Optional[bool]):
+        """mpv reports its mute state"""
+        if muted is not None:
+            player.is_muted = bool(muted)
+    
+    @staticmethod
+    def _on_pause(paused: Optional[bool]):
+        """mpv reports its pause state"""
+        if paused is not None:
+            player.is_paused = bool(paused)
+    
+    @staticmethod
+    def _on_time_pos(time_pos: Optional[float]):
+        """mpv reports the playback position"""
+        player.position.time_pos = time_pos
+    
+    @staticmethod
+    def _on_duration(duration: Optional[float]):
+        """mpv reports the track length"""
+        player.position.duration = duration
+    
     @staticmethod
-    async def play_current_song(application: Application) -> bool:
+    def _on_cache_duration(cached: Optional[float]):
+        """mpv reports how many seconds are buffered ahead"""
+        player.position.cache_duration = cached
+    
+    @staticmethod
+    def _on_shutdown(event: dict):
+        """mpv quit or the IPC connection dropped"""
+        player.mpv_state = 'stopped'
+        player.position = PlaybackPosition()
+        if player.is_playing:
+            logger.warning("⚠️ MPV went away during playback")
+            player.is_playing = False
+            player.is_paused = False
+    
+    @staticmethod
+    async def play_current_song(application: Application, announce: bool = True,
+                                explicit: bool = False) -> bool:
         """
         Play the current song in the playlist
         
         Args:
             application: Telegram application instance
+            announce: Run track_settled() right away. The controller passes
+                False while a burst of skips may still replace the song.
+            explicit: The user picked the song: play it even if it is marked
+                as failing instead of skipping ahead
         
         Returns:
             True if successful, False otherwise
@@ -38,66 +374,105 @@ class PlaybackManager:
         if player.current_index >= len(player.playlist):
             player.current_index = 0
         
+        # Known bad songs are skipped before mpv or yt-dlp touch them,
+        # unless the user asked for this one; it gets another try
+        if explicit:
+            FailureCache.clear(player.current_song)
+            playable = player.current_index
+        else:
+            playable = PlaybackManager.next_playable_index(player.current_index)
+        if playable is None:
+            logger.warning("⚠️ No playable songs left in the queue")
+            player.is_playing = False
+            return False
+        if playable != player.current_index:
+            logger.info(f"⏭️ Skipped {playable - player.current_index} unplayable song(s)")
+            player.current_index = playable
+        
         current_song = player.current_song
         if not current_song:
             return False
         
         try:
-            # Stop any existing playback
-            MPVPlayer.stop()
-            
             logger.info(f"🎵 Now playing: '{current_song.title}' [{player.current_index + 1}/{len(player.playlist)}]")
             
-            # Start new playback
-            player.mpv_process = MPVPlayer.start(current_song.url, player.volume)
+            # Make sure the persistent idle mpv is up (spawned only once)
+            if not await MPVPlayer.start(player.volume):
+                raise RuntimeError("Could not start mpv")
+            
+            # pause is kept across loadfile, a new track always starts playing
+            if player.is_paused:
+                await MPVPlayer.resume()
+            
+            # Switch track over IPC, replacing whatever is playing. The
+            # end of the track arrives later as an end-file event.
+            PlaybackManager._load_generation += 1
+            player.mpv_state = 'loading'
+            player.prefetched_index = None
+            await CrossfadeManager.cancel()
+            if not await MPVPlayer.load(current_song.url):
+                PlaybackManager._started_generation = PlaybackManager._load_generation
+                raise RuntimeError("mpv rejected loadfile command")
             player.is_playing = True
-            player.is_paused = False
             
-            # Notify user
-            if player.owner_id:
-                try:
-                    # Create visual progress bar
-                    total = len(player.playlist)
-                    current = player.current_index + 1
-                    progress = "▰" * current + "▱" * (total - current) if total <= 20 else f"{current}/{total}"
-                    
-                    await application.bot.send_message(
-                        chat_id=player.owner_id,
-                        text=(
-                            f"{EMOJI['now_playing']} <b>Now Playing:</b>\n\n"
-                            f"🎵 <b>{current_song.title}</b>\n"
-                            f"⏱️ {current_song.duration}\n\n"
-                            f"📊 Position: {current}/{total}\n"
-                            f"▰▱ {progress}"
-                        ),
-                        parse_mode="HTML"
-                    )
-                except Exception as e:
-                    logger.error(f"❌ Error sending notification: {e}")
-            
-            # Wait for playback to finish
-            process_result = await asyncio.get_event_loop().run_in_executor(
-                None, player.mpv_process.wait
-            )
-            
-            # Add small delay to prevent rapid restarts
-            await asyncio.sleep(1)
-            
-            # Check if playback finished naturally (not stopped manually)
-            if player.is_playing and process_result == 0:
-                logger.info(f"✅ Song finished: '{current_song.title}'")
-                await PlaybackManager.handle_song_finished(application)
-            elif process_result != 0:
-                logger.warning(f"⚠️ MPV exited with code {process_result}")
-                player.is_playing = False
+            if announce:
+                await PlaybackManager.track_settled(application)
             
             return True
-            
+        
         except Exception as e:
             logger.error(f"❌ Error playing song: {e}")
             player.is_playing = False
             return False
     
+    @staticmethod
+    async def track_settled(application: Application):
+        """
+        Follow-up work for a song that is going to stay
+        
+        Prefetches the next track, records the play, prefetches
+        suggestions and sends Now Playing. Deferred for skips so songs
+        that are skipped over right away cause none of it.
+        
+        Args:
+            application: Telegram application instance
+        """
+        current_song = player.current_song
+        if not player.is_playing or not current_song:
+            return
+        
+        # Queue up the following track while this one plays
+        await PlaybackManager.prefetch_next()
+        SuggestionService.on_track_started(PlaybackManager.peek_next_index() is None)
+        # Move the duration window along
+        MetadataEnricher.schedule()
+        
+        # Sent in the background, the controller does not wait for Telegram
+        asyncio.create_task(PlaybackManager._notify_now_playing(application, current_song))
+    
+    @staticmethod
+    async def _notify_now_playing(application: Application, current_song):
+        """
+        Send the Now Playing message to the owner
+        
+        Args:
+            application: Telegram application instance
+            current_song: Song that just started
+        """
+        if not player.owner_id:
+            return
+        
+        from ..utils.formatters import MessageFormatter
+        
+        try:
+            await application.bot.send_message(
+                chat_id=player.owner_id,
+                text=MessageFormatter.now_playing(current_song, player.current_index, len(player.playlist)),
+                parse_mode="HTML"
+            )
+        except Exception as e:
+            logger.error(f"❌ Error sending notification: {e}")
+    
     @staticmethod
     async def handle_song_finished(application: Application):
         """
@@ -113,90 +488,33 @@ class PlaybackManager:
         # Prevent rapid consecutive calls
         if not player.is_playing:
             return
-            
+        
         if player.loop_enabled:
             # Replay the same song
             logger.info("🔁 Loop enabled - replaying current song")
-            await asyncio.sleep(0.5)
             await PlaybackManager.play_current_song(application)
         else:
-            # Check if there's a next song in queue
-            next_index = player.current_index + 1
+            # Check if there's a next song in queue (or shuffle round)
+            next_index = PlaybackManager.peek_next_index()
             
-            if next_index < len(player.playlist):
+            if next_index is not None:
                 # Has next song - auto-play immediately
                 logger.info(f"⏩ Auto-playing next song ({next_index + 1}/{len(player.playlist)})")
-                await asyncio.sleep(0.5)
-                await PlaybackManager.play_next(application)
+                player.current_index = next_index
+                await PlaybackManager.play_current_song(application)
             else:
                 # Queue finished - check YouTube suggestions setting
                 use_suggestions = ENABLE_YOUTUBE_SUGGESTIONS and player.yt_suggestions_enabled
                 
+                # Dialogs wait for the user, they run beside the controller
                 if use_suggestions:
                     # Show YouTube suggestions
                     logger.info("📺 Queue finished - fetching YouTube suggestions")
-                    await PlaybackManager.show_suggestions_dialog(application)
+                    asyncio.create_task(PlaybackManager.show_suggestions_dialog(application, player.current_song))
                 else:
                     # Ask user if want to loop playlist
                     logger.info("🔄 Queue finished - asking user")
-                    await PlaybackManager.show_loop_confirmation(application)
-        """
-        Handle when a song finishes playing
-        Auto-plays next song immediately (no countdown dialog)
-        Auto-loops playlist when queue finishes
-        Optionally shows YouTube suggestions if enabled
-        
-        Args:
-            application: Telegram application instance
-        """
-        from ..config import ENABLE_YOUTUBE_SUGGESTIONS
-        
-        # Prevent rapid consecutive calls
-        if not player.is_playing:
-            return
-            
-        if player.loop_enabled:
-            # Replay the same song
-            logger.info("🔁 Loop enabled - replaying current song")
-            await asyncio.sleep(0.5)  # Small delay before replay
-            await PlaybackManager.play_current_song(application)
-        else:
-            # Check if there's a next song in queue
-            next_index = player.current_index + 1
-            
-            if next_index < len(player.playlist):
-                # Has next song in queue - auto-play immediately
-                logger.info(f"⏩ Auto-playing next song ({next_index + 1}/{len(player.playlist)})")
-                await asyncio.sleep(0.5)  # Small delay for smooth transition
-                await PlaybackManager.play_next(application)
-            else:
-                # Queue finished - auto-loop playlist from beginning
-                logger.info("� Queue finished - restarting playlist from beginning")
-                player.current_index = 0
-                
-                # Notify user
-                if player.owner_id:
-                    try:
-                        await application.bot.send_message(
-                            chat_id=player.owner_id,
-                            text=(
-                                f"🔄 <b>Playlist Finished!</b>\n\n"
-                                f"♾️ Auto-restarting from beginning...\n"
-                                f"📀 Total songs: {len(player.playlist)}\n\n"
-                                f"Use /stop to stop playback."
-                            ),
-                            parse_mode="HTML"
-                        )
-                    except Exception as e:
-                        logger.error(f"Error sending notification: {e}")
-                
-                await asyncio.sleep(1)
-                await PlaybackManager.play_current_song(application)
-                
-                # Optional: Show YouTube suggestions if enabled
-                if ENABLE_YOUTUBE_SUGGESTIONS:
-                    logger.info("📺 YouTube suggestions enabled - will show after this loop")
-                    # Note: Suggestions disabled by default for stability
+                    asyncio.create_task(PlaybackManager.show_loop_confirmation(application))
     
     @staticmethod
     async def show_auto_next_dialog(application: Application, countdown_seconds: int = 5):
@@ -208,6 +526,7 @@ class PlaybackManager:
             countdown_seconds: Seconds before auto-playing next song
         """
         from ..utils.keyboards import Keyboards
+        from .controller import PlaybackController
         
         if not player.owner_id or not player.playlist:
             return
@@ -258,17 +577,17 @@ class PlaybackManager:
                 await asyncio.sleep(1)
                 if player.is_playing:  # Check if not manually stopped
                     logger.info("⏩ Auto-next countdown finished - playing next song")
-                    await PlaybackManager.play_next(application)
+                    PlaybackController.next()
             
             # Store task in bot_data so it can be cancelled
             task = asyncio.create_task(countdown_task())
             application.bot_data['auto_next_task'] = task
-            
+        
         except Exception as e:
             logger.error(f"❌ Error showing auto-next dialog: {e}")
             # Fallback - just play next
             await asyncio.sleep(1)
-            await PlaybackManager.play_next(application)
+            PlaybackController.next()
     
     @staticmethod
     async def show_loop_confirmation(application: Application, countdown_seconds: int = 10):
@@ -281,6 +600,7 @@ class PlaybackManager:
             countdown_seconds: Seconds before auto-looping (default 10)
         """
         from ..utils.keyboards import Keyboards
+        from .controller import PlaybackController
         
         if not player.owner_id or not player.playlist:
             return
@@ -321,8 +641,7 @@ class PlaybackManager:
                 await asyncio.sleep(1)
                 if player.is_playing:  # Check if not stopped
                     logger.info("⏩ Auto-loop countdown finished - restarting playlist")
-                    player.current_index = 0
-                    await PlaybackManager.play_current_song(application)
+                    PlaybackController.play(PlaybackManager.restart_index())
                     
                     # Clean up
                     application.bot_data.pop('loop_task', None)
@@ -330,89 +649,122 @@ class PlaybackManager:
             # Store task so it can be cancelled
             task = asyncio.create_task(countdown_task())
             application.bot_data['loop_task'] = task
-            
+        
         except Exception as e:
             logger.error(f"❌ Error showing loop confirmation: {e}")
             # Fallback - just loop
             await asyncio.sleep(1)
-            player.current_index = 0
-            await PlaybackManager.play_current_song(application)
+            PlaybackController.play(PlaybackManager.restart_index())
     
     @staticmethod
-    async def play_next(application: Application) -> bool:
+    def restart_index() -> int:
         """
-        Play the next song in the playlist
-        
-        Args:
-            application: Telegram application instance
+        Get the queue index to play when the finished queue starts over
         
         Returns:
-            True if successful, False otherwise
+            0, or in shuffle mode the first song of a new shuffle round
         """
-        if not player.playlist:
-            return False
-        
         if player.shuffle_enabled:
-            # Random song
-            player.current_index = random.randint(0, len(player.playlist) - 1)
-            logger.info(f"🔀 Shuffle mode: Selected random song at index {player.current_index}")
-        else:
-            # Next song
-            player.current_index += 1
-            if player.current_index >= len(player.playlist):
-                player.current_index = 0
-                logger.info("Reached end of playlist, starting from beginning")
-        
-        return await PlaybackManager.play_current_song(application)
+            order = PlaybackManager.shuffle()
+            order.new_round()
+            entry = order.peek(PlaybackManager.is_playable)
+            if entry is not None:
+                return player.playlist.locate(entry)
+        return 0
     
     @staticmethod
-    async def play_previous(application: Application) -> bool:
+    def step_index(steps: int) -> int:
         """
-        Play the previous song in the playlist
+        Get the queue index some songs away from the current one
+        
+        Wraps around at both ends. In shuffle mode it moves through the
+        shuffle order: forward draws songs not played this round (a new
+        round starts when all were), back walks the shuffle history.
         
         Args:
-            application: Telegram application instance
+            steps: Songs to move, negative to go back
         
         Returns:
-            True if successful, False otherwise
+            Queue index
         """
-        if not player.playlist:
-            return False
-        
         if player.shuffle_enabled:
-            # Random song (for shuffle mode)
-            player.current_index = random.randint(0, len(player.playlist) - 1)
-            logger.info(f"Shuffle: Selected random song at index {player.current_index}")
-        else:
-            # Previous song
-            player.current_index -= 1
-            if player.current_index < 0:
-                player.current_index = len(player.playlist) - 1
-                logger.info("Reached start of playlist, jumping to end")
-        
-        return await PlaybackManager.play_current_song(application)
+            order = PlaybackManager.shuffle()
+            entry = order.step(steps, PlaybackManager.is_playable)
+            if entry is None and steps > 0:
+                logger.info("🔀 Every song was played, reshuffling")
+                order.new_round()
+                entry = order.step(1, PlaybackManager.is_playable)
+            if entry is None:
+                logger.info("🔀 Start of shuffle history, replaying current song")
+                return player.current_index
+            return player.playlist.locate(entry)
+        
+        index = player.current_index + steps
+        if index >= len(player.playlist):
+            logger.info("Reached end of playlist, starting from beginning")
+        elif index < 0:
+            logger.info("Reached start of playlist, jumping to end")
+        return index % len(player.playlist)
     
     @staticmethod
-    def toggle_pause() -> bool:
+    async def toggle_pause() -> bool:
         """
         Toggle pause/resume
         
         Returns:
-            True if paused, False if resumed/failed
+            True if mpv is paused afterwards, False if playing
         """
         if player.is_paused:
-            return not MPVPlayer.resume()
+            await CrossfadeManager.pause_deck(False)
+            await MPVPlayer.resume()
         else:
-            return MPVPlayer.pause()
+            await CrossfadeManager.pause_deck(True)
+            await MPVPlayer.pause()
+        return player.is_paused
     
     @staticmethod
-    def stop():
+    async def stop():
         """Stop playback completely"""
-        MPVPlayer.stop()
+        # A suggestion search would otherwise end in a dialog after Stop
+        SuggestionService.cancel()
+        if PlaybackManager._application:
+            fetch = PlaybackManager._application.bot_data.pop('suggestion_fetch', None)
+            if fetch:
+                fetch.cancel()
+        
+        # Whatever plays next is not a continuation of this session
+        recommender.end_session()
+        
+        # mpv's stop command also clears its internal playlist
+        player.prefetched_index = None
+        await CrossfadeManager.cancel()
+        await MPVPlayer.stop()
         player.is_playing = False
         player.is_paused = False
         logger.info("Playback stopped")
     
+    @staticmethod
+    async def seek(value: float, mode: str = 'relative') -> bool:
+        """
+        Seek within the current track
+        
+        Args:
+            value: Seconds (relative/absolute) or percent (absolute-percent)
+            mode: 'relative', 'absolute' or 'absolute-percent'
+        
+        Returns:
+            True if successful
+        """
+        if not player.is_playing:
+            return False
+        
+        # An armed crossfade was timed for the old position
+        await CrossfadeManager.cancel()
+        if not await MPVPlayer.seek(value, mode):
+            return False
+        logger.info(f"⏩ Seeked {mode} {value:g} -> {player.position.time_pos or 0:.1f}s")
+        return True
+    
     @staticmethod
     def toggle_loop() -> bool:
         """
@@ -428,54 +780,120 @@ class PlaybackManager:
     @staticmethod
     def toggle_shuffle() -> bool:
         """
-        Toggle shuffle mode
+        Cycle the shuffle mode: off -> shuffle -> smart shuffle -> off
+        
+        Smart shuffle weighs songs by the listening history, so it is
+        left out of the cycle when the recommender is disabled.
         
         Returns:
-            New shuffle state
+            New shuffle state (player.smart_shuffle tells which kind)
         """
-        player.shuffle_enabled = not player.shuffle_enabled
-        logger.info(f"Shuffle mode: {player.shuffle_enabled}")
+        if not player.shuffle_enabled:
+            player.shuffle_enabled = True
+        elif not player.smart_shuffle and RECOMMENDER_ENABLED:
+            player.smart_shuffle = True
+        else:
+            player.shuffle_enabled = False
+            player.smart_shuffle = False
+        if player.shuffle_enabled:
+            # Start a fresh round from the current song
+            PlaybackManager.shuffle().reset()
+        logger.info(f"Shuffle mode: {player.shuffle_enabled} (smart: {player.smart_shuffle})")
         return player.shuffle_enabled
     
     @staticmethod
-    def set_volume(volume: int) -> bool:
+    async def set_volume(volume: int) -> bool:
         """
         Set volume level
         
+        Applied live through the mpv volume property, playback keeps going.
+        
         Args:
-            volume: Volume level (25, 50, 75, or 100)
+            volume: Volume level (0-100)
         
         Returns:
             True if successful
         """
-        if volume not in [25, 50, 75, 100]:
+        if not 0 <= volume <= 100:
             logger.warning(f"Invalid volume: {volume}")
             return False
         
-        player.volume = volume
-        logger.info(f"Volume set to {volume}%")
+        # Goes through mpv when it is up, the system mixer otherwise
+        return await VolumeController.set(volume)
+    
+    @staticmethod
+    async def _fetch_suggestions(application: Application, last_song) -> Optional[list]:
+        """
+        Get suggestions without blocking the event loop
+        
+        The fetch runs as a task stored in bot_data['suggestion_fetch'] so
+        Stop can cancel it; Pause, volume and other updates keep being
+        handled meanwhile. A "Searching..." notice is shown unless the
+        suggestions were already prefetched.
         
-        # If MPV is running, update volume via IPC
-        if player.is_playing and MPVPlayer.is_running():
-            success = MPVPlayer.set_volume(volume)
-            if success:
-                logger.info(f"Updated MPV volume to {volume}% via IPC")
-            else:
-                logger.warning("Failed to update MPV volume via IPC, will apply on next song")
+        Args:
+            application: Telegram application instance
+            last_song: Song to get suggestions for
         
-        return True
+        Returns:
+            List of suggested songs, None if the fetch was cancelled
+        """
+        fetch = asyncio.create_task(SuggestionService.get(last_song))
+        application.bot_data['suggestion_fetch'] = fetch
+        
+        # Send "Searching..." notification to user
+        search_message = None
+        if SuggestionService.get_cached(last_song) is None:
+            try:
+                search_message = await application.bot.send_message(
+                    chat_id=player.owner_id,
+                    text=(
+                        f"🔍 <b>Searching for suggestions...</b>\n\n"
+                        f"📺 Finding related videos on YouTube...\n"
+                        f"⏱️ Please wait up to {SUGGESTION_TIMEOUT} seconds..."
+                    ),
+                    parse_mode="HTML"
+                )
+            except Exception as e:
+                logger.error(f"Error sending search notification: {e}")
+        
+        try:
+            # wait() leaves the task alone, so a cancelled fetch is told
+            # apart from this coroutine being cancelled
+            await asyncio.wait({fetch})
+        finally:
+            fetch.cancel()
+            if application.bot_data.get('suggestion_fetch') is fetch:
+                del application.bot_data['suggestion_fetch']
+            
+            # Delete "Searching..." message
+            if search_message:
+                try:
+                    await search_message.delete()
+                except Exception:
+                    pass
+        
+        # Stop cancels the task, a skip cancels the request underneath
+        suggestions = None if fetch.cancelled() else fetch.result()
+        if suggestions is None:
+            logger.info("🛑 Suggestion fetch cancelled")
+            return None
+        logger.info(f"✅ Received {len(suggestions)} suggestions")
+        return suggestions
     
     @staticmethod
-    async def show_suggestions_dialog(application: Application):
+    async def show_suggestions_dialog(application: Application, last_song: Optional[Song]):
         """
-        Show YouTube suggestions dialog when queue is empty
-        Gets related videos and asks user if they want to continue
+        Continue with YouTube suggestions when the queue is empty
+        Plays the first related video at once (usually prefetched while
+        the last song was playing) and shows the others to pick from
         
         Args:
             application: Telegram application instance
+            last_song: Song that just ended (with shuffle not the last index)
         """
         from ..utils.keyboards import Keyboards
-        from .youtube import YouTubeExtractor
+        from .controller import PlaybackController
         from ..config import ENABLE_YOUTUBE_SUGGESTIONS
         
         if not ENABLE_YOUTUBE_SUGGESTIONS:
@@ -486,67 +904,18 @@ class PlaybackManager:
             logger.warning("⚠️ Cannot show suggestions - no owner")
             return
         
-        # Get last played song for suggestions
-        if not player.playlist:
-            logger.warning("⚠️ No playlist available for suggestions")
+        if last_song is None:
+            logger.warning("⚠️ No played song available for suggestions")
             return
         
-        # Use last song in playlist for suggestions
-        last_song = player.playlist[-1]
-        logger.info(f"🎬 Using last song for suggestions: {last_song.title}")
+        logger.info(f"🎬 Using last played song for suggestions: {last_song.title}")
         
-        # Send "Searching..." notification to user
-        search_message = None
         try:
-            search_message = await application.bot.send_message(
-                chat_id=player.owner_id,
-                text=(
-                    f"🔍 <b>Searching for suggestions...</b>\n\n"
-                    f"📺 Finding related videos on YouTube...\n"
-                    f"⏱️ Please wait up to 30 seconds..."
-                ),
-                parse_mode="HTML"
-            )
-        except Exception as e:
-            logger.error(f"Error sending search notification: {e}")
-        
-        try:
-            # Get related videos from YouTube with timeout
-            logger.info(f"🔍 Fetching suggestions for: {last_song.title}")
-            
-            # Run in executor with timeout to prevent blocking
-            import concurrent.futures
-            suggestions = []
-            
-            try:
-                with concurrent.futures.ThreadPoolExecutor(max_workers=1) as executor:
-                    logger.info("🔄 Submitting fetch task to executor...")
-                    future = executor.submit(
-                        YouTubeExtractor.get_related_videos,
-                        last_song.url,
-                        3  # Get top 3 suggestions
-                    )
-                    
-                    logger.info("⏱️ Waiting for results (timeout: 30s)...")
-                    # Wait max 30 seconds for suggestions
-                    suggestions = future.result(timeout=30)
-                    logger.info(f"✅ Received {len(suggestions)} suggestions")
-                    
-            except concurrent.futures.TimeoutError:
-                logger.error("⏱️ Timeout fetching suggestions (30s) - skipping")
-                suggestions = []
-            except Exception as e:
-                logger.error(f"❌ Error in suggestion fetch: {e}")
-                import traceback
-                logger.error(traceback.format_exc())
-                suggestions = []
-            
-            # Delete "Searching..." message
-            if search_message:
-                try:
-                    await search_message.delete()
-                except:
-                    pass
+            # Usually prefetched while the last song was playing
+            suggestions = await PlaybackManager._fetch_suggestions(application, last_song)
+            if suggestions is None or not player.is_playing:
+                # Stopped or skipped while searching
+                return
             
             if not suggestions:
                 # No suggestions found - stop playback
@@ -564,62 +933,33 @@ class PlaybackManager:
                     )
                 return
             
-            # Show first suggestion with options
+            # No dead air: the first suggestion starts right away, the
+            # dialog only offers to switch to another one
             next_song = suggestions[0]
-            logger.info(f"📺 Suggesting: {next_song.title}")
+            logger.info(f"⏩ Auto-playing YouTube suggestion: {next_song.title}")
+            PlaybackController.play(player.add_song(next_song))
             
             # Store suggestions in bot_data for callback
             application.bot_data['suggestions'] = suggestions
             application.bot_data['suggestion_index'] = 0
             
-            # Send suggestion message with countdown
-            message_text = (
-                f"🎵 <b>Queue Finished!</b>\n\n"
-                f"📺 <b>Suggested Video:</b>\n"
-                f"🎵 {next_song.title}\n\n"
-                f"⏱️ Auto-play in <b>10</b> seconds..."
-            )
-            
-            message = await application.bot.send_message(
-                chat_id=player.owner_id,
-                text=message_text,
-                reply_markup=Keyboards.suggestion_dialog(),
-                parse_mode="HTML"
-            )
-            logger.info("✅ Suggestion message sent successfully")
-            
-            # Create auto-play countdown task
-            async def countdown_task():
-                for remaining in range(9, 0, -1):
-                    await asyncio.sleep(1)
-                    try:
-                        new_text = message_text.replace("10", str(remaining))
-                        await message.edit_text(
-                            new_text,
-                            reply_markup=Keyboards.suggestion_dialog(),
-                            parse_mode="HTML"
-                        )
-                    except Exception:
-                        pass
-                
-                # Final countdown - auto-play suggestion
-                await asyncio.sleep(1)
-                if player.is_playing:  # Check if not manually stopped
-                    logger.info("⏩ Auto-playing YouTube suggestion")
-                    # Add suggestion to playlist and play
-                    player.add_song(next_song)
-                    await PlaybackManager.play_current_song(application)
-                    
-                    # Clean up
-                    application.bot_data.pop('suggestions', None)
-                    application.bot_data.pop('suggestion_index', None)
-                    application.bot_data.pop('suggestion_task', None)
-            
-            # Store task in bot_data so it can be cancelled
-            task = asyncio.create_task(countdown_task())
-            application.bot_data['suggestion_task'] = task
-            logger.info("✅ Countdown task started")
-            
+            try:
+                await application.bot.send_message(
+                    chat_id=player.owner_id,
+                    text=(
+                        f"🎵 <b>Queue Finished!</b>\n\n"
+                        f"▶️ <b>Auto-playing suggestion:</b>\n"
+                        f"🎵 {next_song.title}\n\n"
+                        f"Tap Next Suggestion to pick another one."
+                    ),
+                    reply_markup=Keyboards.suggestion_dialog(),
+                    parse_mode="HTML"
+                )
+                logger.info("✅ Suggestion message sent successfully")
+            except Exception as e:
+                # Playback already continues, only the dialog is missing
+                logger.error(f"❌ Error sending suggestion message: {e}")
+        
         except Exception as e:
             logger.error(f"❌ CRITICAL Error showing suggestions: {e}")
             import traceback
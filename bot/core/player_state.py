@@ -3,11 +3,19 @@ Player State Management
 Manages the global state of the music player
 """
 
+import re
 import asyncio
-from typing import Optional, List
+from typing import Optional
 from dataclasses import dataclass
+from urllib.parse import urlparse, parse_qs
 import subprocess
 
+from .song_queue import SongQueue
+
+# URL form the extractor builds for every video, and a bare video ID
+WATCH_URL = "https://www.youtube.com/watch?v="
+VIDEO_ID_PATTERN = re.compile(r'[A-Za-z0-9_-]+')
+
 @dataclass
 class Song:
     """Represents a song in the playlist"""
@@ -17,6 +25,44 @@ class Song:
     
     def __repr__(self):
         return f"Song(title='{self.title}', duration={self.duration})"
+    
+    @property
+    def duration_seconds(self) -> Optional[float]:
+        """Duration in seconds, None if unknown"""
+        try:
+            return float(self.duration)
+        except ValueError:
+            return None
+    
+    @property
+    def video_id(self) -> Optional[str]:
+        """YouTube video ID parsed from the URL"""
+        if self.url.startswith(WATCH_URL):
+            # Fast path for the canonical form, no other query parameters
+            video_id = self.url[len(WATCH_URL):]
+            if VIDEO_ID_PATTERN.fullmatch(video_id):
+                return video_id
+        parsed = urlparse(self.url)
+        if parsed.hostname and parsed.hostname.endswith('youtu.be'):
+            return parsed.path.lstrip('/') or None
+        if parsed.path.startswith(('/shorts/', '/embed/', '/live/')):
+            return parsed.path.split('/')[2] or None
+        return parse_qs(parsed.query).get('v', [None])[0]
+
+
+@dataclass
+class PlaybackPosition:
+    """Where playback is, kept current by mpv property observers"""
+    time_pos: Optional[float] = None
+    duration: Optional[float] = None
+    cache_duration: Optional[float] = None  # Seconds buffered ahead
+    
+    @property
+    def percent(self) -> Optional[float]:
+        """Played fraction of the track in percent"""
+        if self.time_pos is None or not self.duration:
+            return None
+        return max(0.0, min(100.0, self.time_pos * 100 / self.duration))
 
 
 class PlayerState:
@@ -34,23 +80,33 @@ class PlayerState:
         if self._initialized:
             return
         
-        # Playlist management
-        self.playlist: List[Song] = []
-        self.current_index: int = 0
+        # Playlist management (the queue's cursor is current_index)
+        self.playlist: SongQueue = SongQueue()
+        
+        # Queue entry already appended to mpv's playlist for gapless playback
+        self._prefetched = None
         
         # Playback state
         self.is_playing: bool = False
         self.is_paused: bool = False
         
+        # mpv state from IPC events: stopped, idle, loading, playing, ended, error
+        self.mpv_state: str = 'stopped'
+        
+        # Position in the current track (read by the UI, never queried)
+        self.position: PlaybackPosition = PlaybackPosition()
+        
         # Player modes
         self.loop_enabled: bool = False
         self.shuffle_enabled: bool = False
+        self.smart_shuffle: bool = False  # Shuffle weighted by listening history
         
         # Feature toggles
         self.yt_suggestions_enabled: bool = True  # Default ON
         
-        # Audio settings
+        # Audio settings (kept in sync from mpv property-change events)
         self.volume: int = 50
+        self.is_muted: bool = False
         
         # Process management
         self.mpv_process: Optional[subprocess.Popen] = None
@@ -67,13 +123,46 @@ class PlayerState:
         """Reset player state to initial values"""
         self.playlist.clear()
         self.current_index = 0
+        self.prefetched_index = None
         self.is_playing = False
         self.is_paused = False
+        self.position = PlaybackPosition()
         self.loop_enabled = False
         self.shuffle_enabled = False
+        self.smart_shuffle = False
         self.mpv_process = None
         self.playback_task = None
     
+    @property
+    def current_index(self) -> int:
+        """Queue position of the current song, follows it across queue edits"""
+        return self.playlist.cursor
+    
+    @current_index.setter
+    def current_index(self, index: int):
+        self.playlist.cursor = index
+    
+    @property
+    def prefetched_index(self) -> Optional[int]:
+        """Queue position of the prefetched song, None if none or removed"""
+        return self.playlist.locate(self._prefetched)
+    
+    @prefetched_index.setter
+    def prefetched_index(self, index: Optional[int]):
+        self._prefetched = None if index is None else self.playlist.handle(index)
+    
+    def add_song(self, song: Song) -> int:
+        """
+        Append a song to the playlist
+        
+        Args:
+            song: Song to append
+        
+        Returns:
+            Index of the new song
+        """
+        return self.playlist.append(song)
+    
     @property
     def current_song(self) -> Optional[Song]:
         """Get the current song"""
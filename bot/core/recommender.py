@@ -0,0 +1,267 @@
+"""
+Recommender Module
+Offline "what next?" suggestions learned from the bot's own listening history
+"""
+
+import os
+import time
+import sqlite3
+import threading
+import logging
+from collections import deque
+from typing import Container, Dict, Iterable, List, Optional, Tuple
+
+from .player_state import Song
+from ..config import RECOMMENDER_ENABLED, RECOMMENDER_PATH
+
+logger = logging.getLogger(__name__)
+
+# Songs of a session that count as played together
+CO_WINDOW = 5
+
+# A direct "played right after" counts this many co-occurrences
+TRANSITION_WEIGHT = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    video_id TEXT PRIMARY KEY,
+    title TEXT NOT NULL,
+    duration TEXT NOT NULL,
+    plays INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS transitions (
+    src TEXT NOT NULL,
+    dst TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (src, dst)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS cooccur (
+    a TEXT NOT NULL,
+    b TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (a, b)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS listens (
+    video_id TEXT PRIMARY KEY,
+    completed INTEGER NOT NULL DEFAULT 0,
+    skipped INTEGER NOT NULL DEFAULT 0,
+    last_played REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+# Video IDs per listen_stats() query (SQLite variable limit)
+STATS_BATCH = 500
+
+
+class Recommender:
+    """
+    Transition and co-occurrence counts of played songs, stored in SQLite
+    
+    Every song that starts playing is counted as following the previous
+    one (transition) and as played together with the last CO_WINDOW songs
+    of the session (co-occurrence, stored both ways). Candidates for a
+    song are its successors and neighbours ranked by the weighted counts,
+    answered from the primary key indexes without any network call.
+    
+    How songs are left is counted too (played to the end or skipped,
+    and when), smart shuffle weighs songs by it.
+    
+    Writes are one small transaction per song start; with WAL and
+    synchronous=NORMAL that stays well below a millisecond, so it is done
+    inline on the event loop.
+    """
+    
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._recent: deque = deque(maxlen=CO_WINDOW)
+        self._db: Optional[sqlite3.Connection] = None
+    
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use"""
+        if self._db is None:
+            try:
+                directory = os.path.dirname(self.path)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                db = sqlite3.connect(self.path, check_same_thread=False)
+                db.execute("PRAGMA journal_mode=WAL")
+                db.execute("PRAGMA synchronous=NORMAL")
+                db.executescript(SCHEMA)
+                self._db = db
+                logger.info(f"🧠 Listening history: {self.path}")
+            except sqlite3.Error as e:
+                logger.error(f"❌ Could not open listening history: {e}")
+        return self._db
+    
+    def record_play(self, song: Song):
+        """
+        Count a song that started playing
+        
+        Args:
+            song: Song that started
+        """
+        video_id = song.video_id
+        if not video_id:
+            return
+        # A looped song is not its own successor
+        if self._recent and self._recent[-1] == video_id:
+            return
+        
+        previous = self._recent[-1] if self._recent else None
+        neighbours = {v for v in self._recent if v != video_id}
+        self._recent.append(video_id)
+        
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT INTO tracks (video_id, title, duration, plays) VALUES (?, ?, ?, 1) "
+                    "ON CONFLICT(video_id) DO UPDATE SET title = excluded.title, "
+                    "duration = CASE WHEN excluded.duration IN ('None', 'Unknown', '') "
+                    "THEN duration ELSE excluded.duration END, plays = plays + 1",
+                    (video_id, song.title, song.duration)
+                )
+                if previous and previous != video_id:
+                    db.execute(
+                        "INSERT INTO transitions (src, dst, count) VALUES (?, ?, 1) "
+                        "ON CONFLICT(src, dst) DO UPDATE SET count = count + 1",
+                        (previous, video_id)
+                    )
+                if neighbours:
+                    db.executemany(
+                        "INSERT INTO cooccur (a, b, count) VALUES (?, ?, 1) "
+                        "ON CONFLICT(a, b) DO UPDATE SET count = count + 1",
+                        [pair for v in neighbours for pair in ((v, video_id), (video_id, v))]
+                    )
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Could not record play: {e}")
+    
+    def record_listen(self, song: Song, completed: bool):
+        """
+        Count how a song was left
+        
+        Args:
+            song: Song that stopped playing
+            completed: True if it played to the end, False if it was skipped
+        """
+        video_id = song.video_id
+        if not video_id:
+            return
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return
+            try:
+                db.execute(
+                    "INSERT INTO listens (video_id, completed, skipped, last_played) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(video_id) DO UPDATE SET completed = completed + excluded.completed, "
+                    "skipped = skipped + excluded.skipped, last_played = excluded.last_played",
+                    (video_id, int(completed), int(not completed), time.time())
+                )
+                db.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Could not record listen: {e}")
+    
+    def listen_stats(self, video_ids: Iterable[str]) -> Dict[str, Tuple[int, int, float]]:
+        """
+        Get completion and skip counts of songs
+        
+        Args:
+            video_ids: Video IDs to look up
+        
+        Returns:
+            Dict of video ID -> (completed, skipped, last played timestamp),
+            songs never left yet are missing
+        """
+        ids = [v for v in set(video_ids) if v]
+        stats = {}
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return stats
+            for start in range(0, len(ids), STATS_BATCH):
+                batch = ids[start:start + STATS_BATCH]
+                rows = db.execute(
+                    "SELECT video_id, completed, skipped, last_played FROM listens "
+                    f"WHERE video_id IN ({','.join('?' * len(batch))})",
+                    batch
+                )
+                for video_id, completed, skipped, last_played in rows:
+                    stats[video_id] = (completed, skipped, last_played)
+        return stats
+    
+    def end_session(self):
+        """Forget the recent songs, the next play starts a new session"""
+        self._recent.clear()
+    
+    def recommend(self, song: Song, count: int = 3, exclude: Container[str] = ()) -> List[Song]:
+        """
+        Get songs that were played after or together with a song
+        
+        Args:
+            song: Song to get recommendations for
+            count: Maximum number of songs
+            exclude: Video IDs to leave out (e.g. the queue's video_ids())
+        
+        Returns:
+            Songs ranked by weighted transition and co-occurrence counts,
+            empty if the history knows nothing about the song
+        """
+        video_id = song.video_id
+        if not video_id:
+            return []
+        
+        songs = []
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return []
+            rows = db.execute(
+                "SELECT t.video_id, t.title, t.duration, SUM(s.w) AS score FROM ("
+                "  SELECT dst AS id, count * ? AS w FROM transitions WHERE src = ?"
+                "  UNION ALL SELECT b, count FROM cooccur WHERE a = ?"
+                ") s JOIN tracks t ON t.video_id = s.id "
+                "GROUP BY s.id ORDER BY score DESC, t.plays DESC",
+                (TRANSITION_WEIGHT, video_id, video_id)
+            )
+            # Ranked rows are read until enough of them are not excluded
+            for v, title, duration, _ in rows:
+                if v == video_id or v in exclude:
+                    continue
+                songs.append(Song(url=f"https://www.youtube.com/watch?v={v}", title=title, duration=duration))
+                if len(songs) >= count:
+                    break
+        return songs
+    
+    def stats(self) -> dict:
+        """Get the number of known songs and learned transitions"""
+        with self._lock:
+            db = self._connect()
+            if db is None:
+                return {'tracks': 0, 'transitions': 0}
+            return {
+                'tracks': db.execute("SELECT COUNT(*) FROM tracks").fetchone()[0],
+                'transitions': db.execute("SELECT COUNT(*) FROM transitions").fetchone()[0],
+            }
+    
+    def close(self):
+        """Close the database"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class _DisabledRecommender(Recommender):
+    """Stand-in when RECOMMENDER is off, nothing is learned or suggested"""
+    
+    def _connect(self):
+        return None
+
+
+# Global recommender instance
+recommender = (Recommender if RECOMMENDER_ENABLED else _DisabledRecommender)(RECOMMENDER_PATH)
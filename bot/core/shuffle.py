@@ -0,0 +1,352 @@
+"""
+Shuffle Module
+Play order for shuffle mode: every song once per round, with a history for Previous
+"""
+
+import time
+import random
+import logging
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .player_state import Song, player
+from .song_queue import SongQueue, FenwickTree
+from .recommender import recommender
+
+logger = logging.getLogger(__name__)
+
+# Played songs remembered for Previous
+SHUFFLE_HISTORY = 500
+
+# Smart shuffle: songs played within this many hours are drawn less
+SMART_RECENT_HOURS = 12
+
+# Smart shuffle: weight factor of a song that was just played
+SMART_MIN_RECENCY = 0.1
+
+
+class ShuffleOrder:
+    """
+    Lazily generated Fisher-Yates permutation over the queue's slots
+    
+    The slots of a round are kept as a virtual array: positions below
+    remaining are not drawn yet, the rest are. Drawing swaps a random
+    undrawn position with the last one and shrinks remaining, which is
+    one step of Fisher-Yates, so only the part of the permutation that
+    is actually played gets generated. Positions hold their own slot
+    unless stored otherwise, so the state is two small dicts of the
+    touched positions plus a few numbers, no matter how long the queue.
+    
+    Songs added mid-round get a new slot that is swapped into the
+    undrawn part in O(1), without reshuffling. Removed songs are skipped
+    when drawn. Drawn songs go onto a history with a cursor: Previous
+    walks back through it, Next walks forward through it before drawing
+    again.
+    
+    Subclasses change how a round is drawn by overriding _reset_pool,
+    _add_slots, _draw, _played, _unplayed and _refill.
+    """
+    
+    def __init__(self, queue: SongQueue):
+        self._queue = queue
+        self._rng = random.Random()
+        self.reset()
+    
+    def reset(self):
+        """Forget the order and history, the next draw starts a new round"""
+        self._epoch = self._queue.epoch
+        self._known = 0  # slots below this are part of the order
+        self._history: List[int] = []  # slots in play order
+        self._cursor = -1  # history index of the current song
+        self._avoid: Optional[int] = None  # slot not to draw first in a new round
+        self._reset_pool()
+    
+    def _reset_pool(self):
+        self._remaining = 0  # positions below this are not drawn yet
+        self._perm: Dict[int, int] = {}  # position -> slot, where they differ
+        self._where: Dict[int, int] = {}  # slot -> position, where they differ
+    
+    def _put(self, pos: int, slot: int):
+        if pos == slot:
+            self._perm.pop(pos, None)
+            self._where.pop(slot, None)
+        else:
+            self._perm[pos] = slot
+            self._where[slot] = pos
+    
+    def _swap(self, a: int, b: int):
+        """Swap the slots at two positions"""
+        slot_a = self._perm.get(a, a)
+        slot_b = self._perm.get(b, b)
+        self._put(a, slot_b)
+        self._put(b, slot_a)
+    
+    def _add_slots(self, start: int, end: int):
+        """Make new slots undrawn"""
+        # A new slot starts at the end; swapping it to the front of the
+        # drawn part makes it undrawn
+        for slot in range(start, end):
+            self._swap(slot, self._remaining)
+            self._remaining += 1
+    
+    def _draw(self) -> Optional[int]:
+        """Draw a random undrawn slot, None if the round is over"""
+        if not self._remaining:
+            return None
+        pos = self._rng.randrange(self._remaining)
+        slot = self._perm.get(pos, pos)
+        self._swap(pos, self._remaining - 1)
+        self._remaining -= 1
+        return slot
+    
+    def _played(self, slot: int):
+        """Mark a slot as drawn (a song picked by hand)"""
+        if self._where.get(slot, slot) < self._remaining:
+            self._swap(self._where.get(slot, slot), self._remaining - 1)
+            self._remaining -= 1
+    
+    def _unplayed(self, slot: int):
+        """Mark a slot as undrawn again (a lined-up song that was not played)"""
+        if self._where.get(slot, slot) >= self._remaining:
+            self._swap(self._where.get(slot, slot), self._remaining)
+            self._remaining += 1
+    
+    def _refill(self):
+        """Make every slot undrawn"""
+        self._remaining = self._known
+    
+    def _sync(self):
+        """Catch up with the queue: splice in new songs, follow the current one"""
+        if self._queue.epoch != self._epoch:
+            self.reset()
+        
+        if self._known < self._queue.slot_count:
+            self._add_slots(self._known, self._queue.slot_count)
+            self._known = self._queue.slot_count
+        
+        current = self._queue.cursor_handle()
+        if current is None:
+            return
+        slot = current.slot
+        history = self._history
+        if 0 <= self._cursor < len(history) and history[self._cursor] == slot:
+            return
+        if self._cursor + 1 < len(history) and history[self._cursor + 1] == slot:
+            # Played the song we had lined up (end of song, gapless)
+            self._cursor += 1
+            return
+        
+        # Picked by hand: what was lined up goes back into the round
+        for lined_up in history[self._cursor + 1:]:
+            self._unplayed(lined_up)
+        del history[self._cursor + 1:]
+        self._played(slot)
+        self._remember(slot)
+        self._cursor = len(history) - 1
+    
+    def _remember(self, slot: int):
+        """Add a slot to the history, dropping the oldest past SHUFFLE_HISTORY"""
+        self._history.append(slot)
+        excess = len(self._history) - SHUFFLE_HISTORY
+        if excess > 0:
+            del self._history[:excess]
+            self._cursor -= excess
+    
+    def _line_up(self, accept: Callable[[Song], bool]):
+        """Entry after the cursor, drawing one if needed; None at the end of the round"""
+        history = self._history
+        while self._cursor + 1 < len(history):
+            entry = self._queue.by_slot(history[self._cursor + 1])
+            if entry is not None and accept(entry.song):
+                return entry
+            del history[self._cursor + 1]
+        
+        while True:
+            slot = self._draw()
+            if slot is not None and slot == self._avoid:
+                # Don't start a round with the song that ended the last one
+                other = self._draw()
+                if other is not None:
+                    self._unplayed(slot)
+                    slot = other
+            self._avoid = None
+            if slot is None:
+                return None
+            entry = self._queue.by_slot(slot)
+            if entry is None or not accept(entry.song):
+                continue
+            self._remember(slot)
+            return entry
+    
+    def peek(self, accept: Callable[[Song], bool] = lambda song: True):
+        """
+        Get the song that plays next, without moving
+        
+        Repeated calls return the same song until the current one changes.
+        
+        Args:
+            accept: Songs it returns False for are dropped from the round
+        
+        Returns:
+            Queue handle, or None if every song of the round was played
+        """
+        self._sync()
+        return self._line_up(accept)
+    
+    def step(self, steps: int, accept: Callable[[Song], bool] = lambda song: True):
+        """
+        Move through the order (Next/Previous)
+        
+        Args:
+            steps: Songs to move, negative to go back through the history
+            accept: Songs it returns False for are skipped
+        
+        Returns:
+            Queue handle of the song moved to, None if it could not move
+            at all (end of the round, or start of the history)
+        """
+        self._sync()
+        history = self._history
+        entry = None
+        for _ in range(abs(steps)):
+            if steps > 0:
+                moved = self._line_up(accept)
+                if moved is None:
+                    break
+                self._cursor += 1
+            else:
+                moved = None
+                while self._cursor > 0 and moved is None:
+                    self._cursor -= 1
+                    moved = self._queue.by_slot(history[self._cursor])
+                    if moved is None or not accept(moved.song):
+                        # Removed from the queue or unplayable now
+                        del history[self._cursor]
+                        moved = None
+                if moved is None:
+                    break
+            entry = moved
+        return entry
+    
+    def new_round(self):
+        """Make every song drawable again, e.g. when the queue restarts"""
+        self._sync()
+        del self._history[self._cursor + 1:]
+        self._refill()
+        current = self._queue.cursor_handle()
+        self._avoid = current.slot if current is not None else None
+        logger.info("🔀 New shuffle round")
+
+
+class SmartShuffleOrder(ShuffleOrder):
+    """
+    Shuffle order that draws songs by weight instead of uniformly
+    
+    A song's weight is its completion rate from the listening history
+    (played to the end vs. skipped, starting at 1/2 for unknown songs)
+    times a recency factor that is SMART_MIN_RECENCY right after it was
+    played and grows back to 1 over SMART_RECENT_HOURS. So songs that
+    usually get finished come early in a round, often skipped and just
+    played ones late.
+    
+    The weights of the undrawn slots sit in a Fenwick tree indexed by
+    slot: a draw is a prefix-sum search for a random point below the
+    total and zeroing the drawn weight, both O(log n). New songs append
+    to the tree. When a song ends, update() recomputes the weight of its
+    slots from the new counts; that weight is used from the next round
+    on if the song was already drawn in this one.
+    """
+    
+    def _reset_pool(self):
+        self._weights = FenwickTree()  # slot -> weight while undrawn, else 0
+        self._base: List[float] = []  # slot -> weight for the next round
+        self._value: List[float] = []  # slot -> weight in the tree
+    
+    @staticmethod
+    def weight(stats: Optional[Tuple[int, int, float]], now: float) -> float:
+        """
+        Get the draw weight of a song
+        
+        Args:
+            stats: (completed, skipped, last played) from listen_stats(),
+                None for a song that was never left
+            now: Current timestamp
+        
+        Returns:
+            Weight between 0 and 1
+        """
+        if stats is None:
+            return 0.5
+        completed, skipped, last_played = stats
+        completion = (completed + 1) / (completed + skipped + 2)
+        age_hours = (now - last_played) / 3600
+        recency = min(1.0, max(SMART_MIN_RECENCY, age_hours / SMART_RECENT_HOURS))
+        return completion * recency
+    
+    def _set(self, slot: int, weight: float):
+        """Change the weight of a slot in the tree"""
+        delta = weight - self._value[slot]
+        if delta:
+            self._value[slot] = weight
+            self._weights.add(slot, delta)
+    
+    def _add_slots(self, start: int, end: int):
+        entries = [self._queue.by_slot(slot) for slot in range(start, end)]
+        stats = recommender.listen_stats(entry.video_id for entry in entries if entry is not None)
+        now = time.time()
+        for entry in entries:
+            weight = SmartShuffleOrder.weight(stats.get(entry.video_id), now) if entry is not None else 0.0
+            self._base.append(weight)
+            self._value.append(weight)
+            self._weights.append(weight)
+    
+    def _draw(self) -> Optional[int]:
+        total = self._weights.total()
+        if total <= 1e-9:
+            return None
+        slot, _ = self._weights.find(self._rng.random() * total)
+        if slot >= len(self._value) or self._value[slot] <= 0:
+            # Float drift in the running sums, rebuild them
+            self._weights = FenwickTree(self._value)
+            total = self._weights.total()
+            if total <= 1e-9:
+                return None
+            slot, _ = self._weights.find(self._rng.random() * total)
+            slot = min(slot, len(self._value) - 1)
+        self._set(slot, 0.0)
+        return slot
+    
+    def _played(self, slot: int):
+        self._set(slot, 0.0)
+    
+    def _unplayed(self, slot: int):
+        if self._queue.by_slot(slot) is not None:
+            self._set(slot, self._base[slot])
+    
+    def _refill(self):
+        # Linear rebuild once per round also clears any float drift
+        self._value = [
+            self._base[slot] if self._queue.by_slot(slot) is not None else 0.0
+            for slot in range(self._known)
+        ]
+        self._weights = FenwickTree(self._value)
+    
+    def update(self, song: Song):
+        """
+        Reweight a song after it ended or was skipped
+        
+        Args:
+            song: Song whose listen was just recorded
+        """
+        slots = [slot for slot in self._queue.slots_of(song.video_id) if slot < len(self._base)]
+        if not slots or self._queue.epoch != self._epoch:
+            return
+        weight = SmartShuffleOrder.weight(recommender.listen_stats([song.video_id]).get(song.video_id), time.time())
+        for slot in slots:
+            self._base[slot] = weight
+            if self._value[slot] > 0:
+                self._set(slot, weight)
+
+
+# Global shuffle orders over the player's queue
+shuffle_order = ShuffleOrder(player.playlist)
+smart_shuffle_order = SmartShuffleOrder(player.playlist)
@@ -0,0 +1,454 @@
+"""
+Song Queue Module
+Indexed play queue that keeps positions and the cursor right across edits
+"""
+
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, KeysView, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    # player_state builds its queue from this module
+    from .player_state import Song
+
+# Songs per block; blocks are split when they grow past twice this
+BLOCK_SIZE = 512
+
+
+class FenwickTree:
+    """
+    Prefix sums over a list of numbers with O(log n) updates
+    
+    Used for the block sizes of SongQueue and for weighted picks.
+    """
+    
+    def __init__(self, values: Iterable[float] = ()):
+        self._tree = [0]
+        for value in values:
+            self._tree.append(value)
+        # Linear-time build: push every node into its parent
+        for i in range(1, len(self._tree)):
+            parent = i + (i & -i)
+            if parent < len(self._tree):
+                self._tree[parent] += self._tree[i]
+    
+    def __len__(self) -> int:
+        return len(self._tree) - 1
+    
+    def add(self, index: int, delta: float):
+        """Add delta to the value at index"""
+        i = index + 1
+        while i < len(self._tree):
+            self._tree[i] += delta
+            i += i & -i
+    
+    def append(self, value: float):
+        """Add a value at the end"""
+        i = len(self._tree)
+        # The new node covers (i - lowbit(i), i]
+        node = value + self.prefix(i - 1) - self.prefix(i - (i & -i))
+        self._tree.append(node)
+    
+    def prefix(self, count: int) -> float:
+        """Sum of the first count values"""
+        total = 0
+        i = count
+        while i > 0:
+            total += self._tree[i]
+            i -= i & -i
+        return total
+    
+    def total(self) -> float:
+        """Sum of all values"""
+        return self.prefix(len(self))
+    
+    def find(self, target: float) -> Tuple[int, float]:
+        """
+        Locate a point in the running sum
+        
+        Args:
+            target: Value with 0 <= target < total()
+        
+        Returns:
+            (index whose range contains target, target minus the sum before it)
+        """
+        pos = 0
+        step = 1 << (len(self._tree) - 1).bit_length()
+        while step:
+            nxt = pos + step
+            if nxt < len(self._tree) and self._tree[nxt] <= target:
+                pos = nxt
+                target -= self._tree[nxt]
+            step >>= 1
+        return pos, target
+
+
+class _Block:
+    """Consecutive queue entries"""
+    __slots__ = ('items', 'pos')
+    
+    def __init__(self, items: List['_Entry'], pos: int):
+        self.items = items
+        self.pos = pos
+
+
+class _Entry:
+    """One queued song; doubles as a handle that follows it across edits"""
+    __slots__ = ('song', 'video_id', 'block', 'slot')
+    
+    def __init__(self, song: 'Song', slot: int):
+        self.song = song
+        self.video_id = song.video_id
+        self.block: Optional[_Block] = None
+        self.slot = slot
+
+
+class SongQueue:
+    """
+    Play queue with a video ID index and a cursor
+    
+    Songs are kept in blocks of up to 2 * BLOCK_SIZE with a Fenwick tree
+    over the block sizes, so finding, inserting and removing a position
+    is O(log n) plus a shift inside one block; appending is amortised
+    O(1). Every video ID maps to its queue entries, which makes dedup,
+    remove-by-ID and looking up a song's position cheap.
+    
+    The cursor (the current song) is a reference to an entry, not a
+    number, so it stays on its song when songs are inserted, removed or
+    moved before it. handle() gives the same kind of reference for other
+    positions (e.g. the prefetched song).
+    
+    Every song also gets a slot number when it is added. Slots stay the
+    same while the song is queued and are only reused after clear(),
+    which starts a new epoch. The shuffle order is built over slots.
+    
+    Reading works like a list: len(), iteration, queue[i] and queue[-1].
+    Positions given to the cursor and handle() are never wrapped, a
+    negative one raises IndexError.
+    """
+    
+    def __init__(self, songs: Iterable['Song'] = ()):
+        self._blocks: List[_Block] = []
+        self._sizes = FenwickTree()
+        self._by_id: Dict[Optional[str], List[_Entry]] = {}
+        self._length = 0
+        self._cursor: Optional[_Entry] = None
+        self._cursor_fallback = 0
+        self._slots: Dict[int, _Entry] = {}
+        self._next_slot = 0
+        self.epoch = 0
+        self.extend(songs)
+    
+    def __len__(self) -> int:
+        return self._length
+    
+    def __iter__(self) -> Iterator['Song']:
+        for block in self._blocks:
+            for entry in block.items:
+                yield entry.song
+    
+    def __getitem__(self, index: int) -> 'Song':
+        return self._entry_at(self._normalize(index)).song
+    
+    def __repr__(self) -> str:
+        return f"SongQueue({self._length} songs, cursor={self.cursor})"
+    
+    def _normalize(self, index: int) -> int:
+        """Resolve a negative index, raise IndexError if out of range"""
+        if index < 0:
+            index += self._length
+        if not 0 <= index < self._length:
+            raise IndexError("queue index out of range")
+        return index
+    
+    def _find(self, index: int) -> Tuple[_Block, int]:
+        """Block and offset of a position, raise IndexError if out of range (no wrapping)"""
+        if not 0 <= index < self._length:
+            raise IndexError("queue index out of range")
+        block_index, offset = self._sizes.find(index)
+        return self._blocks[block_index], int(offset)
+    
+    def _entry_at(self, index: int) -> _Entry:
+        block, offset = self._find(index)
+        return block.items[offset]
+    
+    def _position(self, entry: _Entry) -> int:
+        """Position of an entry that is in the queue"""
+        block = entry.block
+        return int(self._sizes.prefix(block.pos)) + block.items.index(entry)
+    
+    def _renumber(self, start: int = 0):
+        """Fix block positions and rebuild the size tree after a split/drop"""
+        for pos in range(start, len(self._blocks)):
+            self._blocks[pos].pos = pos
+        self._sizes = FenwickTree(len(block.items) for block in self._blocks)
+    
+    def _link(self, entry: _Entry, index: int):
+        """Put an entry at a position (0 <= index <= len)"""
+        if index == self._length:
+            if not self._blocks or len(self._blocks[-1].items) >= BLOCK_SIZE:
+                block = _Block([], len(self._blocks))
+                self._blocks.append(block)
+                self._sizes.append(0)
+            block = self._blocks[-1]
+            block.items.append(entry)
+        else:
+            block_index, offset = self._sizes.find(index)
+            block = self._blocks[block_index]
+            block.items.insert(int(offset), entry)
+        entry.block = block
+        self._sizes.add(block.pos, 1)
+        self._length += 1
+        
+        if len(block.items) > 2 * BLOCK_SIZE:
+            tail = _Block(block.items[BLOCK_SIZE:], block.pos + 1)
+            del block.items[BLOCK_SIZE:]
+            for moved in tail.items:
+                moved.block = tail
+            self._blocks.insert(block.pos + 1, tail)
+            self._renumber(block.pos + 1)
+    
+    def _unlink(self, entry: _Entry, offset: Optional[int] = None):
+        """Take an entry out of its block (offset: its index in the block, if known)"""
+        block = entry.block
+        if offset is None:
+            block.items.remove(entry)
+        else:
+            del block.items[offset]
+        entry.block = None
+        self._sizes.add(block.pos, -1)
+        self._length -= 1
+        if not block.items:
+            del self._blocks[block.pos]
+            self._renumber(block.pos)
+    
+    def _forget(self, entry: _Entry, offset: Optional[int] = None):
+        """Remove an entry from the queue and the ID index"""
+        index = self._position(entry) if entry is self._cursor else None
+        self._unlink(entry, offset)
+        del self._slots[entry.slot]
+        entries = self._by_id[entry.video_id]
+        entries.remove(entry)
+        if not entries:
+            del self._by_id[entry.video_id]
+        if index is not None:
+            # The song that moved up into its place becomes current
+            if index < self._length:
+                self._cursor = self._entry_at(index)
+            else:
+                self._cursor = None
+                self._cursor_fallback = index
+    
+    def append(self, song: 'Song') -> int:
+        """
+        Add a song at the end
+        
+        Returns:
+            Position of the song
+        """
+        return self.insert(self._length, song)
+    
+    def extend(self, songs: Iterable['Song']):
+        """
+        Add songs at the end
+        
+        The entries are packed into blocks directly, so the size tree is
+        touched once per block instead of once per song.
+        """
+        entries = []
+        for song in songs:
+            entry = _Entry(song, self._next_slot)
+            self._next_slot += 1
+            self._slots[entry.slot] = entry
+            self._by_id.setdefault(entry.video_id, []).append(entry)
+            entries.append(entry)
+        if not entries:
+            return
+        
+        start = 0
+        if self._blocks and len(self._blocks[-1].items) < BLOCK_SIZE:
+            # Top up the last block first
+            block = self._blocks[-1]
+            start = BLOCK_SIZE - len(block.items)
+            for entry in entries[:start]:
+                entry.block = block
+            block.items.extend(entries[:start])
+            self._sizes.add(block.pos, len(entries[:start]))
+        for i in range(start, len(entries), BLOCK_SIZE):
+            block = _Block(entries[i:i + BLOCK_SIZE], len(self._blocks))
+            for entry in block.items:
+                entry.block = block
+            self._blocks.append(block)
+            self._sizes.append(len(block.items))
+        self._length += len(entries)
+    
+    def insert(self, index: int, song: 'Song') -> int:
+        """
+        Insert a song before a position (clamped like list.insert)
+        
+        Returns:
+            Position of the song
+        """
+        if index < 0:
+            index = max(0, index + self._length)
+        index = min(index, self._length)
+        entry = _Entry(song, self._next_slot)
+        self._next_slot += 1
+        self._slots[entry.slot] = entry
+        self._link(entry, index)
+        self._by_id.setdefault(entry.video_id, []).append(entry)
+        return index
+    
+    def insert_next(self, song: 'Song') -> int:
+        """
+        Insert a song right after the current one ("play next")
+        
+        Returns:
+            Position of the song
+        """
+        cursor = self.cursor
+        return self.insert(cursor + 1 if cursor < self._length else self._length, song)
+    
+    def pop(self, index: int = -1) -> 'Song':
+        """Remove and return the song at a position"""
+        block, offset = self._find(self._normalize(index))
+        entry = block.items[offset]
+        self._forget(entry, offset)
+        return entry.song
+    
+    def remove_id(self, video_id: str) -> int:
+        """
+        Remove every copy of a video
+        
+        Returns:
+            Number of songs removed
+        """
+        entries = list(self._by_id.get(video_id, ()))
+        for entry in entries:
+            self._forget(entry)
+        return len(entries)
+    
+    def move(self, source: int, target: int):
+        """Move the song at source so it ends up at target (the cursor stays on its song)"""
+        block, offset = self._find(self._normalize(source))
+        entry = block.items[offset]
+        target = self._normalize(target)
+        self._unlink(entry, offset)
+        self._link(entry, target)
+    
+    def dedup(self) -> int:
+        """
+        Keep one copy of every video: the current song, else the first one
+        
+        The ID index tells which videos are queued more than once; one
+        pass over the blocks then drops their extra copies, instead of a
+        removal per copy.
+        
+        Returns:
+            Number of songs removed
+        """
+        repeated = {video_id for video_id, entries in self._by_id.items() if len(entries) > 1}
+        if not repeated:
+            return 0
+        
+        kept: Dict[Optional[str], _Entry] = {}
+        if self._cursor is not None and self._cursor.video_id in repeated:
+            kept[self._cursor.video_id] = self._cursor
+        removed = 0
+        blocks = []
+        for block in self._blocks:
+            items = []
+            for entry in block.items:
+                if entry.video_id not in repeated or kept.setdefault(entry.video_id, entry) is entry:
+                    items.append(entry)
+                else:
+                    del self._slots[entry.slot]
+                    entry.block = None
+                    removed += 1
+            block.items = items
+            if items:
+                blocks.append(block)
+        for video_id in repeated:
+            self._by_id[video_id] = [kept[video_id]]
+        
+        # The cursor is always kept, so it needs no fixing
+        self._blocks = blocks
+        self._length -= removed
+        self._renumber()
+        return removed
+    
+    def clear(self):
+        """Remove all songs"""
+        for block in self._blocks:
+            for entry in block.items:
+                entry.block = None
+        self._blocks = []
+        self._sizes = FenwickTree()
+        self._by_id = {}
+        self._length = 0
+        self._cursor = None
+        self._cursor_fallback = 0
+        self._slots = {}
+        self._next_slot = 0
+        self.epoch += 1
+    
+    def position_of(self, video_id: str) -> Optional[int]:
+        """First position of a video, None if not queued"""
+        entries = self._by_id.get(video_id)
+        if not entries:
+            return None
+        return min(self._position(entry) for entry in entries)
+    
+    def songs_with_id(self, video_id: str) -> List['Song']:
+        """Every queued copy of a video"""
+        return [entry.song for entry in self._by_id.get(video_id, ())]
+    
+    def slots_of(self, video_id: str) -> List[int]:
+        """Slots of every queued copy of a video"""
+        return [entry.slot for entry in self._by_id.get(video_id, ())]
+    
+    def video_ids(self) -> KeysView:
+        """Live view of the queued video IDs"""
+        return self._by_id.keys()
+    
+    @property
+    def cursor(self) -> int:
+        """Position of the current song"""
+        if self._cursor is None:
+            if self._cursor_fallback >= self._length:
+                return self._cursor_fallback
+            # Songs arrived at the remembered position, follow that one
+            self._cursor = self._entry_at(self._cursor_fallback)
+        return self._position(self._cursor)
+    
+    @cursor.setter
+    def cursor(self, index: int):
+        if index < 0:
+            raise IndexError("queue index out of range")
+        if index < self._length:
+            self._cursor = self._entry_at(index)
+        else:
+            self._cursor = None
+            self._cursor_fallback = index
+    
+    def cursor_handle(self) -> Optional[_Entry]:
+        """Reference to the current song, None past the end"""
+        cursor = self.cursor
+        return self._cursor if cursor < self._length else None
+    
+    def handle(self, index: int) -> _Entry:
+        """Reference to the song at a position, for locate()"""
+        return self._entry_at(index)
+    
+    def locate(self, handle: Optional[_Entry]) -> Optional[int]:
+        """Current position of a handle, None if its song was removed"""
+        if handle is None or handle.block is None:
+            return None
+        return self._position(handle)
+    
+    @property
+    def slot_count(self) -> int:
+        """Slots handed out in this epoch (songs added since the last clear)"""
+        return self._next_slot
+    
+    def by_slot(self, slot: int) -> Optional[_Entry]:
+        """Entry of a slot, None if its song was removed"""
+        return self._slots.get(slot)
@@ -0,0 +1,168 @@
+"""
+Suggestions Module
+Fetches YouTube suggestions ahead of the end of the queue
+"""
+
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Dict, List, Optional
+
+from .player_state import player, Song
+from .extraction import ExtractionService, ExtractionCancelled
+from .recommender import recommender
+from ..config import ENABLE_YOUTUBE_SUGGESTIONS
+
+logger = logging.getLogger(__name__)
+
+# Suggestions fetched per video
+SUGGESTION_COUNT = 3
+
+# Seconds the end-of-queue dialog waits for suggestions
+SUGGESTION_TIMEOUT = 30
+
+# Videos whose suggestions are kept in memory (least recently used go first)
+SUGGESTION_CACHE_SIZE = 100
+
+# ExtractionService job group of the suggestion requests
+SUGGEST_KEY = 'suggestions'
+
+
+class SuggestionService:
+    """
+    Related videos for the end of the queue, fetched in the background
+    
+    As soon as the song the queue ends with starts playing (the last
+    index, or the last of a shuffle round) its suggestions are requested,
+    so when the track ends the dialog can be shown at once. The local
+    recommender answers first; YouTube is only asked on the extraction
+    pool when the listening history has no candidates. Results of the
+    last SUGGESTION_CACHE_SIZE videos are kept in memory (the metadata
+    cache keeps YouTube's across restarts).
+    """
+    
+    _cache: 'OrderedDict[str, List[Song]]' = OrderedDict()
+    _tasks: Dict[str, asyncio.Task] = {}
+    
+    @staticmethod
+    def enabled() -> bool:
+        """Check if suggestions are switched on"""
+        return ENABLE_YOUTUBE_SUGGESTIONS and player.yt_suggestions_enabled
+    
+    @staticmethod
+    def on_track_started(last_in_queue: bool):
+        """
+        Learn from the started song, prefetch if the queue ends after it
+        
+        Args:
+            last_in_queue: Nothing plays after this song (peek_next_index()
+                is None, which takes shuffle into account)
+        """
+        song = player.current_song
+        if song:
+            recommender.record_play(song)
+        if song and last_in_queue and not player.loop_enabled and SuggestionService.enabled():
+            SuggestionService.prefetch(song)
+    
+    @staticmethod
+    def prefetch(song: Song) -> Optional[asyncio.Task]:
+        """
+        Start fetching the suggestions of a song unless known or running
+        
+        Args:
+            song: Song to get suggestions for
+        
+        Returns:
+            Fetch task, or None if the song has no video ID or is cached
+        """
+        video_id = song.video_id
+        if not video_id or video_id in SuggestionService._cache:
+            return None
+        task = SuggestionService._tasks.get(video_id)
+        if task is None or task.done():
+            logger.info(f"🔍 Fetching suggestions for: {song.title}")
+            task = asyncio.create_task(SuggestionService._fetch(song))
+            SuggestionService._tasks[video_id] = task
+        return task
+    
+    @staticmethod
+    async def _fetch(song: Song) -> Optional[List[Song]]:
+        """Fetch and remember the suggestions of a song, None if cancelled"""
+        video_id = song.video_id
+        
+        queued = player.playlist.video_ids()
+        suggestions = recommender.recommend(song, SUGGESTION_COUNT, exclude=queued)
+        if suggestions:
+            SuggestionService._tasks.pop(video_id, None)
+            SuggestionService._remember(video_id, suggestions)
+            logger.info(f"🧠 {len(suggestions)} suggestions from listening history for: {song.title}")
+            return suggestions
+        
+        try:
+            suggestions = await ExtractionService.get_related_videos(song.url, SUGGESTION_COUNT, key=SUGGEST_KEY)
+        except ExtractionCancelled:
+            # cancel(): playback moved on, this is not "no suggestions"
+            logger.info(f"🛑 Suggestion request cancelled for: {song.title}")
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️ Could not fetch suggestions: {e}")
+            return []
+        finally:
+            SuggestionService._tasks.pop(video_id, None)
+        
+        # Empty results are not cached so a later attempt can retry
+        if suggestions:
+            SuggestionService._remember(video_id, suggestions)
+            logger.info(f"✅ {len(suggestions)} suggestions ready for: {song.title}")
+        return suggestions
+    
+    @staticmethod
+    def _remember(video_id: str, suggestions: List[Song]):
+        """Cache suggestions, dropping the least recently used past the limit"""
+        cache = SuggestionService._cache
+        cache[video_id] = suggestions
+        cache.move_to_end(video_id)
+        while len(cache) > SUGGESTION_CACHE_SIZE:
+            cache.popitem(last=False)
+    
+    @staticmethod
+    def get_cached(song: Song) -> Optional[List[Song]]:
+        """Get already fetched suggestions of a song, None if not fetched yet"""
+        suggestions = SuggestionService._cache.get(song.video_id)
+        if suggestions is not None:
+            SuggestionService._cache.move_to_end(song.video_id)
+        return suggestions
+    
+    @staticmethod
+    async def get(song: Song, timeout: float = SUGGESTION_TIMEOUT) -> Optional[List[Song]]:
+        """
+        Get the suggestions of a song, fetching them if needed
+        
+        Joins a prefetch in flight instead of starting another request.
+        Cancelling the caller leaves the shared fetch running; cancel()
+        stops the request itself.
+        
+        Args:
+            song: Song to get suggestions for
+            timeout: Seconds to wait for the fetch
+        
+        Returns:
+            Suggested songs (empty if none were found in time), None if
+            the request was cancelled by cancel()
+        """
+        cached = SuggestionService.get_cached(song)
+        if cached is not None:
+            return cached
+        task = SuggestionService.prefetch(song)
+        if task is None:
+            return []
+        try:
+            return await asyncio.wait_for(asyncio.shield(task), timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"⏱️ Timeout fetching suggestions ({timeout:g}s) - skipping")
+            return []
+    
+    @staticmethod
+    def cancel():
+        """Stop all suggestion requests in flight"""
+        ExtractionService.cancel(SUGGEST_KEY)
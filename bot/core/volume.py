@@ -0,0 +1,171 @@
+"""
+Volume Control Module
+Coalesces bursts of volume requests into a single mixer update
+"""
+
+import asyncio
+import logging
+from typing import List, Optional
+
+from .player_state import player
+from .mpv_ipc import mpv_ipc
+from .mpv_player import MPVPlayer
+from .mixer import get_mixer
+
+logger = logging.getLogger(__name__)
+
+# Seconds to collect further presses before applying the target
+COALESCE_WINDOW = 0.15
+
+
+class VolumeController:
+    """
+    Single point for all volume and mute changes
+    
+    Requests only move a pending target. The first request of a burst
+    starts an apply task that waits COALESCE_WINDOW for more presses and
+    then applies the final target once, so five quick +10 taps become one
+    +50. Volume and mute are cached in PlayerState (updated by mpv's
+    property observers), the UI reads them from there.
+    
+    The mpv volume/mute properties are used while the IPC connection is
+    up. Only without it is the system mixer backend touched, with one call
+    per burst.
+    """
+    
+    _target_volume: Optional[int] = None
+    _target_muted: Optional[bool] = None
+    _apply_task: Optional[asyncio.Task] = None
+    _waiters: List[asyncio.Future] = []
+    
+    @staticmethod
+    async def set(volume: int) -> bool:
+        """
+        Request an absolute volume
+        
+        Args:
+            volume: Volume level (0-100)
+        
+        Returns:
+            True if the burst containing this request was applied
+        """
+        VolumeController._target_volume = max(0, min(100, volume))
+        return await VolumeController._schedule()
+    
+    @staticmethod
+    async def change(delta: int) -> bool:
+        """
+        Request a relative volume change on top of any pending target
+        
+        Args:
+            delta: Percentage points to add (negative to lower)
+        
+        Returns:
+            True if the burst containing this request was applied
+        """
+        if VolumeController._target_volume is None and not mpv_ipc.connected:
+            await VolumeController._sync_from_mixer()
+        base = VolumeController._target_volume
+        if base is None:
+            base = player.volume
+        VolumeController._target_volume = max(0, min(100, base + delta))
+        return await VolumeController._schedule()
+    
+    @staticmethod
+    async def toggle_mute() -> bool:
+        """
+        Request a mute toggle on top of any pending mute target
+        
+        Returns:
+            True if the burst containing this request was applied
+        """
+        if VolumeController._target_muted is None and not mpv_ipc.connected:
+            await VolumeController._sync_from_mixer()
+        base = VolumeController._target_muted
+        if base is None:
+            base = player.is_muted
+        VolumeController._target_muted = not base
+        return await VolumeController._schedule()
+    
+    @staticmethod
+    async def _sync_from_mixer():
+        """
+        Load the system mixer's level into PlayerState
+        
+        Without mpv the cached volume is whatever mpv last reported (or
+        the default), not what the system mixer is at, so a relative
+        change reads the mixer first. Once per burst, while no target
+        is pending.
+        """
+        mixer = get_mixer()
+        if mixer.blocking:
+            state = await asyncio.get_running_loop().run_in_executor(None, mixer.get)
+        else:
+            state = mixer.get()
+        if state is not None:
+            player.volume, player.is_muted = state
+    
+    @staticmethod
+    async def _schedule() -> bool:
+        """Join the current burst and wait until it is applied"""
+        future = asyncio.get_running_loop().create_future()
+        VolumeController._waiters.append(future)
+        
+        task = VolumeController._apply_task
+        if task is None or task.done():
+            VolumeController._apply_task = asyncio.create_task(VolumeController._apply_loop())
+        
+        return await future
+    
+    @staticmethod
+    async def _apply_loop():
+        """Apply pending targets until no new request arrived meanwhile"""
+        while True:
+            await asyncio.sleep(COALESCE_WINDOW)
+            
+            volume = VolumeController._target_volume
+            muted = VolumeController._target_muted
+            waiters = VolumeController._waiters
+            VolumeController._target_volume = None
+            VolumeController._target_muted = None
+            VolumeController._waiters = []
+            
+            if volume is None and muted is None:
+                return
+            
+            try:
+                success = await VolumeController._apply(volume, muted)
+            except Exception as e:
+                logger.error(f"❌ Error applying volume: {e}")
+                success = False
+            
+            for waiter in waiters:
+                if not waiter.done():
+                    waiter.set_result(success)
+    
+    @staticmethod
+    async def _apply(volume: Optional[int], muted: Optional[bool]) -> bool:
+        """Apply one coalesced target to mpv or the system mixer"""
+        if mpv_ipc.connected:
+            success = True
+            if volume is not None:
+                success = await MPVPlayer.set_property_confirmed("volume", volume) and success
+            if muted is not None:
+                success = await MPVPlayer.set_property_confirmed("mute", muted) and success
+            if success:
+                logger.info(f"🔊 Volume {player.volume}%{' (muted)' if player.is_muted else ''} via IPC")
+            return success
+        
+        # mpv is not up: fall back to the system mixer, one call per burst
+        mixer = get_mixer()
+        if mixer.blocking:
+            success = await asyncio.get_running_loop().run_in_executor(None, mixer.set, volume, muted)
+        else:
+            success = mixer.set(volume, muted)
+        if success:
+            if volume is not None:
+                player.volume = volume
+            if muted is not None:
+                player.is_muted = muted
+            logger.info(f"🔊 System volume {player.volume}%{' (muted)' if player.is_muted else ''} via {mixer.name}")
+        return success
@@ -3,67 +3,97 @@ YouTube Integration Module
 Handles all YouTube data extraction using yt-dlp
 """
 
+import time
 import logging
-from typing import List
-import yt_dlp
+from itertools import islice
+from typing import Iterator, List, Optional
+from urllib.parse import urlparse, parse_qs
 
 from .player_state import Song
-from ..config import YTDL_OPTIONS
+from .metadata_cache import metadata_cache
+from .ytdl_pool import YtdlPool
+from .failures import FailureCache, UNAVAILABLE_TITLES
+from ..config import CHANNEL_REFRESH_MINUTES
 
 logger = logging.getLogger(__name__)
 
+# Newest uploads kept per channel for the suggestion fallback
+CHANNEL_UPLOADS = 30
+
 
 class YouTubeExtractor:
     """YouTube data extractor using yt-dlp"""
     
     @staticmethod
-    def extract_playlist(url: str) -> List[Song]:
+    def iter_playlist(url: str) -> Iterator[Song]:
         """
-        Extract all videos from a YouTube playlist or single video
+        Yield the videos of a playlist as yt-dlp pages through it
+        
+        Uses lazy playlist iteration, so the first entries are available
+        after the first page instead of after the whole playlist. A single
+        video URL yields one song.
         
         Args:
             url: YouTube playlist or video URL
         
-        Returns:
-            List of Song objects
+        Yields:
+            Song objects in playlist order
         
         Raises:
             Exception if extraction fails
         """
-        try:
-            ydl_opts = YTDL_OPTIONS.copy()
-            ydl_opts['extract_flat'] = True
+        playlist_id = YouTubeExtractor.playlist_id(url)
+        if playlist_id:
+            cached = metadata_cache.get_playlist(playlist_id)
+            if cached is not None:
+                logger.info(f"💾 Playlist from cache: {len(cached)} songs")
+                yield from cached
+                return
+        else:
+            cached = metadata_cache.get(Song(url=url, title='').video_id)
+            if cached is not None:
+                logger.info(f"💾 Video from cache: {cached.title}")
+                yield cached
+                return
+        
+        with YtdlPool.acquire('stream') as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            if info.get('_type') == 'url':
+                # watch?v=...&list=... points at the playlist page
+                info = ydl.extract_info(info['url'], download=False, process=False)
             
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
-                
-                if 'entries' in info:
-                    # It's a playlist
-                    songs = []
-                    for entry in info['entries']:
-                        if entry:
-                            song = Song(
-                                url=f"https://www.youtube.com/watch?v={entry['id']}",
-                                title=entry.get('title', 'Unknown Title'),
-                                duration=str(entry.get('duration', 'Unknown'))
-                            )
-                            songs.append(song)
-                    
-                    logger.info(f"Extracted {len(songs)} songs from playlist")
-                    return songs
-                else:
-                    # Single video
-                    song = Song(
-                        url=url,
-                        title=info.get('title', 'Unknown Title'),
-                        duration=str(info.get('duration', 'Unknown'))
-                    )
-                    logger.info(f"Extracted single video: {song.title}")
-                    return [song]
-                    
-        except Exception as e:
-            logger.error(f"Error extracting YouTube data: {e}")
-            raise
+            if 'entries' not in info:
+                # Single video (or a redirect to one), resolve it fully
+                info = ydl.process_ie_result(info, download=False)
+            
+            if 'entries' not in info:
+                YouTubeExtractor._cache_info(info)
+                yield Song(
+                    url=url,
+                    title=info.get('title', 'Unknown Title'),
+                    duration=str(info.get('duration', 'Unknown'))
+                )
+                return
+            
+            entries = []
+            for entry in info['entries']:
+                if not entry or not entry.get('id'):
+                    continue
+                entries.append(entry)
+                song = Song(
+                    url=f"https://www.youtube.com/watch?v={entry['id']}",
+                    title=entry.get('title', 'Unknown Title'),
+                    duration=str(entry.get('duration', 'Unknown'))
+                )
+                # Listed but not playable, skipped once its turn comes
+                if song.title in UNAVAILABLE_TITLES:
+                    FailureCache.mark(song, UNAVAILABLE_TITLES[song.title])
+                yield song
+            
+            # Only a completely read playlist is cached
+            YouTubeExtractor._cache_entries(entries)
+            metadata_cache.put_playlist(playlist_id, [entry['id'] for entry in entries])
+            logger.info(f"Streamed {len(entries)} songs from playlist")
     
     @staticmethod
     def get_video_info(url: str) -> Song:
@@ -79,17 +109,22 @@ class YouTubeExtractor:
         Raises:
             Exception if extraction fails
         """
+        # Flat playlist entries are cached without a duration, those still
+        # need the full extraction
+        cached = metadata_cache.get(Song(url=url, title='').video_id)
+        if cached is not None and cached.duration_seconds is not None:
+            logger.info(f"💾 Video info from cache: {cached.title}")
+            return cached
+        
         try:
-            ydl_opts = YTDL_OPTIONS.copy()
-            ydl_opts['extract_flat'] = False
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            with YtdlPool.acquire('full') as ydl:
                 info = ydl.extract_info(url, download=False)
                 song = Song(
                     url=url,
                     title=info.get('title', 'Unknown Title'),
                     duration=str(info.get('duration', 'Unknown'))
                 )
+                YouTubeExtractor._cache_info(info)
                 logger.info(f"Got video info: {song.title}")
                 return song
                 
@@ -97,6 +132,108 @@ class YouTubeExtractor:
             logger.error(f"Error getting video info: {e}")
             raise
     
+    @staticmethod
+    def playlist_id(url: str) -> Optional[str]:
+        """
+        Get the playlist ID of a YouTube URL
+        
+        Args:
+            url: YouTube URL
+        
+        Returns:
+            Value of the list= parameter or None
+        """
+        return parse_qs(urlparse(url).query).get('list', [None])[0]
+    
+    @staticmethod
+    def _cache_info(info: dict):
+        """Store a fully extracted video and its related IDs in the metadata cache"""
+        video_id = info.get('id')
+        metadata_cache.put(
+            video_id,
+            info.get('title', 'Unknown Title'),
+            str(info.get('duration', 'Unknown')),
+            info.get('channel_id'),
+            info.get('channel') or info.get('uploader'),
+        )
+        related = info.get('related_videos')
+        if related:
+            YouTubeExtractor._cache_entries(related)
+            metadata_cache.put_related(video_id, [
+                vid.get('id', vid.get('video_id')) for vid in related if vid.get('id', vid.get('video_id'))
+            ])
+    
+    @staticmethod
+    def channel_uploads(channel_id: str) -> List[Song]:
+        """
+        Get the newest uploads of a channel
+        
+        The list is cached per channel. Within CHANNEL_REFRESH_MINUTES it
+        is returned without a request; after that the uploads page is
+        read from the top only until the first already known video, and
+        the new videos are put in front of the cached ones.
+        
+        Args:
+            channel_id: YouTube channel ID
+        
+        Returns:
+            Up to CHANNEL_UPLOADS songs, newest first
+        """
+        cached = metadata_cache.get_channel(channel_id)
+        known_songs = []
+        if cached:
+            known_songs = metadata_cache.get_many(cached[0]) or []
+            if known_songs and time.time() - cached[1] < CHANNEL_REFRESH_MINUTES * 60:
+                logger.info(f"💾 Channel uploads from cache: {len(known_songs)} videos")
+                return known_songs
+        known = {song.video_id for song in known_songs}
+        
+        logger.info("Fetching channel videos as fallback")
+        fresh = []
+        # Short socket timeout: a stalled channel page must not hold a worker
+        with YtdlPool.acquire('channel') as ydl:
+            channel_info = ydl.extract_info(
+                f"https://www.youtube.com/channel/{channel_id}/videos",
+                download=False,
+                process=False  # Don't process entries
+            )
+            # Entries are paged lazily, stopping early skips the older pages
+            for entry in islice(channel_info.get('entries') or [], CHANNEL_UPLOADS):
+                if not entry or not entry.get('id'):
+                    continue
+                if entry['id'] in known:
+                    break  # Everything from here on is cached
+                fresh.append(entry)
+        
+        YouTubeExtractor._cache_entries(fresh)
+        songs = [
+            Song(
+                url=f"https://www.youtube.com/watch?v={entry['id']}",
+                title=entry.get('title', 'Unknown Title'),
+                duration=str(entry.get('duration', 'Unknown'))
+            )
+            for entry in fresh
+        ]
+        songs = (songs + known_songs)[:CHANNEL_UPLOADS]
+        metadata_cache.put_channel(channel_id, [song.video_id for song in songs])
+        logger.info(f"Channel uploads: {len(fresh)} new, {len(songs)} total")
+        return songs
+    
+    @staticmethod
+    def _cache_entries(entries: list):
+        """Store flat playlist/related entries in the metadata cache"""
+        metadata_cache.put_many([
+            (
+                entry.get('id', entry.get('video_id')),
+                entry.get('title', 'Unknown Title'),
+                str(entry.get('duration', 'Unknown')),
+                entry.get('channel_id'),
+                entry.get('channel') or entry.get('uploader'),
+            )
+            for entry in entries
+            if entry and entry.get('id', entry.get('video_id'))
+        ])
+    
     @staticmethod
     def validate_url(url: str) -> bool:
         """
@@ -123,12 +260,17 @@ class YouTubeExtractor:
         Returns:
             List of Song objects (suggested videos)
         """
+        video_id = Song(url=video_url, title='').video_id
+        related_ids = metadata_cache.get_related(video_id)
+        if related_ids:
+            cached = metadata_cache.get_many(related_ids[:count])
+            if cached is not None:
+                logger.info(f"💾 {len(cached)} related videos from cache")
+                return cached
+        
         try:
-            ydl_opts = YTDL_OPTIONS.copy()
-            ydl_opts['extract_flat'] = 'in_playlist'  # Faster extraction
-            ydl_opts['socket_timeout'] = 10  # 10 second timeout
-            
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            # 'in_playlist' flat extraction with a 10 second socket timeout
+            with YtdlPool.acquire('related') as ydl:
                 # Extract info with timeout
                 info = ydl.extract_info(video_url, download=False)
                 
@@ -153,51 +295,33 @@ class YouTubeExtractor:
                             logger.debug(f"Error parsing related video: {e}")
                             continue
                 
-                # Method 2: Fallback - Use channel's recent videos (faster with extract_flat)
-                if len(related) < count and 'channel_id' in info:
+                # Method 2: Fallback - Use channel's recent uploads (cached per channel)
+                if len(related) < count and info.get('channel_id'):
                     try:
-                        logger.info("Fetching channel videos as fallback")
-                        channel_id = info['channel_id']
-                        channel_url = f"https://www.youtube.com/channel/{channel_id}/videos"
-                        
-                        # Use extract_flat for faster channel extraction
-                        ydl_opts['extract_flat'] = True
-                        with yt_dlp.YoutubeDL(ydl_opts) as ydl_channel:
-                            channel_info = ydl_channel.extract_info(
-                                channel_url,
-                                download=False,
-                                process=False  # Don't process entries
-                            )
-                            
-                            if 'entries' in channel_info:
-                                for entry in channel_info['entries'][:count * 2]:  # Get extra in case of duplicates
-                                    if not entry:
-                                        continue
-                                    
-                                    # Skip current video
-                                    entry_id = entry.get('id', entry.get('url', '').split('=')[-1])
-                                    current_id = info.get('id', '')
-                                    if entry_id == current_id:
-                                        continue
-                                    
-                                    try:
-                                        song = Song(
-                                            url=f"https://www.youtube.com/watch?v={entry_id}",
-                                            title=entry.get('title', 'Unknown Title'),
-                                            duration=str(entry.get('duration', 'Unknown'))
-                                        )
-                                        related.append(song)
-                                        
-                                        if len(related) >= count:
-                                            break
-                                    except Exception as e:
-                                        logger.debug(f"Error parsing channel video: {e}")
-                                        continue
+                        seen = {info.get('id')} | {song.video_id for song in related}
+                        for song in YouTubeExtractor.channel_uploads(info['channel_id']):
+                            if song.video_id in seen:
+                                continue
+                            seen.add(song.video_id)
+                            related.append(song)
+                            if len(related) >= count:
+                                break
                     except Exception as e:
                         logger.warning(f"Could not fetch channel videos: {e}")
                 
                 if related:
                     logger.info(f"✅ Found {len(related)} related videos")
+                    metadata_cache.put(
+                        info.get('id'),
+                        info.get('title', 'Unknown Title'),
+                        str(info.get('duration', 'Unknown')),
+                        info.get('channel_id'),
+                        info.get('channel') or info.get('uploader'),
+                    )
+                    metadata_cache.put_many([
+                        (song.video_id, song.title, song.duration, None, None) for song in related
+                    ])
+                    metadata_cache.put_related(info.get('id'), [song.video_id for song in related])
                 else:
                     logger.warning("⚠️ No related videos found")
                 
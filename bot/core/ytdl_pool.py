@@ -0,0 +1,105 @@
+"""
+yt-dlp Instance Pool Module
+Long-lived YoutubeDL instances shared by the extractor
+"""
+
+import threading
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, List
+
+import yt_dlp
+
+from ..config import YTDL_OPTIONS, YTDL_POOL_SIZE
+
+logger = logging.getLogger(__name__)
+
+# Option profiles on top of YTDL_OPTIONS
+PROFILES = {
+    'stream': {'extract_flat': True, 'lazy_playlist': True},  # Playlists, page by page
+    'channel': {'extract_flat': True, 'socket_timeout': 10},  # Channel uploads fallback
+    'full': {'extract_flat': False},  # Single video info
+    'related': {'extract_flat': 'in_playlist', 'socket_timeout': 10},  # Suggestions
+}
+
+
+class YtdlPool:
+    """
+    Pool of warm YoutubeDL instances, one stack per option profile
+    
+    Building a YoutubeDL sets up the extractor registry, the HTTP opener
+    and the cookie jar. Reusing instances keeps all of that, including
+    HTTP keep-alive connections to YouTube, across calls.
+    
+    A YoutubeDL is not thread-safe, so acquire() hands each instance to
+    one caller at a time. Idle instances are reused most-recently-used
+    first, whose connections are the likeliest to still be open. At most
+    YTDL_POOL_SIZE idle instances are kept per profile, extra ones made
+    under load are closed when returned.
+    """
+    
+    _idle: Dict[str, List[yt_dlp.YoutubeDL]] = {}
+    _lock = threading.Lock()
+    
+    @staticmethod
+    def _create(profile: str) -> yt_dlp.YoutubeDL:
+        """Build a YoutubeDL for a profile"""
+        opts = YTDL_OPTIONS.copy()
+        opts.update(PROFILES[profile])
+        return yt_dlp.YoutubeDL(opts)
+    
+    @staticmethod
+    @contextmanager
+    def acquire(profile: str) -> Iterator[yt_dlp.YoutubeDL]:
+        """
+        Borrow a YoutubeDL for the duration of a with-block
+        
+        Args:
+            profile: Key of PROFILES
+        
+        Yields:
+            YoutubeDL instance for exclusive use
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"Unknown yt-dlp profile: {profile}")
+        
+        with YtdlPool._lock:
+            idle = YtdlPool._idle.setdefault(profile, [])
+            ydl = idle.pop() if idle else None
+        if ydl is None:
+            ydl = YtdlPool._create(profile)
+        
+        try:
+            yield ydl
+        finally:
+            with YtdlPool._lock:
+                idle = YtdlPool._idle.setdefault(profile, [])
+                keep = len(idle) < YTDL_POOL_SIZE
+                if keep:
+                    idle.append(ydl)
+            if not keep:
+                ydl.close()
+    
+    @staticmethod
+    def warm():
+        """Create one instance per profile ahead of the first request (blocking)"""
+        for profile in PROFILES:
+            with YtdlPool._lock:
+                if YtdlPool._idle.get(profile):
+                    continue
+            ydl = YtdlPool._create(profile)
+            with YtdlPool._lock:
+                YtdlPool._idle.setdefault(profile, []).append(ydl)
+        logger.info(f"✓ yt-dlp pool warmed ({', '.join(PROFILES)})")
+    
+    @staticmethod
+    def close():
+        """Close all idle instances (called on bot exit)"""
+        with YtdlPool._lock:
+            instances = [ydl for idle in YtdlPool._idle.values() for ydl in idle]
+            YtdlPool._idle.clear()
+        for ydl in instances:
+            try:
+                ydl.close()
+            except Exception as e:
+                logger.debug(f"Error closing YoutubeDL: {e}")
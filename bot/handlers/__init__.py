@@ -3,12 +3,13 @@ Handlers Module
 All telegram handlers (commands, callbacks, messages)
 """
 
-from .commands import start_command
+from .commands import start_command, seek_command
 from .callbacks import button_callback
 from .messages import handle_url_message
 
 __all__ = [
     'start_command',
+    'seek_command',
     'button_callback',
     'handle_url_message',
 ]
@@ -3,16 +3,15 @@ Callback Handlers Module
 Handles all button callback queries
 """
 
-import asyncio
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from ..core import player, PlaybackManager
+from ..core import player, PlaybackManager, PlaybackController, ExtractionService, MetadataEnricher, metadata_cache, recommender
 from ..utils.access_control import AccessControl
 from ..utils.formatters import MessageFormatter
 from ..utils.keyboards import Keyboards
-from ..config import EMOJI
+from ..config import EMOJI, SEEK_STEP
 
 logger = logging.getLogger(__name__)
 
@@ -35,7 +34,8 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     
     # Check ownership for control commands
-    control_commands = ["play_pause", "next", "prev", "stop", "toggle_loop", "toggle_shuffle"]
+    control_commands = ["play_pause", "next", "prev", "stop", "seek_back", "seek_forward",
+                        "toggle_loop", "toggle_shuffle"]
     if query.data in control_commands and not AccessControl.is_owner(user_id):
         logger.warning(f"🚫 Non-owner @{username} tried to use control: '{query.data}'")
         await query.answer(
@@ -49,10 +49,13 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Route to appropriate handler
     handlers = {
         "load_playlist": handle_load_playlist,
+        "cancel_loading": handle_cancel_loading,
         "play_pause": handle_play_pause,
         "next": handle_next,
         "prev": handle_prev,
         "stop": handle_stop,
+        "seek_back": handle_seek,
+        "seek_forward": handle_seek,
         "toggle_loop": handle_toggle_loop,
         "toggle_shuffle": handle_toggle_shuffle,
         "volume": handle_volume_menu,
@@ -96,6 +99,19 @@ async def handle_load_playlist(query, context):
     logger.info(f"📋 @{username} requested to load playlist - waiting for URL")
 
 
+async def handle_cancel_loading(query, context):
+    """Cancel the playlist/video extraction started by this user"""
+    username = query.from_user.username or query.from_user.first_name
+    if ExtractionService.cancel(query.from_user.id):
+        await query.edit_message_text(f"{EMOJI['stop']} Cancelling...")
+        logger.info(f"🛑 @{username} cancelled loading")
+    else:
+        await query.edit_message_text(
+            "Nothing is loading",
+            reply_markup=Keyboards.main_menu()
+        )
+
+
 async def handle_play_pause(query, context):
     """Handle play/pause toggle"""
     username = query.from_user.username or query.from_user.first_name
@@ -110,8 +126,7 @@ async def handle_play_pause(query, context):
     
     if not player.is_playing:
         # Start playing
-        player.is_playing = True
-        asyncio.create_task(PlaybackManager.play_current_song(context.application))
+        PlaybackController.play()
         await query.edit_message_text(
             f"{EMOJI['play']} Starting playback...",
             reply_markup=Keyboards.main_menu()
@@ -119,7 +134,7 @@ async def handle_play_pause(query, context):
         logger.info(f"▶️ @{username} started playback")
     else:
         # Toggle pause/resume
-        is_paused = PlaybackManager.toggle_pause()
+        is_paused = await PlaybackController.toggle_pause()
         status = "Paused" if is_paused else "Resumed"
         emoji = EMOJI['pause'] if is_paused else EMOJI['play']
         
@@ -139,9 +154,8 @@ async def handle_next(query, context):
         logger.warning(f"⚠️ @{username} tried to skip but playlist is empty")
         return
     
-    # Keep playing state active for auto-play
-    player.is_playing = True
-    asyncio.create_task(PlaybackManager.play_next(context.application))
+    # Taps arriving during a load add up to one jump
+    PlaybackController.next()
     
     await query.edit_message_text(
         f"{EMOJI['next']} Skipping to next song...",
@@ -159,9 +173,8 @@ async def handle_prev(query, context):
         logger.warning(f"⚠️ @{username} tried to go back but playlist is empty")
         return
     
-    # Keep playing state active for auto-play
-    player.is_playing = True
-    asyncio.create_task(PlaybackManager.play_previous(context.application))
+    # Taps arriving during a load add up to one jump
+    PlaybackController.previous()
     
     await query.edit_message_text(
         f"{EMOJI['prev']} Playing previous song...",
@@ -173,7 +186,7 @@ async def handle_prev(query, context):
 async def handle_stop(query, context):
     """Handle stop playback"""
     username = query.from_user.username or query.from_user.first_name
-    PlaybackManager.stop()
+    await PlaybackController.stop()
     
     await query.edit_message_text(
         f"{EMOJI['stop']} Playback stopped",
@@ -182,10 +195,30 @@ async def handle_stop(query, context):
     logger.info(f"⏹️ @{username} stopped playback")
 
 
+async def handle_seek(query, context):
+    """Handle seek back/forward buttons"""
+    username = query.from_user.username or query.from_user.first_name
+    step = -SEEK_STEP if query.data == "seek_back" else SEEK_STEP
+    
+    if not await PlaybackManager.seek(step):
+        await query.edit_message_text(
+            MessageFormatter.error_message("Nothing is playing"),
+            reply_markup=Keyboards.main_menu()
+        )
+        return
+    
+    await query.edit_message_text(
+        f"{'⏪' if step < 0 else '⏩'} {MessageFormatter.progress_line(player.current_song)}",
+        reply_markup=Keyboards.main_menu()
+    )
+    logger.info(f"{'⏪' if step < 0 else '⏩'} @{username} seeked {step:+d}s")
+
+
 async def handle_toggle_loop(query, context):
     """Handle loop toggle"""
     username = query.from_user.username or query.from_user.first_name
     loop_enabled = PlaybackManager.toggle_loop()
+    PlaybackController.refresh()
     status = "enabled" if loop_enabled else "disabled"
     emoji = EMOJI['loop_active'] if loop_enabled else EMOJI['loop']
     
@@ -200,19 +233,28 @@ async def handle_toggle_shuffle(query, context):
     """Handle shuffle toggle"""
     username = query.from_user.username or query.from_user.first_name
     shuffle_enabled = PlaybackManager.toggle_shuffle()
+    PlaybackController.refresh()
     status = "enabled" if shuffle_enabled else "disabled"
     emoji = EMOJI['shuffle_active'] if shuffle_enabled else EMOJI['shuffle']
+    kind = "Smart shuffle" if player.smart_shuffle else "Shuffle"
     
     await query.edit_message_text(
-        f"{emoji} Shuffle {status}",
+        f"{emoji} {kind} {status}",
         reply_markup=Keyboards.main_menu()
     )
-    logger.info(f"🔀 @{username} {status} shuffle mode")
+    logger.info(f"🔀 @{username} {status} {kind.lower()} mode")
 
 
 async def handle_volume_menu(query, context):
     """Show volume menu"""
+    from ..core.mpv_player import MPVPlayer
     username = query.from_user.username or query.from_user.first_name
+    
+    # Read the live volume from mpv (falls back to the stored value)
+    volume = await MPVPlayer.get_volume()
+    if volume is not None:
+        player.volume = volume
+    
     await query.edit_message_text(
         f"{EMOJI['volume']} <b>Volume Control</b>\n\n"
         f"Current volume: {player.volume}%\n"
@@ -232,8 +274,7 @@ async def handle_volume_change(query, context):
     if vol_action == "up":
         from ..core.mpv_player import MPVPlayer
         old_volume = player.volume
-        if MPVPlayer.volume_up(10):
-            player.volume = min(100, player.volume + 10)
+        if await MPVPlayer.volume_up(10):
             await query.edit_message_text(
                 f"{EMOJI['volume']} Volume increased to {player.volume}%",
                 reply_markup=Keyboards.volume_menu(),
@@ -248,8 +289,7 @@ async def handle_volume_change(query, context):
     elif vol_action == "down":
         from ..core.mpv_player import MPVPlayer
         old_volume = player.volume
-        if MPVPlayer.volume_down(10):
-            player.volume = max(0, player.volume - 10)
+        if await MPVPlayer.volume_down(10):
             await query.edit_message_text(
                 f"{EMOJI['volume']} Volume decreased to {player.volume}%",
                 reply_markup=Keyboards.volume_menu(),
@@ -263,20 +303,9 @@ async def handle_volume_change(query, context):
     
     elif vol_action == "mute":
         from ..core.mpv_player import MPVPlayer
-        if MPVPlayer.toggle_mute():
-            # Get current mute status from amixer to show accurate state
-            import subprocess
-            try:
-                result = subprocess.run(
-                    ["amixer", "-D", "pulse", "get", "Master"],
-                    capture_output=True,
-                    text=True,
-                    timeout=2
-                )
-                is_muted = "[off]" in result.stdout
-                status_text = "🔇 <b>Muted</b>" if is_muted else "🔊 <b>Unmuted</b>"
-            except:
-                status_text = "🔇/🔊 <b>Mute toggled</b>"
+        if await MPVPlayer.toggle_mute():
+            # Mute state as reported back by mpv
+            status_text = "🔇 <b>Muted</b>" if player.is_muted else "🔊 <b>Unmuted</b>"
             
             await query.edit_message_text(
                 f"{EMOJI['volume']} Volume Control\n\n{status_text}",
@@ -289,21 +318,16 @@ async def handle_volume_change(query, context):
             logger.error(f"❌ Mute toggle failed for @{username}")
         return
     
-    # Handle preset volume levels
+    # Handle preset volume levels (applied live, playback is not restarted)
     volume = int(vol_action)
     old_volume = player.volume
     
-    if PlaybackManager.set_volume(volume):
-        # If currently playing, restart to apply volume
-        if player.is_playing and player.mpv_process:
-            PlaybackManager.stop()
-            asyncio.create_task(PlaybackManager.play_current_song(context.application))
-        
+    if await PlaybackManager.set_volume(volume):
         await query.edit_message_text(
-            MessageFormatter.volume_changed(volume),
+            MessageFormatter.volume_changed(player.volume),
             reply_markup=Keyboards.main_menu()
         )
-        logger.info(f"🔊 @{username} set volume: {old_volume}% → {volume}%")
+        logger.info(f"🔊 @{username} set volume: {old_volume}% → {player.volume}%")
 
 
 async def handle_show_queue(query, context):
@@ -339,7 +363,9 @@ async def handle_show_info(query, context):
     if player.current_song:
         info_text += f"<b>Now Playing:</b>\n"
         info_text += f"🎵 {player.current_song.title}\n"
-        info_text += f"⏱️ Duration: {player.current_song.duration}\n"
+        info_text += f"⏱️ {MessageFormatter.progress_line(player.current_song)}\n"
+        if player.position.cache_duration is not None:
+            info_text += f"📶 Buffered: {player.position.cache_duration:.0f}s ahead\n"
         info_text += f"🔗 <a href='{player.current_song.url}'>YouTube Link</a>\n\n"
     else:
         info_text += "No song currently playing\n\n"
@@ -353,7 +379,13 @@ async def handle_show_info(query, context):
     info_text += f"<b>Settings:</b>\n"
     info_text += f"🔊 Volume: {player.volume}%\n"
     info_text += f"🔁 Loop: {'ON' if player.loop_enabled else 'OFF'}\n"
-    info_text += f"🔀 Shuffle: {'ON' if player.shuffle_enabled else 'OFF'}\n"
+    info_text += f"🔀 Shuffle: {MessageFormatter.shuffle_mode()}\n"
+    
+    # Metadata cache
+    stats = metadata_cache.stats()
+    info_text += f"💾 Cache: {stats['entries']} videos, {stats['hit_rate']:.0%} hits\n"
+    history = recommender.stats()
+    info_text += f"🧠 History: {history['tracks']} songs, {history['transitions']} transitions\n"
     
     await query.edit_message_text(
         info_text,
@@ -390,14 +422,9 @@ async def handle_auto_next_stop(query, context):
 
 
 async def handle_suggestion_play(query, context):
-    """Handle play current YouTube suggestion"""
+    """Handle switching to the shown YouTube suggestion"""
     username = query.from_user.username or query.from_user.first_name
     
-    # Cancel the countdown timer if it exists
-    if 'suggestion_task' in context.bot_data:
-        context.bot_data['suggestion_task'].cancel()
-        del context.bot_data['suggestion_task']
-    
     # Get current suggestion
     suggestions = context.bot_data.get('suggestions', [])
     current_index = context.bot_data.get('suggestion_index', 0)
@@ -408,8 +435,14 @@ async def handle_suggestion_play(query, context):
     
     current_suggestion = suggestions[current_index]
     
+    # The first suggestion is already playing
+    current_song = player.current_song
+    if current_index == 0 and current_song and current_song.video_id == current_suggestion.video_id:
+        await query.answer("Already playing this suggestion")
+        return
+    
     # Add to playlist and play
-    player.add_song(current_suggestion)
+    index = player.add_song(current_suggestion)
     
     await query.edit_message_text(
         f"{EMOJI['play']} <b>Playing suggestion:</b>\n🎵 {current_suggestion.title}",
@@ -417,7 +450,7 @@ async def handle_suggestion_play(query, context):
     )
     
     # Start playback
-    asyncio.create_task(PlaybackManager.play_current_song(context.application))
+    PlaybackController.play(index, explicit=True)
     
     # Clean up suggestion data
     context.bot_data.pop('suggestions', None)
@@ -430,11 +463,6 @@ async def handle_suggestion_next(query, context):
     """Handle show next YouTube suggestion"""
     username = query.from_user.username or query.from_user.first_name
     
-    # Cancel the countdown timer if it exists
-    if 'suggestion_task' in context.bot_data:
-        context.bot_data['suggestion_task'].cancel()
-        del context.bot_data['suggestion_task']
-    
     # Get suggestions
     suggestions = context.bot_data.get('suggestions', [])
     current_index = context.bot_data.get('suggestion_index', 0)
@@ -448,12 +476,12 @@ async def handle_suggestion_next(query, context):
     context.bot_data['suggestion_index'] = next_index
     next_suggestion = suggestions[next_index]
     
-    # Show next suggestion with new countdown
+    # The first suggestion keeps playing until another one is picked
     message_text = (
         f"{EMOJI['info']} <b>YouTube Suggestion {next_index + 1}/{len(suggestions)}</b>\n\n"
         f"🎵 <b>{next_suggestion.title}</b>\n"
         f"⏱️ {next_suggestion.duration}\n\n"
-        f"Auto-play in <b>10</b> seconds..."
+        f"Tap Play This to switch to it."
     )
     
     await query.edit_message_text(
@@ -462,38 +490,6 @@ async def handle_suggestion_next(query, context):
         parse_mode="HTML"
     )
     
-    # Start new countdown
-    async def countdown():
-        for remaining in range(9, -1, -1):
-            await asyncio.sleep(1)
-            if remaining > 0:
-                new_text = message_text.replace("10", str(remaining))
-                try:
-                    await query.message.edit_text(
-                        new_text,
-                        reply_markup=Keyboards.suggestion_dialog(),
-                        parse_mode="HTML"
-                    )
-                except Exception:
-                    pass
-        
-        # Auto-play after countdown
-        player.add_song(next_suggestion)
-        await query.message.edit_text(
-            f"{EMOJI['play']} <b>Auto-playing suggestion:</b>\n🎵 {next_suggestion.title}",
-            parse_mode="HTML"
-        )
-        asyncio.create_task(PlaybackManager.play_current_song(context.application))
-        
-        # Clean up
-        context.bot_data.pop('suggestions', None)
-        context.bot_data.pop('suggestion_index', None)
-        context.bot_data.pop('suggestion_task', None)
-    
-    # Create and store countdown task
-    task = asyncio.create_task(countdown())
-    context.bot_data['suggestion_task'] = task
-    
     logger.info(f"⏭️ @{username} skipped to next suggestion: {next_suggestion.title}")
 
 
@@ -501,17 +497,12 @@ async def handle_suggestion_stop(query, context):
     """Handle stop YouTube suggestions"""
     username = query.from_user.username or query.from_user.first_name
     
-    # Cancel the countdown timer if it exists
-    if 'suggestion_task' in context.bot_data:
-        context.bot_data['suggestion_task'].cancel()
-        del context.bot_data['suggestion_task']
-    
     # Clean up suggestion data
     context.bot_data.pop('suggestions', None)
     context.bot_data.pop('suggestion_index', None)
     
     # Stop playback
-    PlaybackManager.stop()
+    await PlaybackController.stop()
     
     await query.edit_message_text(
         f"{EMOJI['stop']} <b>Playback stopped</b>\n\nSuggestions cancelled.",
@@ -578,9 +569,10 @@ async def handle_clear_queue(query, context):
         return
     
     # Stop playback
-    PlaybackManager.stop()
+    await PlaybackController.stop()
     
     # Clear playlist
+    MetadataEnricher.cancel()
     playlist_count = len(player.playlist)
     player.playlist.clear()
     player.current_index = 0
@@ -604,16 +596,13 @@ async def handle_loop_continue(query, context):
         context.bot_data['loop_task'].cancel()
         del context.bot_data['loop_task']
     
-    # Restart playlist
-    player.current_index = 0
-    player.is_playing = True
-    
     await query.edit_message_text(
         f"🔄 <b>Restarting Playlist...</b>",
         parse_mode="HTML"
     )
     
-    asyncio.create_task(PlaybackManager.play_current_song(context.application))
+    # Restart playlist
+    PlaybackController.play(PlaybackManager.restart_index())
     
     logger.info(f"🔄 @{username} manually restarted playlist")
 
@@ -628,7 +617,7 @@ async def handle_loop_stop(query, context):
         del context.bot_data['loop_task']
     
     # Stop playback
-    PlaybackManager.stop()
+    await PlaybackController.stop()
     player.is_playing = False
     
     await query.edit_message_text(
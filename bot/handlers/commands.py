@@ -1,12 +1,13 @@
 """
 Command Handlers Module
-Handles all command interactions (/start, etc.)
+Handles all command interactions (/start, /seek)
 """
 
 import logging
 from telegram import Update, ReplyKeyboardMarkup, KeyboardButton
 from telegram.ext import ContextTypes
 
+from ..core import player, PlaybackManager
 from ..utils.access_control import AccessControl
 from ..utils.formatters import MessageFormatter
 from ..utils.keyboards import Keyboards
@@ -61,3 +62,57 @@ async def start_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
     )
     
     logger.info(f"✅ Welcome message sent to @{username}")
+
+
+def parse_seek_target(text: str):
+    """
+    Parse a /seek argument
+    
+    Args:
+        text: '+10' / '-10' (relative seconds), '1:30' or '90' (absolute),
+            '50%' (percent of the track)
+    
+    Returns:
+        (value, mode) tuple or None if invalid
+    """
+    text = text.strip()
+    try:
+        if text.endswith('%'):
+            return float(text[:-1]), 'absolute-percent'
+        if text[:1] in '+-':
+            return float(text), 'relative'
+        seconds = 0.0
+        for part in text.split(':'):
+            seconds = seconds * 60 + float(part)
+        return seconds, 'absolute'
+    except ValueError:
+        return None
+
+
+async def seek_command(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """
+    Handle /seek command
+    Usage: /seek 1:30 | /seek +10 | /seek -10 | /seek 50%
+    """
+    user_id = update.effective_user.id
+    username = update.effective_user.username or update.effective_user.first_name
+    
+    if not AccessControl.check_access(user_id) or not AccessControl.is_owner(user_id):
+        await update.message.reply_text(
+            MessageFormatter.error_message("Only the owner can control playback")
+        )
+        return
+    
+    target = parse_seek_target(context.args[0]) if context.args else None
+    if target is None:
+        await update.message.reply_text(
+            "Usage: /seek 1:30 | /seek +10 | /seek -10 | /seek 50%"
+        )
+        return
+    
+    if not await PlaybackManager.seek(*target):
+        await update.message.reply_text(MessageFormatter.error_message("Nothing is playing"))
+        return
+    
+    await update.message.reply_text(f"⏩ {MessageFormatter.progress_line(player.current_song)}")
+    logger.info(f"⏩ @{username} seeked to {context.args[0]}")
@@ -3,12 +3,15 @@ Message Handlers Module
 Handles text messages (mainly URL inputs)
 """
 
-import asyncio
+import time
 import logging
 from telegram import Update
 from telegram.ext import ContextTypes
 
-from ..core import player, YouTubeExtractor, PlaybackManager
+from ..core import (
+    player, YouTubeExtractor, PlaybackController, ExtractionService, ExtractionCancelled,
+    MetadataEnricher,
+)
 from ..utils.access_control import AccessControl
 from ..utils.formatters import MessageFormatter
 from ..utils.keyboards import Keyboards
@@ -16,6 +19,9 @@ from ..config import EMOJI
 
 logger = logging.getLogger(__name__)
 
+# Seconds between edits of the playlist loading message
+PROGRESS_UPDATE_INTERVAL = 2.0
+
 
 async def handle_url_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle URL messages and menu button"""
@@ -58,50 +64,88 @@ async def handle_url_message(update: Update, context: ContextTypes.DEFAULT_TYPE)
         context.user_data['waiting_for'] = None
         return
     
+    # Updates run concurrently, a second message must not start another load
+    context.user_data['waiting_for'] = None
+    
     try:
         if waiting_for == 'playlist':
             await handle_playlist_url(update, context, url)
         elif waiting_for == 'video':
             await handle_video_url(update, context, url)
+    except ExtractionCancelled:
+        logger.info(f"🛑 @{username} cancelled loading: {url}")
+        await update.message.reply_text(
+            f"{EMOJI['stop']} Loading cancelled",
+            reply_markup=Keyboards.main_menu()
+        )
     except Exception as e:
         logger.error(f"❌ Error processing URL from @{username}: {e}")
         await update.message.reply_text(
             MessageFormatter.error_message(f"Error loading: {str(e)}\n\nPlease try again."),
             reply_markup=Keyboards.main_menu()
         )
-    finally:
-        context.user_data['waiting_for'] = None
 
 
 async def handle_playlist_url(update: Update, context: ContextTypes.DEFAULT_TYPE, url: str):
-    """Handle playlist URL"""
+    """
+    Handle playlist URL
+    
+    Songs are appended as the playlist streams in. Playback starts with
+    the first one and the loading message shows the running count.
+    """
     username = update.effective_user.username or update.effective_user.first_name
     
     # Show loading message
     loading_msg = await update.message.reply_text(
-        MessageFormatter.loading_message("Loading playlist")
+        MessageFormatter.loading_message("Loading playlist"),
+        reply_markup=Keyboards.cancel_loading()
     )
     
     logger.info(f"📋 @{username} loading playlist from: {url}")
     
-    # Extract playlist
-    songs = YouTubeExtractor.extract_playlist(url)
-    player.playlist.extend(songs)
+    start_index = len(player.playlist)
+    added = 0
+    last_update = time.monotonic()
+    
+    # Extract playlist on the worker pool, the bot stays responsive
+    try:
+        async for chunk in ExtractionService.stream_playlist(url, key=update.effective_user.id):
+            player.playlist.extend(chunk)
+            added += len(chunk)
+            MetadataEnricher.schedule()
+            
+            if added == len(chunk) and not player.is_playing:
+                # Auto-start playback with the first song
+                PlaybackController.play(start_index)
+                logger.info(f"▶️ Auto-started playback for @{username}")
+            elif player.prefetched_index is None:
+                # The current song may now have a successor to prefetch
+                PlaybackController.refresh()
+            
+            if time.monotonic() - last_update >= PROGRESS_UPDATE_INTERVAL:
+                last_update = time.monotonic()
+                await loading_msg.edit_text(
+                    MessageFormatter.playlist_loading(added),
+                    reply_markup=Keyboards.cancel_loading(),
+                    parse_mode="HTML"
+                )
+    except Exception:
+        if added:
+            await loading_msg.edit_text(
+                MessageFormatter.playlist_loaded(added, len(player.playlist), complete=False),
+                parse_mode="HTML"
+            )
+        else:
+            await loading_msg.delete()
+        raise
     
     # Update message
     await loading_msg.edit_text(
-        MessageFormatter.playlist_loaded(len(songs), len(player.playlist)),
+        MessageFormatter.playlist_loaded(added, len(player.playlist)),
         parse_mode="HTML"
     )
     
-    logger.info(f"✅ Loaded {len(songs)} songs from playlist for @{username} (Total: {len(player.playlist)})")
-    
-    # Auto-start playback if not already playing
-    if not player.is_playing:
-        player.is_playing = True
-        player.current_index = len(player.playlist) - len(songs)
-        asyncio.create_task(PlaybackManager.play_current_song(context.application))
-        logger.info(f"▶️ Auto-started playback for @{username}")
+    logger.info(f"✅ Loaded {added} songs from playlist for @{username} (Total: {len(player.playlist)})")
     
     # Show main menu
     await update.message.reply_text(
@@ -117,14 +161,20 @@ async def handle_video_url(update: Update, context: ContextTypes.DEFAULT_TYPE, u
     
     # Show loading message
     loading_msg = await update.message.reply_text(
-        MessageFormatter.loading_message("Loading video")
+        MessageFormatter.loading_message("Loading video"),
+        reply_markup=Keyboards.cancel_loading()
     )
     
     logger.info(f"🎥 @{username} loading video from: {url}")
     
-    # Get video info
-    song = YouTubeExtractor.get_video_info(url)
+    # Get video info on the worker pool, the bot stays responsive
+    try:
+        song = await ExtractionService.get_video_info(url, key=update.effective_user.id)
+    except Exception:
+        await loading_msg.delete()
+        raise
     player.playlist.append(song)
+    MetadataEnricher.schedule()
     
     # Update message
     await loading_msg.edit_text(
@@ -136,10 +186,11 @@ async def handle_video_url(update: Update, context: ContextTypes.DEFAULT_TYPE, u
     
     # Auto-start playback if not already playing
     if not player.is_playing:
-        player.is_playing = True
-        player.current_index = len(player.playlist) - 1
-        asyncio.create_task(PlaybackManager.play_current_song(context.application))
+        PlaybackController.play(len(player.playlist) - 1, explicit=True)
         logger.info(f"▶️ Auto-started playback for @{username}")
+    else:
+        # The last song may now have a successor to prefetch
+        PlaybackController.refresh()
     
     # Show main menu
     await update.message.reply_text(
@@ -34,26 +34,80 @@ class MessageFormatter:
             f"• Playing: {status}\n"
             f"• Volume: {player.volume}%\n"
             f"• Loop: {'ON' if player.loop_enabled else 'OFF'}\n"
-            f"• Shuffle: {'ON' if player.shuffle_enabled else 'OFF'}"
+            f"• Shuffle: {MessageFormatter.shuffle_mode()}"
         )
     
+    @staticmethod
+    def shuffle_mode() -> str:
+        """Format the shuffle mode as OFF, ON or SMART"""
+        if not player.shuffle_enabled:
+            return 'OFF'
+        return 'SMART' if player.smart_shuffle else 'ON'
+    
+    @staticmethod
+    def format_time(seconds: Optional[float]) -> str:
+        """Format seconds as m:ss or h:mm:ss"""
+        if seconds is None:
+            return "--:--"
+        seconds = int(seconds)
+        hours, rest = divmod(seconds, 3600)
+        minutes, secs = divmod(rest, 60)
+        if hours:
+            return f"{hours}:{minutes:02d}:{secs:02d}"
+        return f"{minutes}:{secs:02d}"
+    
+    @staticmethod
+    def progress_line(song: Optional[Song] = None, width: int = 12) -> str:
+        """
+        Format the position in the current track as a bar
+        
+        Reads the position snapshot kept by the mpv observers, the song's
+        extracted duration is used until mpv reports one.
+        
+        Args:
+            song: Song whose duration to fall back to
+            width: Number of bar segments
+        
+        Returns:
+            e.g. "▰▰▰▱▱▱▱▱▱▱▱▱ 1:02 / 4:10"
+        """
+        position = player.position
+        duration = position.duration
+        if duration is None and song:
+            duration = song.duration_seconds
+        elapsed = position.time_pos or 0.0
+        
+        filled = int(width * elapsed / duration) if duration else 0
+        filled = max(0, min(width, filled))
+        bar = "▰" * filled + "▱" * (width - filled)
+        return f"{bar} {MessageFormatter.format_time(elapsed)} / {MessageFormatter.format_time(duration)}"
+    
     @staticmethod
     def now_playing(song: Song, index: int, total: int) -> str:
         """Format now playing message"""
         return (
-            f"{EMOJI['now_playing']} <b>Now Playing:</b>\n"
-            f"{song.title}\n\n"
-            f"⏱ Duration: {song.duration}s\n"
+            f"{EMOJI['now_playing']} <b>Now Playing:</b>\n\n"
+            f"🎵 <b>{song.title}</b>\n"
+            f"{MessageFormatter.progress_line(song)}\n\n"
             f"📊 Position: {index + 1}/{total}"
         )
     
     @staticmethod
-    def playlist_loaded(count: int, total: int) -> str:
+    def playlist_loading(count: int) -> str:
+        """Format playlist progress message"""
+        return (
+            f"{EMOJI['loading']} <b>Loading playlist...</b>\n\n"
+            f"Songs added so far: {count}"
+        )
+    
+    @staticmethod
+    def playlist_loaded(count: int, total: int, complete: bool = True) -> str:
         """Format playlist loaded message"""
         return (
-            f"{EMOJI['success']} <b>Loaded {count} song{'s' if count != 1 else ''}</b>\n\n"
-            f"Total in queue: {total}\n"
-            f"Starting playback..."
+            f"{EMOJI['success'] if complete else EMOJI['stop']} "
+            f"<b>Loaded {count} song{'s' if count != 1 else ''}</b>"
+            f"{'' if complete else ' (stopped early)'}\n\n"
+            f"Total in queue: {total}"
         )
     
     @staticmethod
@@ -6,7 +6,7 @@ All inline keyboard layouts for the bot
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 
 from ..core.player_state import player
-from ..config import EMOJI
+from ..config import EMOJI, SEEK_STEP
 
 
 class Keyboards:
@@ -53,12 +53,20 @@ class Keyboards:
                     callback_data="next"
                 ),
             ],
-            # Row 3: Stop
+            # Row 3: Seek and Stop
             [
+                InlineKeyboardButton(
+                    f"⏪ {SEEK_STEP}s",
+                    callback_data="seek_back"
+                ),
                 InlineKeyboardButton(
                     f"{EMOJI['stop']} Stop",
                     callback_data="stop"
                 ),
+                InlineKeyboardButton(
+                    f"{SEEK_STEP}s ⏩",
+                    callback_data="seek_forward"
+                ),
             ],
             # Row 4: Modes with status
             [
@@ -67,7 +75,7 @@ class Keyboards:
                     callback_data="toggle_loop"
                 ),
                 InlineKeyboardButton(
-                    f"{shuffle_emoji} Shuffle {'✅' if player.shuffle_enabled else ''}",
+                    f"{shuffle_emoji} {'Smart ' if player.smart_shuffle else ''}Shuffle {'✅' if player.shuffle_enabled else ''}",
                     callback_data="toggle_shuffle"
                 ),
             ],
@@ -184,6 +192,17 @@ class Keyboards:
         
         return InlineKeyboardMarkup(keyboard)
     
+    @staticmethod
+    def cancel_loading() -> InlineKeyboardMarkup:
+        """Cancel button shown while music is being extracted"""
+        keyboard = [
+            [
+                InlineKeyboardButton(f"{EMOJI['stop']} Cancel", callback_data="cancel_loading"),
+            ]
+        ]
+        
+        return InlineKeyboardMarkup(keyboard)
+    
     @staticmethod
     def back_button() -> InlineKeyboardMarkup:
         """Simple back button"""
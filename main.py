@@ -8,6 +8,7 @@ Version: 1.0.0
 Date: 2024-11-05
 """
 
+import asyncio
 import logging
 import signal
 import sys
@@ -21,8 +22,11 @@ from telegram.ext import (
 )
 
 from bot.config import TOKEN, LOG_LEVEL, LOG_FORMAT, validate_config
-from bot.handlers import start_command, button_callback, handle_url_message
-from bot.core import player, MPVPlayer
+from bot.handlers import start_command, seek_command, button_callback, handle_url_message
+from bot.core import (
+    player, MPVPlayer, PlaybackManager, CrossfadeManager, ExtractionService,
+    MetadataEnricher, YtdlPool, get_mixer, metadata_cache, recommender,
+)
 
 # ============================================================================
 # LOGGING SETUP
@@ -72,6 +76,29 @@ async def error_handler(update: Update, context):
     except Exception as e:
         logger.error(f"Error in error handler: {e}")
 
+# ============================================================================
+# STARTUP HOOK
+# ============================================================================
+
+async def post_init(application: Application):
+    """Run once the application is initialised, before polling starts"""
+    await PlaybackManager.attach(application)
+    
+    # Detect the system mixer once, not on the first volume press
+    await asyncio.get_running_loop().run_in_executor(None, get_mixer)
+    
+    # Build the yt-dlp instances before the first link arrives
+    await asyncio.get_running_loop().run_in_executor(None, YtdlPool.warm)
+
+# ============================================================================
+# SHUTDOWN HOOK
+# ============================================================================
+
+async def post_shutdown(application: Application):
+    """Run when polling stops, while the event loop is still up"""
+    # Enrichment jobs must not outlive the loop their results go to
+    MetadataEnricher.cancel()
+
 # ============================================================================
 # MAIN FUNCTION
 # ============================================================================
@@ -112,6 +139,9 @@ def main():
         .get_updates_connect_timeout(30)
         .get_updates_read_timeout(30)
         .get_updates_pool_timeout(30)
+        .concurrent_updates(True)  # Stop/Pause stay responsive while a playlist loads
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
         .build()
     )
     _app_instance = application
@@ -121,6 +151,7 @@ def main():
     
     # Command handlers
     application.add_handler(CommandHandler("start", start_command))
+    application.add_handler(CommandHandler("seek", seek_command))
     logger.info("✓ Command handlers registered")
     
     # Callback handlers
@@ -186,7 +217,12 @@ def main():
     
     # Cleanup (only if clean exit)
     logger.info("🧹 Cleaning up...")
-    MPVPlayer.stop()
+    ExtractionService.shutdown()
+    CrossfadeManager.shutdown()
+    MPVPlayer.shutdown()
+    metadata_cache.close()
+    recommender.close()
+    YtdlPool.close()
     logger.info("✅ Cleanup complete. Goodbye! 👋")
 
 # ============================================================================
@@ -199,4 +235,5 @@ if __name__ == "__main__":
     except Exception as e:
         logger.error(f"Fatal error: {e}", exc_info=True)
         print(f"\n❌ Fatal Error: {e}\n")
-        MPVPlayer.stop()
+        CrossfadeManager.shutdown()
+        MPVPlayer.shutdown()
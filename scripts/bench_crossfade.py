@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Crossfade benchmark for YouTube Music Bot
+Measures CPU and RSS of the primary mpv and the crossfade deck
+before, during and after a transition
+
+Usage:
+    python3 scripts/bench_crossfade.py [--fade 5] [--ao null] [URL_A URL_B]
+
+Without URLs two generated 30 s tones are used, so no network is needed.
+Pass real YouTube URLs to include stream decoding in the numbers.
+"""
+
+import argparse
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+
+CLOCK_TICKS = os.sysconf('SC_CLK_TCK')
+SAMPLE_INTERVAL = 0.5
+
+
+class MPVDeck:
+    """Minimal blocking IPC wrapper around one idle mpv instance"""
+    
+    def __init__(self, name, ao):
+        self.name = name
+        self.socket_path = f"/tmp/mpv_bench_{name}_{os.getpid()}"
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+        self.process = subprocess.Popen(
+            ['mpv', '--idle=yes', '--no-video', '--no-terminal', '--quiet',
+             '--prefetch-playlist=yes', f'--ao={ao}',
+             f'--input-ipc-server={self.socket_path}'],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            stdin=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 5
+        while not os.path.exists(self.socket_path):
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{name}: mpv IPC socket did not appear")
+            time.sleep(0.05)
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+        self.file = self.sock.makefile('rb')
+        self.request_id = 0
+    
+    def command(self, command):
+        """Send a command and return its reply data"""
+        self.request_id += 1
+        payload = {"command": command, "request_id": self.request_id}
+        self.sock.sendall(json.dumps(payload).encode('utf-8') + b'\n')
+        while True:
+            reply = json.loads(self.file.readline())
+            if reply.get('request_id') == self.request_id:
+                if reply.get('error') != 'success':
+                    raise RuntimeError(f"{self.name}: {command} failed: {reply.get('error')}")
+                return reply.get('data')
+    
+    def get(self, name):
+        """Read a property, None if unavailable"""
+        try:
+            return self.command(["get_property", name])
+        except RuntimeError:
+            return None
+    
+    def usage(self):
+        """Return (cpu_seconds, rss_mb) from /proc"""
+        with open(f'/proc/{self.process.pid}/stat') as f:
+            fields = f.read().rsplit(')', 1)[1].split()
+        cpu = (int(fields[11]) + int(fields[12])) / CLOCK_TICKS
+        rss = 0
+        with open(f'/proc/{self.process.pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    rss = int(line.split()[1]) / 1024
+        return cpu, rss
+    
+    def close(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=3)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+
+def sample(decks, phase, results, duration):
+    """Sample CPU% and RSS of every deck for a while"""
+    end = time.monotonic() + duration
+    last = {deck.name: deck.usage()[0] for deck in decks}
+    while time.monotonic() < end:
+        time.sleep(SAMPLE_INTERVAL)
+        for deck in decks:
+            cpu, rss = deck.usage()
+            percent = (cpu - last[deck.name]) / SAMPLE_INTERVAL * 100
+            last[deck.name] = cpu
+            results.setdefault((phase, deck.name), []).append((percent, rss))
+
+
+def wait_remaining(primary, seconds):
+    """Block until the primary has at most `seconds` left"""
+    while True:
+        remaining = primary.get('time-remaining')
+        if remaining is not None and remaining <= seconds:
+            return
+        time.sleep(0.05)
+
+
+def print_results(results):
+    """Print averaged CPU and peak RSS per phase"""
+    print()
+    print(f"{'Phase':<12} {'Deck':<10} {'CPU avg %':>10} {'CPU max %':>10} {'RSS max MB':>11}")
+    print("-" * 57)
+    for (phase, name), samples in results.items():
+        cpus = [s[0] for s in samples]
+        rss = max(s[1] for s in samples)
+        print(f"{phase:<12} {name:<10} {sum(cpus) / len(cpus):>10.1f} {max(cpus):>10.1f} {rss:>11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crossfade CPU/RSS benchmark")
+    parser.add_argument('--fade', type=float, default=5.0, help="crossfade seconds")
+    parser.add_argument('--preload', type=float, default=5.0, help="deck preload seconds")
+    parser.add_argument('--ao', default='null', help="mpv audio output (null on headless servers)")
+    parser.add_argument('urls', nargs='*', help="two track URLs (default: generated tones)")
+    args = parser.parse_args()
+    
+    if len(args.urls) >= 2:
+        track_a, track_b = args.urls[:2]
+    else:
+        track_a = 'av://lavfi:sine=frequency=440:duration=30'
+        track_b = 'av://lavfi:sine=frequency=660:duration=30'
+    
+    fade = args.fade
+    print("🎚️ Crossfade benchmark")
+    print(f"   Fade: {fade:g}s, preload: {args.preload:g}s, ao: {args.ao}")
+    
+    primary = MPVDeck('primary', args.ao)
+    deck = MPVDeck('deck', args.ao)
+    decks = [primary, deck]
+    results = {}
+    
+    try:
+        # Primary plays A with B prefetched, as in gapless mode
+        primary.command(["loadfile", track_a, "replace"])
+        primary.command(["loadfile", track_b, "append"])
+        time.sleep(1)
+        
+        duration = primary.get('duration') or 30
+        steady = max(1.0, duration - fade - args.preload - 3)
+        print(f"📊 Steady state ({steady:.0f}s)...")
+        sample(decks, 'steady', results, steady)
+        
+        # Arm: deck opens B paused, primary re-appends B with start offset
+        wait_remaining(primary, fade + args.preload)
+        print("📊 Preload...")
+        deck.command({
+            "name": "loadfile", "url": track_b, "flags": "replace",
+            "options": {"pause": "yes", "af": f"afade=t=in:d={fade:g}"},
+        })
+        primary.command(["playlist-remove", 1])
+        primary.command({
+            "name": "loadfile", "url": track_b, "flags": "append",
+            "options": {"start": f"{fade:g}"},
+        })
+        sample(decks, 'preload', results, max(0.5, args.preload - 0.5))
+        
+        # Fade window: both decks decode
+        wait_remaining(primary, fade)
+        print("📊 Overlap...")
+        position = primary.get('time-pos')
+        primary.command(["set_property", "file-local-options/af",
+                         f"afade=t=out:st={position:.3f}:d={fade:g}"])
+        deck.command(["set_property", "pause", False])
+        sample(decks, 'overlap', results, max(0.5, fade - 0.5))
+        
+        # Handoff: primary continues B, deck goes idle
+        while primary.get('playlist-pos') != 1:
+            time.sleep(0.05)
+        deck.command(["stop"])
+        print("📊 After handoff...")
+        sample(decks, 'after', results, 5)
+        
+        print_results(results)
+        return 0
+    finally:
+        for d in decks:
+            d.close()
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Benchmark interrupted by user")
+        sys.exit(1)
+    except FileNotFoundError:
+        print("\n\n❌ mpv not found. Install: sudo apt install mpv")
+        sys.exit(1)
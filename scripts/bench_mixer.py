@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Mixer benchmark for YouTube Music Bot
+Compares per-operation latency of the system mixer backends
+
+Usage:
+    python3 scripts/bench_mixer.py [--ops 50]
+
+Each backend sets the Master volume back and forth between two levels.
+The original volume and mute state are restored afterwards.
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.core.mixer import AlsaMixerBackend, SubprocessMixerBackend
+
+
+def legacy_set(volume):
+    """The previous fallback: try every command in order on each call"""
+    for cmd in (
+        ['amixer', '-D', 'pulse', 'sset', 'Master', f'{volume}%'],
+        ['amixer', 'sset', 'Master', f'{volume}%'],
+    ):
+        try:
+            result = subprocess.run(cmd, capture_output=True, text=True, timeout=2)
+            if result.returncode == 0:
+                return True
+        except FileNotFoundError:
+            break
+    try:
+        result = subprocess.run(
+            ['pactl', 'set-sink-volume', '@DEFAULT_SINK@', f'{volume}%'],
+            capture_output=True, text=True, timeout=2
+        )
+        return result.returncode == 0
+    except FileNotFoundError:
+        return False
+
+
+def measure(name, set_volume, ops):
+    """Time `ops` volume changes, return latencies in milliseconds"""
+    timings = []
+    for i in range(ops):
+        volume = 40 if i % 2 else 60
+        start = time.perf_counter()
+        if not set_volume(volume):
+            print(f"  ❌ {name}: set failed")
+            return None
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def create_backends():
+    """Create every backend that works on this machine"""
+    backends = []
+    for device in ('pulse', 'default'):
+        try:
+            backends.append((f"alsa ({device})", AlsaMixerBackend(device)))
+            break
+        except OSError as e:
+            print(f"  ⚠️ ALSA on '{device}' unavailable: {e}")
+    try:
+        backend = SubprocessMixerBackend()
+        backends.append((f"subprocess ({backend.name})", backend))
+    except Exception as e:
+        print(f"  ⚠️ Subprocess backend unavailable: {e}")
+    return backends
+
+
+def main():
+    parser = argparse.ArgumentParser(description="System mixer latency benchmark")
+    parser.add_argument('--ops', type=int, default=50, help="volume changes per backend")
+    args = parser.parse_args()
+    
+    print("🔊 Mixer benchmark")
+    print(f"   Operations per backend: {args.ops}")
+    
+    backends = create_backends()
+    if not backends:
+        print("❌ No mixer backend available on this machine")
+        return 1
+    
+    # Remember the current state to restore it afterwards
+    original = None
+    for _, backend in backends:
+        original = backend.get()
+        if original:
+            break
+    
+    candidates = [(name, lambda v, b=backend: b.set(v)) for name, backend in backends]
+    candidates.append(("legacy fork chain", legacy_set))
+    
+    results = []
+    try:
+        for name, set_volume in candidates:
+            print(f"📊 {name}...")
+            timings = measure(name, set_volume, args.ops)
+            if timings:
+                results.append((name, timings))
+    finally:
+        if original:
+            backends[0][1].set(*original)
+            print(f"   Restored volume {original[0]}%{' (muted)' if original[1] else ''}")
+        for _, backend in backends:
+            backend.close()
+    
+    print()
+    print(f"{'Backend':<32} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9}")
+    print("-" * 72)
+    for name, timings in results:
+        ordered = sorted(timings)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        print(f"{name:<32} {statistics.mean(timings):>9.3f} {statistics.median(timings):>9.3f} "
+              f"{p95:>9.3f} {ordered[-1]:>9.3f}")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Benchmark interrupted by user")
+        sys.exit(1)
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Queue benchmark for YouTube Music Bot
+Compares the plain List[Song] queue with SongQueue at different sizes
+
+Usage:
+    python3 scripts/bench_queue.py [--sizes 1000 10000 100000] [--ops 1000]
+
+Every operation runs --ops times on a queue of each size (the linear
+list scans of lookups and removals run fewer times), the table shows
+microseconds per operation.
+"""
+
+import argparse
+import random
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bot.core.player_state import Song
+from bot.core.song_queue import SongQueue
+
+
+def make_song(i):
+    """Song with a unique 11 character video ID"""
+    return Song(url=f"https://www.youtube.com/watch?v={i:011d}", title=f"Song {i}", duration="180")
+
+
+def list_position(queue, video_id):
+    for index, song in enumerate(queue):
+        if song.video_id == video_id:
+            return index
+    return None
+
+
+def list_remove_id(queue, video_id):
+    queue[:] = [song for song in queue if song.video_id != video_id]
+
+
+def list_dedup(queue):
+    seen = set()
+    kept = []
+    for song in queue:
+        if song.video_id not in seen:
+            seen.add(song.video_id)
+            kept.append(song)
+    queue[:] = kept
+
+
+def timed(func, ops):
+    """Run func(i) ops times, return microseconds per call"""
+    start = time.perf_counter()
+    for i in range(ops):
+        func(i)
+    return (time.perf_counter() - start) * 1e6 / ops
+
+
+def bench(size, ops):
+    """Measure both queue types at one size, return rows of (operation, list us, SongQueue us)"""
+    songs = [make_song(i) for i in range(size)]
+    extra = [make_song(size + i) for i in range(ops)]
+    rng = random.Random(size)
+    positions = [rng.randrange(size) for _ in range(ops)]
+    ids = [songs[p].video_id for p in positions]
+    rows = []
+    
+    # Append
+    plain = []
+    queue = SongQueue()
+    rows.append((
+        "append",
+        timed(lambda i: plain.append(songs[i]), size),
+        timed(lambda i: queue.append(songs[i]), size),
+    ))
+    
+    # Bulk extend (loading a playlist)
+    bulk = SongQueue()
+    rows.append((
+        "extend (per song)",
+        timed(lambda i: [].extend(songs), 1) / size,
+        timed(lambda i: bulk.extend(songs), 1) / size,
+    ))
+    
+    # Insert in the middle ("play next" with the cursor halfway)
+    rows.append((
+        "insert middle",
+        timed(lambda i: plain.insert(len(plain) // 2, extra[i]), ops),
+        timed(lambda i: queue.insert(len(queue) // 2, extra[i]), ops),
+    ))
+    
+    # Random access
+    rows.append((
+        "get [i]",
+        timed(lambda i: plain[positions[i]], ops),
+        timed(lambda i: queue[positions[i]], ops),
+    ))
+    
+    # Position of a video
+    lookups = min(ops, 20)
+    rows.append((
+        "position of ID",
+        timed(lambda i: list_position(plain, ids[i]), lookups),
+        timed(lambda i: queue.position_of(ids[i]), lookups),
+    ))
+    
+    # Move
+    rows.append((
+        "move",
+        timed(lambda i: plain.insert(positions[-i - 1], plain.pop(positions[i])), ops),
+        timed(lambda i: queue.move(positions[i], positions[-i - 1]), ops),
+    ))
+    
+    # "Play next" with the cursor halfway
+    queue.cursor = len(queue) // 2
+    rows.append((
+        "insert next",
+        timed(lambda i: plain.insert(len(plain) // 2 + 1, extra[i]), ops),
+        timed(lambda i: queue.insert_next(extra[i]), ops),
+    ))
+    
+    # Remove from the middle
+    rows.append((
+        "pop middle",
+        timed(lambda i: plain.pop(len(plain) // 2), ops),
+        timed(lambda i: queue.pop(len(queue) // 2), ops),
+    ))
+    
+    # Remove by ID
+    removals = min(ops, 10)
+    rows.append((
+        "remove by ID",
+        timed(lambda i: list_remove_id(plain, ids[i]), removals),
+        timed(lambda i: queue.remove_id(ids[i]), removals),
+    ))
+    
+    # Dedup after adding a block of duplicates
+    plain.extend(songs[:ops])
+    queue.extend(songs[:ops])
+    rows.append((
+        "dedup (whole queue)",
+        timed(lambda i: list_dedup(plain), 1),
+        timed(lambda i: queue.dedup(), 1),
+    ))
+    
+    if len(plain) != len(queue):
+        print(f"  ❌ Size mismatch: list {len(plain)}, SongQueue {len(queue)}")
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play queue microbenchmark")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000], help="queue sizes")
+    parser.add_argument('--ops', type=int, default=1000, help="operations per measurement")
+    args = parser.parse_args()
+    
+    print("📊 Queue benchmark (µs per operation)")
+    for size in args.sizes:
+        print(f"\n📀 {size:,} songs")
+        print(f"{'Operation':<22} {'list':>12} {'SongQueue':>12} {'speedup':>9}")
+        print("-" * 58)
+        for name, t_list, t_queue in bench(size, args.ops):
+            speedup = t_list / t_queue if t_queue else 0
+            print(f"{name:<22} {t_list:>12.2f} {t_queue:>12.2f} {speedup:>8.1f}x")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Benchmark interrupted by user")
+        sys.exit(1)
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+yt-dlp pool benchmark for YouTube Music Bot
+Compares a fresh YoutubeDL per call (the old extractor behaviour) with
+the warm instances of YtdlPool
+
+Usage:
+    python3 scripts/bench_ytdl_pool.py [--calls 10] [--offline] [URL]
+
+--offline only measures instance setup, no network needed.
+Otherwise every call extracts URL (default: a short public video).
+"""
+
+import argparse
+import statistics
+import sys
+import os
+import time
+
+# Add project root to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import yt_dlp
+
+from bot.config import YTDL_OPTIONS
+from bot.core.ytdl_pool import YtdlPool, PROFILES
+
+DEFAULT_URL = "https://www.youtube.com/watch?v=jNQXAC9IVRw"
+
+
+def fresh_call(profile, url):
+    """One call the old way: build, use and close a YoutubeDL"""
+    opts = YTDL_OPTIONS.copy()
+    opts.update(PROFILES[profile])
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        if url:
+            ydl.extract_info(url, download=False)
+
+
+def pooled_call(profile, url):
+    """One call through the pool"""
+    with YtdlPool.acquire(profile) as ydl:
+        if url:
+            ydl.extract_info(url, download=False)
+
+
+def measure(call, profile, url, calls):
+    """Time `calls` calls, return latencies in milliseconds"""
+    timings = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        call(profile, url)
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="yt-dlp instance pool benchmark")
+    parser.add_argument('--calls', type=int, default=10, help="calls per variant")
+    parser.add_argument('--profile', default='full', choices=list(PROFILES), help="option profile")
+    parser.add_argument('--offline', action='store_true', help="measure instance setup only")
+    parser.add_argument('url', nargs='?', default=DEFAULT_URL, help="video or playlist to extract")
+    args = parser.parse_args()
+    
+    url = None if args.offline else args.url
+    print("📦 yt-dlp pool benchmark")
+    print(f"   Profile: {args.profile}, calls: {args.calls}, "
+          f"{'setup only' if url is None else url}")
+    
+    YtdlPool.warm()
+    results = []
+    try:
+        for name, call in (("fresh YoutubeDL per call", fresh_call), ("warm pool", pooled_call)):
+            print(f"📊 {name}...")
+            try:
+                results.append((name, measure(call, args.profile, url, args.calls)))
+            except yt_dlp.utils.DownloadError as e:
+                print(f"❌ Extraction failed: {e}")
+                return 1
+    finally:
+        YtdlPool.close()
+    
+    print()
+    print(f"{'Variant':<26} {'mean ms':>9} {'p50 ms':>9} {'min ms':>9} {'max ms':>9}")
+    print("-" * 66)
+    for name, timings in results:
+        print(f"{name:<26} {statistics.mean(timings):>9.2f} {statistics.median(timings):>9.2f} "
+              f"{min(timings):>9.2f} {max(timings):>9.2f}")
+    
+    if len(results) == 2:
+        saved = statistics.mean(results[0][1]) - statistics.mean(results[1][1])
+        print(f"\n⚡ Saved per call: {saved:.2f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print("\n\n❌ Benchmark interrupted by user")
+        sys.exit(1)